@@ -0,0 +1,85 @@
+"""
+Benchmark loading the books from the configuration of :py:class:`lira.app.LiraApp`.
+
+Books are loaded one after the other (like before the first frame),
+concurrently in a pool of threads (like after the first frame),
+and from the catalog of books (:py:class:`lira.catalog.BookCatalog`).
+A delay is added when reading the metadata of each book,
+to simulate a slow (network-mounted) home directory.
+
+Run with ``python -m benchmarks.bench_book_discovery``.
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.utils import bench, books
+from lira.app import LiraApp
+from lira.book import Book
+from lira.catalog import BookCatalog
+
+BOOKS = 200
+"""Number of books in the configuration."""
+
+LATENCY = 0.01
+"""Seconds added when reading the metadata of each book."""
+
+
+def _get_app(tmp_dir):
+    app = LiraApp()
+    app.catalog = BookCatalog(tmp_dir / "catalog.json")
+    # The same books with different paths.
+    paths = []
+    for i in range(BOOKS):
+        path = tmp_dir / f"book-{i}"
+        path.symlink_to(books[i % len(books)], target_is_directory=True)
+        paths.append(str(path))
+    app.config = {"books": paths}
+    app.book_paths = paths
+    return app
+
+
+def _load_serially(app):
+    app.catalog.clear()
+    app._read_books(app.config)
+
+
+def _load_concurrently(app):
+    app.catalog.clear()
+    asyncio.run(app.read_books_async())
+
+
+def _load_from_catalog(app):
+    app.catalog.load()
+    books = app._read_books(app.config)
+    assert all(book.chapters[0]._index for book in books)
+
+
+def main():
+    parse_metadata = Book._parse_metadata
+
+    def _parse_metadata(self):
+        time.sleep(LATENCY)
+        return parse_metadata(self)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = _get_app(Path(tmp_dir))
+        print(f"Loading {BOOKS} books with a latency of {LATENCY * 1000:.0f} ms")
+        with mock.patch.object(Book, "_parse_metadata", _parse_metadata):
+            serial = bench("Serially", lambda: _load_serially(app), number=1, repeat=3)
+            concurrent = bench(
+                "Concurrently", lambda: _load_concurrently(app), number=1, repeat=3
+            )
+            app.catalog.save()
+            cached = bench(
+                "From the catalog", lambda: _load_from_catalog(app), number=1, repeat=3
+            )
+    print(f"Speedup (concurrently): {serial / concurrent:.2f}x")
+    print(f"Speedup (catalog): {serial / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
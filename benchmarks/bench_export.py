@@ -0,0 +1,47 @@
+"""
+Benchmark rendering all bundled books into files.
+
+The bundled books don't have enough chapters to use a pool of processes
+(see :py:data:`lira.export.MIN_CHAPTERS_PER_WORKER`),
+the pool is forced to compare it with rendering them in one process.
+
+Run with ``python -m benchmarks.bench_export``.
+"""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.utils import bench, books
+from lira.book import Book
+from lira.export import export_books
+
+
+def _export(output, format, workers):
+    book_list = [Book(root=path) for path in books]
+    for _ in export_books(book_list, output, format=format, workers=workers):
+        pass
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = Path(tmp_dir)
+        for format in ["plain", "ansi", "html"]:
+            print(f"Exporting {len(books)} books to {format}")
+            bench(
+                "  One process",
+                lambda: _export(output, format, workers=1),
+                number=5,
+                repeat=3,
+            )
+            with mock.patch("lira.export.MIN_CHAPTERS_PER_WORKER", 1):
+                bench(
+                    "  Process pool",
+                    lambda: _export(output, format, workers=2),
+                    number=5,
+                    repeat=3,
+                )
+
+
+if __name__ == "__main__":
+    main()
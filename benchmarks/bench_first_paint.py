@@ -0,0 +1,86 @@
+"""
+Benchmark the time to first paint of sections of increasing size.
+
+Renders synthetic sections with a growing number of code blocks
+into a :py:class:`lira.tui.widgets.FormattedTextArea` (the whole section is rendered)
+and a :py:class:`lira.tui.widgets.VirtualizedTextArea` (only the viewport is rendered),
+and paints the first screen.
+The full render is also done with progressive highlighting
+(code blocks are painted without highlighting).
+
+Run with ``python -m benchmarks.bench_first_paint``.
+"""
+
+from prompt_toolkit.application import DummyApplication
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.formatted_text import merge_formatted_text
+from prompt_toolkit.layout.mouse_handlers import MouseHandlers
+from prompt_toolkit.layout.screen import Screen, WritePosition
+
+from benchmarks.utils import bench
+from lira.parsers.nodes import CodeBlock, Paragraph, Section, Text
+from lira.tui.render import Renderer
+from lira.tui.widgets import FormattedTextArea, VirtualizedTextArea
+
+
+def _get_section(blocks):
+    children = []
+    for i in range(blocks):
+        children.append(Paragraph(children=[Text(f"Example number {i}:")]))
+        children.append(
+            CodeBlock(
+                content=[f"for i in range({i}):", "    print(i * 2)"],
+                attributes={"language": "python"},
+            )
+        )
+    return Section(children=children, attributes={"title": "Examples"})
+
+
+def _paint(text_area):
+    text_area.window.write_to_screen(
+        Screen(),
+        MouseHandlers(),
+        WritePosition(xpos=0, ypos=0, width=80, height=24),
+        parent_style="",
+        erase_bg=False,
+        z_index=None,
+    )
+
+
+def _full(section):
+    Renderer.highlight_cache.clear()
+    renderer = Renderer(tui=None, section=section)
+    _paint(FormattedTextArea(merge_formatted_text(renderer.render())))
+
+
+def _progressive(section):
+    Renderer.highlight_cache.clear()
+    renderer = Renderer(tui=None, section=section, progressive=True)
+    _paint(FormattedTextArea(merge_formatted_text(renderer.render())))
+
+
+def _virtualized(section):
+    Renderer.highlight_cache.clear()
+    renderer = Renderer(tui=None, section=section)
+    _paint(
+        VirtualizedTextArea(
+            renderer.iter_render(),
+            estimated_count=renderer.estimate_lines(),
+        )
+    )
+
+
+def main():
+    # Without a running application, a new dummy application
+    # is created each time the current application is requested.
+    with set_app(DummyApplication()):
+        for blocks in [10, 100, 1000]:
+            section = _get_section(blocks)
+            print(f"Section with {blocks} code blocks")
+            bench("  Full render", lambda: _full(section), number=5)
+            bench("  Progressive render", lambda: _progressive(section), number=5)
+            bench("  Virtualized render", lambda: _virtualized(section), number=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark mouse hit-testing in :py:class:`lira.tui.widgets.FormattedBufferControl`.
+
+Compares a linear scan over the fragments of a line
+(how the handler under the cursor used to be found)
+with the indexed lookup done by ``FormattedBufferControl.select``.
+
+Run with ``python -m benchmarks.bench_hit_testing``.
+"""
+
+from prompt_toolkit.data_structures import Point
+from prompt_toolkit.formatted_text import to_formatted_text
+from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
+
+from benchmarks.utils import bench
+from lira.tui.widgets import FormattedTextArea
+
+
+def _handler(mouse_event):
+    return mouse_event.position.x
+
+
+def _get_text(lines, fragments):
+    text = []
+    for _ in range(lines):
+        for i in range(fragments):
+            text.append(("class:token", f"tok{i} ", _handler))
+        text.append(("", "\n"))
+    return to_formatted_text(text)
+
+
+def _linear_select(control, mouse_event):
+    fragments = control.formatted_lines[mouse_event.position.y]
+    start = 0
+    for item in fragments:
+        end = start + len(item[1])
+        if start <= mouse_event.position.x < end:
+            if len(item) >= 3:
+                return item[2](mouse_event)
+            return None
+        start = end
+
+
+def _click(select, control, events):
+    for event in events:
+        select(control, event)
+
+
+def main():
+    lines, fragments = 200, 500
+    control = FormattedTextArea(_get_text(lines, fragments)).control
+    width = len(control.formatted_lines[0]) * 5
+    events = [
+        MouseEvent(Point(x, y), MouseEventType.MOUSE_UP)
+        for y in range(0, lines, 10)
+        for x in range(0, width, width // 50)
+    ]
+
+    print(f"{len(events)} clicks on lines with {fragments} fragments")
+    linear = bench("Linear scan", lambda: _click(_linear_select, control, events))
+    indexed = bench(
+        "Indexed lookup",
+        lambda: _click(type(control).select, control, events),
+    )
+    print(f"Speedup: {linear / indexed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
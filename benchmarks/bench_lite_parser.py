@@ -0,0 +1,37 @@
+"""
+Benchmark the fast parser against the docutils parser.
+
+Parses all bundled chapters with :py:class:`lira.parsers.rst.RSTParser`
+and with :py:class:`lira.parsers.lite.LiteRSTParser`.
+
+Run with ``python -m benchmarks.bench_lite_parser``.
+"""
+
+from benchmarks.utils import bench, get_chapters
+from lira.parsers.lite import LiteRSTParser
+from lira.parsers.rst import RSTParser
+
+
+def _parse(parser_class, chapters):
+    for file, content in chapters:
+        parser = parser_class(content=content, source=file)
+        parser.parse_metadata()
+        parser.parse_content()
+
+
+def main():
+    chapters = get_chapters()
+    fallbacks = [
+        file
+        for file, content in chapters
+        if LiteRSTParser(content=content, source=file).fallback
+    ]
+
+    print(f"Parsing {len(chapters)} chapters ({len(fallbacks)} fall back to docutils)")
+    docutils = bench("Docutils parser", lambda: _parse(RSTParser, chapters))
+    lite = bench("Fast parser", lambda: _parse(LiteRSTParser, chapters))
+    print(f"Speedup: {docutils / lite:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
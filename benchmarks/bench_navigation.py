@@ -0,0 +1,54 @@
+"""
+Benchmark switching between sections in :py:class:`lira.tui.windows.ContentArea`.
+
+Renders all the sections of the bundled books one after the other,
+with and without the cache of rendered sections.
+
+Run with ``python -m benchmarks.bench_navigation``.
+"""
+
+from types import SimpleNamespace
+
+from benchmarks.utils import bench, books
+from lira.book import Book
+from lira.tui.windows import ContentArea
+
+
+def _get_sections():
+    sections = []
+    for path in books:
+        book = Book(root=path)
+        book.parse(all=True)
+        for chapter in book.chapters:
+            sections.extend(section for section, _ in chapter.toc(depth=1))
+    return sections
+
+
+def _navigate(content_area, sections, cache):
+    for section in sections:
+        if not cache:
+            content_area.section_cache.clear()
+        content_area.render_section(section)
+
+
+def main():
+    sections = _get_sections()
+    content_area = ContentArea(tui=SimpleNamespace(lira=None))
+    content_area.section_cache.maxsize = len(sections)
+
+    print(f"Switching between {len(sections)} sections")
+    uncached = bench(
+        "Without cache",
+        lambda: _navigate(content_area, sections, cache=False),
+        number=20,
+    )
+    cached = bench(
+        "With cache",
+        lambda: _navigate(content_area, sections, cache=True),
+        number=20,
+    )
+    print(f"Speedup: {uncached / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
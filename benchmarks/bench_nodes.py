@@ -0,0 +1,73 @@
+"""
+Benchmark the memory used by the nodes of a big chapter.
+
+Builds the node tree of a synthetic chapter with 10k paragraphs,
+and reports the time it takes, and the memory allocated by the tree
+(measured with :py:mod:`tracemalloc`).
+
+Run with ``python -m benchmarks.bench_nodes``.
+"""
+
+import gc
+import tracemalloc
+
+from benchmarks.utils import bench
+from lira.parsers.lite import LiteRSTParser
+
+SECTIONS = 100
+PARAGRAPHS = 100
+
+
+def get_chapter():
+    """Return the source of a chapter with ``SECTIONS * PARAGRAPHS`` paragraphs."""
+    lines = []
+    for i in range(SECTIONS):
+        title = f"Section {i}"
+        lines.extend([title, "=" * len(title), ""])
+        for j in range(PARAGRAPHS):
+            lines.extend(
+                [
+                    f"Paragraph {j} with **strong**, *emphasis*, and ``literal`` text.",
+                    "",
+                ]
+            )
+        lines.extend(
+            [
+                ".. test-block:: Write a comment",
+                "   :validator: lira.validators.CommentValidator",
+                "   :language: python",
+                "",
+                "   # Comment",
+                "",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def count_nodes(nodes):
+    return sum(1 + count_nodes(node.children) for node in nodes)
+
+
+def main():
+    # The content is tokenized once, only the creation of the nodes is measured.
+    parser = LiteRSTParser(content=get_chapter())
+
+    gc.collect()
+    tracemalloc.start()
+    nodes = parser.parse_content()
+    size, peak = tracemalloc.get_traced_memory()
+    blocks = sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+    )
+    tracemalloc.stop()
+
+    print(f"Building {count_nodes(nodes)} nodes")
+    print(f"{'Memory blocks used by the tree':<50} {blocks:>10}")
+    print(f"{'Memory used by the tree':<50} {size / 2 ** 20:>10.3f} MiB")
+    print(f"{'Peak memory':<50} {peak / 2 ** 20:>10.3f} MiB")
+    del nodes
+    bench("Build the tree", parser.parse_content, number=5)
+
+
+if __name__ == "__main__":
+    main()
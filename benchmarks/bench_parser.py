@@ -0,0 +1,46 @@
+"""
+Benchmark the per-chapter cost of the docutils setup.
+
+Compares parsing all bundled chapters creating a new
+:py:class:`lira.parsers.rst.ParserContext` for each chapter
+(what the parser used to do) against reusing the shared context.
+
+Run with ``python -m benchmarks.bench_parser``.
+"""
+
+from docutils.frontend import OptionParser
+from docutils.parsers.rst import Parser
+
+from benchmarks.utils import bench, get_chapters
+from lira.parsers.rst import ParserContext, RSTParser
+
+
+def main():
+    chapters = get_chapters()
+    context = ParserContext.get_default()
+
+    def parse_new_context():
+        for file, content in chapters:
+            RSTParser(content=content, source=file, context=ParserContext())
+
+    def parse_shared_context():
+        for file, content in chapters:
+            RSTParser(content=content, source=file)
+
+    def state_machine_only():
+        for file, content in chapters:
+            context.parse(content, str(file))
+
+    def settings_only():
+        OptionParser(components=(Parser,)).get_default_values()
+
+    print(f"Parsing {len(chapters)} chapters")
+    new = bench("New context per chapter", parse_new_context)
+    shared = bench("Shared context", parse_shared_context)
+    bench("Docutils state machine only", state_machine_only)
+    bench("Settings creation (per context)", settings_only)
+    print(f"Speedup: {new / shared:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
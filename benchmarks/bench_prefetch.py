@@ -0,0 +1,63 @@
+"""
+Benchmark opening the chapters of a book one after the other.
+
+Each chapter is opened (parsed if it wasn't parsed yet),
+and after some reading time the next chapter is opened.
+It's done without prefetching,
+and with :py:class:`lira.tui.prefetch.ChapterPrefetcher`
+(the next chapter is parsed in the background while the user is reading).
+Only the time spent opening each chapter is measured.
+
+Run with ``python -m benchmarks.bench_prefetch``.
+"""
+
+import asyncio
+import time
+
+from benchmarks.utils import books
+from lira.book import Book
+from lira.tui.prefetch import ChapterPrefetcher
+
+READING_TIME = 0.1
+"""Seconds spent reading each chapter."""
+
+
+async def _read_book(path, prefetch):
+    book = Book(root=path)
+    book.parse()
+    prefetcher = ChapterPrefetcher()
+    latencies = []
+    for chapter in book.chapters:
+        start = time.perf_counter()
+        if prefetch:
+            prefetcher.visit(chapter)
+            loaded = asyncio.get_running_loop().create_future()
+            prefetcher.load(chapter, lambda: loaded.set_result(None))
+            await loaded
+        elif not chapter.is_parsed:
+            chapter.parse()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(READING_TIME)
+    return latencies
+
+
+def _report(name, prefetch):
+    latencies = []
+    for path in books:
+        latencies.extend(asyncio.run(_read_book(path, prefetch)))
+    total = sum(latencies) * 1000
+    print(
+        f"{name:<20} chapters={len(latencies):<4} "
+        f"total={total:>8.2f} ms  max={max(latencies) * 1000:>8.2f} ms"
+    )
+    return total
+
+
+def main():
+    cold = _report("Without prefetch", prefetch=False)
+    warm = _report("With prefetch", prefetch=True)
+    print(f"Speedup: {cold / warm:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
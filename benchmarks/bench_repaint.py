@@ -0,0 +1,64 @@
+"""
+Benchmark repainting static content in a :py:class:`lira.tui.widgets.FormattedTextArea`.
+
+Runs the input processors over all the lines
+of the rendered sections of the bundled books,
+like prompt_toolkit does on each redraw,
+with an empty cache (first paint) and with a warm cache (repaint).
+
+Run with ``python -m benchmarks.bench_repaint``.
+"""
+
+from prompt_toolkit.formatted_text import merge_formatted_text
+from prompt_toolkit.layout.processors import TransformationInput
+
+from benchmarks.utils import bench, books
+from lira.book import Book
+from lira.tui.render import Renderer
+from lira.tui.widgets import FormattedTextArea, FormatTextProcessor
+
+
+def _get_text_area():
+    content = []
+    for path in books:
+        book = Book(root=path)
+        book.parse(all=True)
+        for chapter in book.chapters:
+            for section in chapter.toc():
+                renderer = Renderer(tui=None, section=section[0], width=80)
+                content.extend(renderer.render())
+    return FormattedTextArea(merge_formatted_text(content))
+
+
+def _get_inputs(text_area):
+    return [
+        TransformationInput(
+            buffer_control=text_area.control,
+            document=text_area.document,
+            lineno=lineno,
+            source_to_display=lambda i: i,
+            fragments=[],
+            width=80,
+            height=24,
+        )
+        for lineno in range(text_area.document.line_count)
+    ]
+
+
+def _paint(processor, inputs):
+    for transformation_input in inputs:
+        processor.apply_transformation(transformation_input)
+
+
+def main():
+    text_area = _get_text_area()
+    print(f"Painting {text_area.document.line_count} lines")
+    inputs = _get_inputs(text_area)
+    first = bench("First paint", lambda: _paint(FormatTextProcessor(), inputs))
+    processor = FormatTextProcessor()
+    repaint = bench("Repaint", lambda: _paint(processor, inputs))
+    print(f"Speedup: {first / repaint:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
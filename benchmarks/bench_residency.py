@@ -0,0 +1,70 @@
+"""
+Benchmark the memory used by the parsed chapters of a book.
+
+A book with many chapters (copies of the bundled chapters) is read
+by opening its chapters one after the other, without limit,
+and with a :py:class:`lira.book.ChapterResidency`
+that keeps only a few parsed chapters in memory.
+The memory allocated after opening all chapters is measured with :py:mod:`tracemalloc`.
+
+Run with ``python -m benchmarks.bench_residency``.
+"""
+
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.utils import get_chapters
+from lira.book import Book, ChapterResidency
+
+CHAPTERS = 200
+"""Number of chapters of the book."""
+
+MAX_CHAPTERS = 4
+"""Max number of parsed chapters kept in memory."""
+
+
+def _create_book(root):
+    chapters = get_chapters()
+    lines = ["title: Residency", "chapters:"]
+    for i in range(CHAPTERS):
+        _, content = chapters[i % len(chapters)]
+        (root / f"chapter-{i}.rst").write_text(content)
+        lines.append(f"  Chapter {i}: chapter-{i}.rst")
+    (root / "book.yaml").write_text("\n".join(lines) + "\n")
+
+
+def _read_book(root, residency):
+    tracemalloc.start()
+    book = Book(root=root, residency=residency)
+    book.parse()
+    for chapter in book.chapters:
+        chapter.parse()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def _report(name, root, residency):
+    current = _read_book(root, residency)
+    print(f"{name:<20} memory={current / 1024 ** 2:>8.2f} MB")
+    return current
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        _create_book(root)
+        # Import the parsers before measuring.
+        _read_book(root, residency=None)
+        unbounded = _report("Without limit", root, residency=None)
+        bounded = _report(
+            f"Max {MAX_CHAPTERS} chapters",
+            root,
+            ChapterResidency(max_chapters=MAX_CHAPTERS),
+        )
+    print(f"Reduction: {unbounded / bounded:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark a resize storm in :py:class:`lira.tui.windows.ContentArea`.
+
+The content area is painted with a different width every few milliseconds
+(like when the terminal is being resized), while a ticker task measures
+how late the event loop runs it.
+It's done with the default resize delay,
+and without delay (the section is rendered again after each resize).
+
+Run with ``python -m benchmarks.bench_resize``.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from prompt_toolkit.application import DummyApplication
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.layout.mouse_handlers import MouseHandlers
+from prompt_toolkit.layout.screen import Screen, WritePosition
+
+from benchmarks.bench_first_paint import _get_section
+from lira.tui.windows import ContentArea
+
+STORM_DURATION = 1
+"""Duration of the resize storm in seconds."""
+
+RESIZE_INTERVAL = 0.005
+"""Seconds between each resize."""
+
+TICK = 0.001
+"""Interval of the ticker used to measure the latency of the event loop."""
+
+
+def _paint(content_area, width):
+    content_area.text_area.window.write_to_screen(
+        Screen(),
+        MouseHandlers(),
+        WritePosition(xpos=0, ypos=0, width=width, height=40),
+        parent_style="",
+        erase_bg=False,
+        z_index=None,
+    )
+
+
+async def _ticker(latencies):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        latencies.append(time.perf_counter() - start - TICK)
+
+
+async def _storm(resize_delay):
+    content_area = ContentArea(tui=SimpleNamespace(lira=None))
+    content_area.resize_delay = resize_delay
+    content_area.progressive_highlighting = False
+    content_area.render_section(_get_section(200))
+
+    renders = 0
+    render_section = content_area.render_section
+
+    def _render_section(section):
+        nonlocal renders
+        renders += 1
+        render_section(section)
+
+    content_area.render_section = _render_section
+
+    latencies = []
+    ticker = asyncio.create_task(_ticker(latencies))
+    start = time.perf_counter()
+    i = 0
+    while time.perf_counter() - start < STORM_DURATION:
+        _paint(content_area, width=60 + (i * 7) % 40)
+        content_area.check_width()
+        i += 1
+        await asyncio.sleep(RESIZE_INTERVAL)
+    # Let the last render happen.
+    await asyncio.sleep(resize_delay + 0.1)
+    ticker.cancel()
+    return i, renders, latencies
+
+
+def _report(name, resize_delay):
+    resizes, renders, latencies = asyncio.run(_storm(resize_delay))
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{name:<28} resizes={resizes:<4} renders={renders:<4} "
+        f"p99 lag={p99 * 1000:>7.2f} ms  max lag={latencies[-1] * 1000:>7.2f} ms"
+    )
+
+
+def main():
+    with set_app(DummyApplication()):
+        _report("Without delay", resize_delay=0)
+        _report(
+            f"Delay of {ContentArea.resize_delay}s",
+            resize_delay=ContentArea.resize_delay,
+        )
+
+
+if __name__ == "__main__":
+    main()
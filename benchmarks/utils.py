@@ -0,0 +1,26 @@
+import timeit
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+books = [
+    root / "lira/books/intro",
+    root / "lira/books/python_tutorial",
+    root / "tests/data/books/example",
+    root / "tests/data/books/renderer",
+]
+
+
+def get_chapters():
+    """Return a list of tuples with the path and content of all bundled chapters."""
+    chapters = []
+    for book in books:
+        for file in sorted(book.glob("*.rst")):
+            chapters.append((file, file.read_text()))
+    return chapters
+
+
+def bench(name, func, number=100, repeat=5):
+    """Run `func` and print the best time per call in milliseconds."""
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f"{name:<50} {best * 1000:>10.3f} ms")
+    return best
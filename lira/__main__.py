@@ -1,10 +1,110 @@
-from lira.tui import TerminalUI
+from pathlib import Path
 
+import click
 
-def main():
-    ui = TerminalUI()
-    ui.run()
+from lira.utils import Timer
+
+# The terminal UI, parsers and exporters are imported when they are needed,
+# so the first frame is shown as soon as possible.
+
+
+@click.group(invoke_without_command=True)
+@click.option(
+    "--startup-report",
+    is_flag=True,
+    help="Show how long each phase of the startup takes and exit.",
+)
+@click.pass_context
+def main(ctx, startup_report):
+    """Python interactive tutorial in your terminal."""
+    if ctx.invoked_subcommand is not None:
+        return
+
+    timer = Timer()
+    with timer.measure("imports"):
+        from lira.tui import TerminalUI
+
+    ui = TerminalUI(timer=timer)
+    ui.run(exit_after_startup=startup_report)
+    if startup_report:
+        for name, duration in timer.timings.items():
+            click.echo(f"{name:<16} {duration * 1000:>8.1f} ms")
+        click.echo(f"{'total':<16} {timer.total() * 1000:>8.1f} ms")
+
+
+@main.command()
+@click.argument("books", nargs=-1, required=True)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False),
+    default="build",
+    show_default=True,
+    help="Directory where the files are written.",
+)
+@click.option(
+    "--format",
+    "-f",
+    "format_",
+    # Keep in sync with lira.export.FORMATS.
+    type=click.Choice(["plain", "ansi", "html"]),
+    default="plain",
+    show_default=True,
+)
+@click.option("--width", "-w", type=int, default=80, show_default=True)
+@click.option(
+    "--workers",
+    "-j",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Max number of processes, use 0 for the number of processors.",
+)
+def render(books, output, format_, width, workers):
+    """
+    Render BOOKS into files, without the terminal UI.
+
+    Each book can be a path to the directory of the book,
+    or a dotted path to its module.
+    """
+    from lira.app import resolve_book_path
+    from lira.book import Book
+    from lira.export import export_books
+
+    book_list = []
+    for book_path in books:
+        try:
+            root = resolve_book_path(book_path)
+        except (ImportError, ValueError, TypeError):
+            raise click.BadParameter(f"Unable to find book: {book_path}")
+        if not (root / Book.meta_file).is_file():
+            raise click.BadParameter(f"Unable to find book: {book_path}")
+        book_list.append(Book(root=root))
+
+    workers = workers or None
+    for file in export_books(book_list, Path(output), format_, width, workers):
+        click.echo(file)
+
+
+@main.command()
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Index all books again, instead of only the books that changed.",
+)
+def index(rebuild):
+    """
+    Update the index of the books from the configuration.
+
+    The index is used to show the list of books without loading each book.
+    """
+    from lira.app import LiraApp
+
+    app = LiraApp()
+    app.setup(read_books=False)
+    for book in app.index_books(rebuild=rebuild):
+        click.echo(f"{book.metadata['title']} ({book.root})")
 
 
 if __name__ == "__main__":
-    main()
+    main(prog_name="lira")
@@ -1,15 +1,44 @@
+import asyncio
 import importlib
 import logging
 from pathlib import Path
 
 import yaml
 
-from lira.book import Book
-from lira.config import CONFIG_DIR, CONFIG_FILE, DATA_DIR, LOG_DIR
+from lira.book import Book, ChapterResidency
+from lira.cache import ChapterCache
+from lira.catalog import BookCatalog
+from lira.config import (
+    CACHE_DIR,
+    CATALOG_FILE,
+    CONFIG_DIR,
+    CONFIG_FILE,
+    DATA_DIR,
+    LOG_DIR,
+)
 
 log = logging.getLogger(__name__)
 
 
+def resolve_book_path(book_path: str, root: Path = None):
+    """
+    Get the directory of a book from a local path or a dotted path to its module.
+
+    :param root: Directory used to resolve relative paths
+     (the current directory by default).
+    :raises ModuleNotFoundError: If the path doesn't exist
+     and there isn't a module with that name.
+    :returns: The path to the directory of the book.
+    """
+    path = Path(book_path).expanduser()
+    if not path.is_absolute() and root is not None:
+        path = (root / path).resolve()
+    if path.exists() and path.is_dir():
+        return path
+    package = importlib.import_module(book_path)
+    return Path(package.__file__).parent
+
+
 class LiraApp:
 
     """
@@ -33,8 +62,27 @@ class LiraApp:
         self.books = []
         """List of :py:class:`lira.book.Book`"""
 
+        self.book_paths = []
+        """Paths of the books from the configuration."""
+
+        self.books_loaded = False
+        """`True` if the books from the configuration were loaded."""
+
+        self.cache = ChapterCache(CACHE_DIR)
+        """Cache shared by all books, see :py:class:`lira.cache.ChapterCache`."""
+
+        self.catalog = BookCatalog(CATALOG_FILE)
+        """Index of the books, see :py:class:`lira.catalog.BookCatalog`."""
+
+        self.residency = ChapterResidency()
+        """
+        Limit of parsed chapters kept in memory, shared by all books.
+
+        See :py:class:`lira.book.ChapterResidency`.
+        """
+
     def _create_dirs(self):
-        for dir in [CONFIG_DIR, DATA_DIR, LOG_DIR]:
+        for dir in [CONFIG_DIR, DATA_DIR, LOG_DIR, CACHE_DIR]:
             dir.mkdir(parents=True, exist_ok=True)
 
     def _setup_logger(self):
@@ -54,15 +102,30 @@ class LiraApp:
             config = yaml.safe_load(f)
         return config
 
-    def load_config(self):
+    def load_config(self, read_books: bool = True):
         """
         Load the user configuration into the app.
 
         If called again, this method will refresh the configuration
         with the latest changes.
+
+        :param read_books: If `False`, books aren't loaded,
+         use :py:meth:`read_books_async` to load them later.
         """
         self.config = self._read_config(CONFIG_FILE)
-        self.books = self._read_books(self.config)
+        self.book_paths = list(self.config.get("books", []))
+        self.residency.max_chapters = self.config.get(
+            "max_chapters", ChapterResidency.max_chapters
+        )
+        max_memory = self.config.get("max_memory")
+        self.residency.max_size = max_memory * 1024 ** 2 if max_memory else None
+        self.books = []
+        self.books_loaded = False
+        self.catalog.load()
+        if read_books:
+            self.books = self._read_books(self.config)
+            self.books_loaded = True
+            self.catalog.save()
 
     def _read_books(self, config):
         """
@@ -91,28 +154,108 @@ class LiraApp:
         """
         books_list = []
         for book_path in config.get("books", []):
-            path = Path(book_path).expanduser()
-            if not path.is_absolute():
-                path = (CONFIG_FILE.parent / path).resolve()
-
-            if path.exists() and path.is_dir():
-                books_list.append(Book(root=path))
-            else:
-                try:
-                    package = importlib.import_module(book_path)
-                    path = Path(package.__file__).parent
-                    books_list.append(Book(root=path))
-                except ModuleNotFoundError:
-                    log.warning("Unable to find book: %s", book_path)
-                except Exception as e:
-                    log.warning(
-                        "Unable to load book. path=%s error=%s",
-                        book_path,
-                        str(e),
-                    )
+            book = self._get_cached_book(book_path) or self._load_book(book_path)
+            if book:
+                books_list.append(book)
         return books_list
 
-    def setup(self):
+    def _get_catalog_key(self, book_path):
+        # Relative paths are relative to the config file,
+        # dotted paths are kept unique as well.
+        return str(CONFIG_FILE.parent / Path(book_path).expanduser())
+
+    def _get_cached_book(self, book_path):
+        """Get the book from the catalog, or `None` if it isn't indexed."""
+        return self.catalog.get(
+            self._get_catalog_key(book_path),
+            cache=self.cache,
+            residency=self.residency,
+        )
+
+    def _load_book(self, book_path):
+        """
+        Load and parse the metadata of the book from `book_path`.
+
+        The book is added to the catalog.
+
+        :returns: The book, or `None` if it couldn't be loaded.
+        """
+        try:
+            path = resolve_book_path(book_path, root=CONFIG_FILE.parent)
+            book = Book(root=path, cache=self.cache, residency=self.residency)
+            book.parse()
+        except ModuleNotFoundError:
+            log.warning("Unable to find book: %s", book_path)
+            return None
+        except Exception as e:
+            log.warning(
+                "Unable to load book. path=%s error=%s",
+                book_path,
+                str(e),
+            )
+            return None
+
+        try:
+            self.catalog.set(self._get_catalog_key(book_path), book)
+        except OSError as e:
+            log.warning("Unable to index book. path=%s error=%s", book_path, str(e))
+        return book
+
+    async def read_books_async(self, callback=None):
+        """
+        Load and parse the metadata of all books from the configuration.
+
+        Books from the catalog are loaded right away,
+        the others are loaded concurrently in a pool of threads,
+        so a slow book doesn't block the others.
+
+        :param callback: Function (function(index, book)) called as soon as
+         each book is loaded, `index` is the position of the book in
+         :py:attr:`book_paths`, and `book` is `None` if it couldn't be loaded.
+        :returns: The list of books that were loaded.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def _load(index, book_path):
+            book = self._get_cached_book(book_path)
+            if not book:
+                book = await loop.run_in_executor(None, self._load_book, book_path)
+            if callback:
+                callback(index, book)
+            return book
+
+        books = await asyncio.gather(
+            *(_load(i, book_path) for i, book_path in enumerate(self.book_paths))
+        )
+        self.books = [book for book in books if book]
+        self.books_loaded = True
+        self.catalog.save()
+        return self.books
+
+    def index_books(self, rebuild: bool = False):
+        """
+        Update the catalog with the books from the configuration.
+
+        Books that aren't in the configuration are removed from the catalog.
+
+        :param rebuild: If `True`, all books are indexed again.
+        :returns: The list of books that were indexed.
+        """
+        if rebuild:
+            self.catalog.clear()
+        self.books = self._read_books(self.config)
+        self.books_loaded = True
+        self.catalog.retain(self._get_catalog_key(path) for path in self.book_paths)
+        self.catalog.save()
+        return self.books
+
+    def setup(self, read_books: bool = True):
+        """
+        Create the directories used by Lira, and load the configuration.
+
+        :param read_books: If `False`, books aren't loaded,
+         see :py:meth:`load_config`.
+        """
         self._create_dirs()
         self._setup_logger()
-        self.load_config()
+        self.load_config(read_books=read_books)
@@ -1,8 +1,87 @@
+import hashlib
+import logging
+from collections import OrderedDict
 from pathlib import Path
 
 import yaml
 
-from lira.parsers.rst import RSTParser
+from lira.cache import ChapterCache
+from lira.parsers.lite import LiteRSTParser
+from lira.parsers.nodes import dump_nodes, load_nodes
+from lira.parsers.outline import (
+    dump_outline,
+    load_outline,
+    scan_outline,
+    split_sections,
+)
+from lira.validators import TestBlockValidator, resolve_validator_classes
+
+log = logging.getLogger(__name__)
+
+
+def _parse(parser_class, content: str, source: Path):
+    """
+    Parse the metadata and nodes of `content`.
+
+    The parser is closed right after,
+    so its intermediate tree (like the docutils document) isn't kept in memory.
+    """
+    parser = parser_class(content=content, source=source)
+    try:
+        return parser.parse_metadata(), parser.parse_content()
+    finally:
+        parser.close()
+
+
+def _parse_file(file: Path):
+    """
+    Parse a chapter from a worker.
+
+    :returns: A tuple with the content, stat, and metadata of the file,
+     and its nodes in the format from :py:func:`lira.parsers.nodes.dump_nodes`.
+    """
+    # Stat the file before reading it, so the result is never newer than the content.
+    stat = file.stat()
+    with file.open() as f:
+        content = f.read()
+    metadata, nodes = _parse(BookChapter.parser_class, content, file)
+    return content, stat, metadata, dump_nodes(nodes)
+
+
+def _get_digest(chunk: str):
+    return hashlib.sha256(chunk.encode()).hexdigest()
+
+
+def _split_nodes(nodes):
+    """
+    Split the top-level nodes of a chapter at its sections.
+
+    Nodes are split in the same way as
+    :py:func:`lira.parsers.outline.split_sections` splits the content.
+    """
+    preamble = []
+    sections = []
+    for node in nodes:
+        if node.tagname == "Section":
+            sections.append([node])
+        elif sections:
+            sections[-1].append(node)
+        else:
+            preamble.append(node)
+    return [preamble] + sections
+
+
+def _iter_nodes(nodes):
+    for node in nodes:
+        yield node
+        yield from _iter_nodes(node.children)
+
+
+def _get_validator_paths(nodes):
+    for node in nodes:
+        if node.tagname == "TestBlock":
+            yield node.attributes.validator
+        yield from _get_validator_paths(node.children)
 
 
 class BookChapter:
@@ -13,7 +92,8 @@ class BookChapter:
     The :py:meth:`parse` method should be called to initialize the :py:attr:`metadata`
     and :py:attr:`contents` attributes.
 
-    Currently, the :py:class:`lira.parsers.rst.RSTParser` parser is used by default.
+    Currently, the :py:class:`lira.parsers.lite.LiteRSTParser` parser is used by default
+    (it falls back to :py:class:`lira.parsers.rst.RSTParser` if needed).
 
     .. code:: python
 
@@ -26,10 +106,22 @@ class BookChapter:
        print(chapter.contents)
        print(chapter.toc())
 
+    To get only the titles of the sections use :py:meth:`outline`,
+    it doesn't require to parse the chapter.
+
+    If the book has a :py:class:`lira.cache.ChapterCache`,
+    the chapter is only parsed if it changed since the last time it was parsed.
+
+    When the file of the chapter changes, use ``chapter.parse(incremental=True)``
+    to parse again only the top-level sections that changed.
+
     :param file: File of the chapter
     :param title: Title of the chapter (defaults to the name of the file)
     """
 
+    parser_class = LiteRSTParser
+    """Parser used to parse the content of the chapter."""
+
     def __init__(self, *, book, file: Path, title: str = None):
         self.file = file
         self.title = title or file.name
@@ -41,13 +133,285 @@ class BookChapter:
         self.contents = []
         """List of nodes from :py:mod:`lira.parsers.nodes`"""
 
-    def parse(self):
-        """Parse the chapter content and initialize its attributes."""
+        self.is_parsed = False
+        """`True` if the chapter was already parsed."""
+
+        self._chunks = None
+        """Digests of the top-level sections of the chapter (see :py:meth:`parse`)."""
+
+        self._index = None
+        """Entry of the chapter from the catalog (see :py:meth:`Book.load_index`)."""
+
+        self._progress = None
+        """Progress of the test blocks, saved when the chapter is unloaded."""
+
+    def parse(self, incremental: bool = False):
+        """
+        Parse the chapter content and initialize its attributes.
+
+        :param incremental: If `True` and the chapter was already parsed,
+         the content is split at the boundaries of its top-level sections,
+         and only the sections that changed are parsed again.
+         The nodes of the sections that didn't change are kept
+         (including the state of their test blocks).
+        """
+        if incremental and self.is_parsed:
+            self._parse_incremental()
+            return
+        if self._load_cached():
+            return
+        content, stat = self._read_source()
+        if self._load_cached(content=content, stat=stat):
+            return
+        self._parse_full(content, stat)
+
+    def _parse_incremental(self):
+        content, stat = self._read_source()
+        chunks = split_sections(content)
+        digests = [_get_digest(chunk) for chunk in chunks]
+        previous_digests = self._get_chunks()
+        if previous_digests == digests:
+            return
+
+        previous_nodes = _split_nodes(self.contents)
+        if previous_digests is None or len(previous_digests) != len(previous_nodes):
+            self._parse_full(content, stat)
+            return
+
+        reusable = {}
+        for digest, nodes in zip(previous_digests, previous_nodes):
+            reusable.setdefault(digest, []).append(nodes)
+
+        metadata = self.metadata
+        contents = []
+        for i, (chunk, digest) in enumerate(zip(chunks, digests)):
+            if reusable.get(digest):
+                contents.extend(reusable[digest].pop(0))
+                continue
+            chunk_metadata, nodes = _parse(self.parser_class, chunk, self.file)
+            sections = [node for node in nodes if node.tagname == "Section"]
+            if i == 0:
+                metadata = chunk_metadata
+                is_valid = not sections
+            else:
+                is_valid = len(nodes) == 1 and len(sections) == 1
+                is_valid = is_valid and not chunk_metadata
+            if not is_valid:
+                # The outline of the chapter doesn't match its structure.
+                log.debug("Incremental parse failed. file=%s", self.file)
+                self._parse_full(content, stat)
+                return
+            contents.extend(nodes)
+
+        # Reused nodes may contain the progress of the user,
+        # so the result isn't saved in the cache.
+        self.metadata = metadata
+        self.contents = contents
+        self._chunks = digests
+        self._loaded()
+
+    def prefetch(self):
+        """
+        Read and parse the chapter, without updating it.
+
+        It doesn't modify the chapter, so it can be called from a worker thread.
+        The result is saved in the cache of the book from the same thread.
+        Use :py:meth:`load_prefetched` to initialize the chapter with the result.
+
+        :returns: A tuple with the metadata and contents of the chapter,
+         and the digests of its chunks (`None` if it was found in the cache).
+        """
+        cache = self.book.cache
+        data = cache.get(self.file) if cache else None
+        if data:
+            return data + (None,)
+        content, stat = self._read_source()
+        data = cache.get(self.file, content=content, stat=stat) if cache else None
+        if data:
+            return data + (None,)
+        metadata, contents = _parse(self.parser_class, content, self.file)
+        chunks = [_get_digest(chunk) for chunk in split_sections(content)]
+        if cache:
+            cache.set(self.file, content, metadata, contents, chunks=chunks, stat=stat)
+        return metadata, contents, chunks
+
+    def load_prefetched(self, data):
+        """
+        Initialize the chapter from the result of :py:meth:`prefetch`.
+
+        It does nothing if the chapter was already parsed,
+        so the progress of the user isn't lost.
+        """
+        if self.is_parsed:
+            return
+        self.metadata, self.contents, self._chunks = data
+        self.is_parsed = True
+        self._loaded()
+
+    def _parse_full(self, content, stat=None):
+        metadata, contents = _parse(self.parser_class, content, self.file)
+        self._set_contents(content, metadata, contents, stat)
+
+    def _get_chunks(self):
+        if self._chunks is None and self.book.cache:
+            self._chunks = self.book.cache.get_chunks(self.file)
+        return self._chunks
+
+    def _load_cached(self, content=None, stat=None):
+        """Initialize the chapter from the cache of the book, if possible."""
+        cache = self.book.cache
+        data = cache.get(self.file, content=content, stat=stat) if cache else None
+        if not data:
+            return False
+        self.metadata, self.contents = data
+        self.is_parsed = True
+        self._chunks = None
+        self._loaded()
+        return True
+
+    def _set_contents(self, content, metadata, contents, stat=None):
+        self.metadata = metadata
+        self.contents = contents
+        self.is_parsed = True
+        self._chunks = [_get_digest(chunk) for chunk in split_sections(content)]
+        if self.book.cache:
+            self.book.cache.set(
+                self.file, content, metadata, contents, chunks=self._chunks, stat=stat
+            )
+        self._loaded()
+
+    def _loaded(self):
+        """Restore the progress of the chapter, and mark it as recently used."""
+        if self._progress is not None:
+            self._restore_progress()
+        if self.book.residency is not None:
+            self.book.residency.touch(self)
+
+    def _get_progress(self):
+        return [
+            (
+                node.attributes.validator,
+                node.attributes.description,
+                list(node.content),
+                node.attributes.state,
+            )
+            for node in _iter_nodes(self.contents)
+            if node.tagname == "TestBlock"
+        ]
+
+    def _restore_progress(self):
+        progress, self._progress = self._progress, None
+        test_blocks = [
+            node for node in _iter_nodes(self.contents) if node.tagname == "TestBlock"
+        ]
+        for node, (validator, description, content, state) in zip(
+            test_blocks, progress
+        ):
+            # Skip test blocks that changed since the chapter was unloaded.
+            if (node.attributes.validator, node.attributes.description) != (
+                validator,
+                description,
+            ):
+                continue
+            # Only modified values are restored, so unmodified nodes
+            # don't take a snapshot or get a new version.
+            if list(node.content) != content:
+                node.content = content
+            if node.attributes.state != state:
+                node.attributes.state = state
+
+    def unload(self):
+        """
+        Release the contents of the chapter.
+
+        The progress of its test blocks (their content and state) is kept,
+        and restored when the chapter is parsed again.
+        """
+        if not self.is_parsed:
+            return
+        self._progress = self._get_progress()
+        self.contents = []
+        self.is_parsed = False
+        self._chunks = None
+        if self.book.residency is not None:
+            self.book.residency.discard(self)
+
+    def dump(self):
+        """
+        Convert the metadata and contents of the chapter into plain python objects.
+
+        The result can be serialized as JSON (useful to ship pre-parsed books),
+        use :py:meth:`load` to initialize a chapter from it.
+        The format of the contents is versioned,
+        see :py:func:`lira.parsers.nodes.dump_nodes`.
+        """
+        return {
+            "metadata": self.metadata,
+            "contents": dump_nodes(self.contents),
+        }
+
+    def load(self, data):
+        """
+        Initialize the chapter from the result of :py:meth:`dump`.
+
+        :raises ValueError: If the data is from another version of the format.
+        """
+        self.contents = load_nodes(data["contents"])
+        self.metadata = data["metadata"]
+        self.is_parsed = True
+        self._chunks = None
+        self._loaded()
+
+    def _read(self):
         with self.file.open() as f:
-            content = f.read()
-        parser = RSTParser(content=content, source=self.file)
-        self.metadata = parser.parse_metadata()
-        self.contents = parser.parse_content()
+            return f.read()
+
+    def _read_source(self):
+        """
+        Read the chapter, and stat its file before reading it.
+
+        The stat is used to validate the cache entry of the chapter,
+        if the file is modified after it's read, the entry won't be valid.
+        """
+        stat = self.file.stat()
+        return self._read(), stat
+
+    def outline(self, depth=2):
+        """
+        Return a list of :py:class:`lira.parsers.outline.OutlineSection`.
+
+        The outline is scanned from the source of the chapter,
+        without doing a full parse of the chapter.
+        If the book was loaded from the catalog and the chapter didn't change,
+        the outline from the catalog is used instead.
+
+        :param depth: Depth of the outline.
+        """
+        entry = self._index
+        if entry and depth <= entry["depth"]:
+            stat = self.file.stat()
+            if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return load_outline(entry["outline"], depth=depth)
+        return scan_outline(self._read(), depth=depth)
+
+    def dump_index(self, depth=2):
+        """
+        Return the entry of the chapter for the catalog of books.
+
+        It includes the outline of the chapter, and the hash of its content.
+        See :py:class:`lira.catalog.BookCatalog`.
+
+        :param depth: Depth of the outline.
+        """
+        stat = self.file.stat()
+        content = self._read()
+        return {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "digest": _get_digest(content),
+            "depth": depth,
+            "outline": dump_outline(scan_outline(content, depth=depth)),
+        }
 
     def toc(self, depth=2):
         """
@@ -59,6 +423,8 @@ class BookChapter:
 
         :param depth: Depth of the table of contents.
         """
+        if self.book.residency is not None and self.is_parsed:
+            self.book.residency.touch(self)
         return self._toc(self.contents, depth)
 
     def _toc(self, nodes, depth):
@@ -74,6 +440,105 @@ class BookChapter:
         return f"<BookChapter: {self.title}>"
 
 
+class ChapterResidency:
+
+    """
+    Keep a bounded number of parsed chapters in memory.
+
+    Chapters are added when they are parsed,
+    and the least recently used chapters are unloaded
+    (see :py:meth:`BookChapter.unload`) when there are more than `max_chapters`,
+    or when their estimated size is bigger than `max_size`.
+    The most recently used chapter and the pinned chapter are never unloaded.
+
+    .. code:: python
+
+       from pathlib import Path
+       from lira.book import Book, ChapterResidency
+
+       residency = ChapterResidency(max_chapters=2)
+       book = Book(Path('books/example/'), residency=residency)
+       book.parse(all=True)
+       print(len(residency))
+
+    :param max_chapters: Max number of parsed chapters.
+    :param max_size: Max size in bytes of the parsed chapters,
+     estimated from their number of nodes (`None` for no limit).
+    """
+
+    max_chapters = 32
+    """Default max number of parsed chapters."""
+
+    node_size = 400
+    """Estimated size in bytes of a node."""
+
+    def __init__(self, max_chapters: int = None, max_size: int = None):
+        if max_chapters is not None:
+            self.max_chapters = max_chapters
+        self.max_size = max_size
+
+        self.size = 0
+        """Estimated size in bytes of all parsed chapters."""
+
+        self.pinned = None
+        """Chapter that is never unloaded (like the chapter being displayed)."""
+
+        self.on_unload = []
+        """
+        Functions called with each chapter before it's unloaded.
+
+        Used to drop other references to the nodes of the chapter (like caches),
+        so they can be released.
+        """
+
+        self._chapters = OrderedDict()
+
+    def pin(self, chapter):
+        """Keep `chapter` in memory, it replaces the previously pinned chapter."""
+        self.pinned = chapter
+        if chapter.is_parsed:
+            self.touch(chapter)
+
+    def touch(self, chapter):
+        """Add `chapter` or mark it as used, unloading other chapters if needed."""
+        size = self._chapters.pop(chapter, None)
+        if size is None:
+            size = sum(1 for _ in _iter_nodes(chapter.contents)) * self.node_size
+            self.size += size
+        self._chapters[chapter] = size
+        self._evict()
+
+    def discard(self, chapter):
+        """Remove `chapter`, without unloading it."""
+        size = self._chapters.pop(chapter, None)
+        if size is not None:
+            self.size -= size
+
+    def _is_full(self):
+        if len(self._chapters) > self.max_chapters:
+            return True
+        return self.max_size is not None and self.size > self.max_size
+
+    def _evict(self):
+        # The last chapter is the most recently used one.
+        for chapter in list(self._chapters)[:-1]:
+            if not self._is_full():
+                break
+            if chapter is self.pinned:
+                continue
+            self.size -= self._chapters.pop(chapter)
+            log.debug("Unloading chapter. file=%s", chapter.file)
+            for callback in self.on_unload:
+                callback(chapter)
+            chapter.unload()
+
+    def __contains__(self, chapter):
+        return chapter in self._chapters
+
+    def __len__(self):
+        return len(self._chapters)
+
+
 class Book:
 
     """
@@ -93,6 +558,9 @@ class Book:
        print(chapter.chapters)
 
     :param root: Path to the root directory of the book
+    :param cache: Optional :py:class:`lira.cache.ChapterCache` used to parse chapters
+    :param residency: Optional :py:class:`ChapterResidency`
+     used to limit the number of parsed chapters kept in memory
     """
 
     meta_spec = {
@@ -106,8 +574,15 @@ class Book:
     }
     meta_file = "book.yaml"
 
-    def __init__(self, root: Path):
+    def __init__(
+        self,
+        root: Path,
+        cache: ChapterCache = None,
+        residency: ChapterResidency = None,
+    ):
         self.root = root
+        self.cache = cache
+        self.residency = residency
 
         self.metadata = {}
         """Dictionary with the metadata from the book"""
@@ -115,16 +590,65 @@ class Book:
         self.chapters = []
         """List of :py:class:`lira.book.BookChapter` instances"""
 
-    def parse(self, all: bool = False):
+    def parse(self, all: bool = False, workers: int = 1, use_threads: bool = False):
         """
         Parse the book metadata.
 
         :param all: If `True` all chapters are parsed as well
+        :param workers: Number of workers used to parse the chapters,
+         if it's `None` the number of processors of the machine is used.
+        :param use_threads: Use threads instead of processes to parse the chapters.
         """
         self.metadata = self._parse_metadata()
-        self.chapters = self._parse_chapters(
-            self.metadata["chapters"], parse_chapter=all
-        )
+        self.chapters = self._parse_chapters(self.metadata["chapters"])
+        if not all:
+            return
+        if workers == 1:
+            for chapter in self.chapters:
+                chapter.parse()
+        else:
+            self._parse_chapters_in_parallel(workers, use_threads)
+
+    def resolve_validators(self):
+        """
+        Resolve the validators of all test blocks from the book.
+
+        Validators are resolved on the first validation of each test block,
+        use this method to resolve all of them at once
+        (all chapters are parsed if they weren't parsed yet).
+
+        :raises lira.validators.ValidatorsResolutionError:
+         With all the validators that couldn't be resolved.
+        :returns: A dictionary with the dotted path and class of each validator.
+        """
+        paths = set()
+        for chapter in self.chapters:
+            if not chapter.is_parsed:
+                chapter.parse()
+            paths.update(_get_validator_paths(chapter.contents))
+        return resolve_validator_classes(sorted(paths), subclass=TestBlockValidator)
+
+    def dump_index(self):
+        """
+        Return the entry of the book for the catalog of books.
+
+        See :py:class:`lira.catalog.BookCatalog`.
+        """
+        return {
+            "metadata": self.metadata,
+            "chapters": [chapter.dump_index() for chapter in self.chapters],
+        }
+
+    def load_index(self, data):
+        """
+        Load the metadata and chapters of the book from :py:meth:`dump_index`.
+
+        The book doesn't need to be parsed after this.
+        """
+        self.metadata = data["metadata"]
+        self.chapters = self._parse_chapters(self.metadata["chapters"])
+        for chapter, entry in zip(self.chapters, data["chapters"]):
+            chapter._index = entry
 
     def _parse_metadata(self):
         meta_file = self.root / self.meta_file
@@ -136,7 +660,7 @@ class Book:
                 metadata[key] = val
         return metadata
 
-    def _parse_chapters(self, contents, parse_chapter=False):
+    def _parse_chapters(self, contents):
         chapters = []
         for title, file in contents.items():
             chapter = BookChapter(
@@ -144,11 +668,29 @@ class Book:
                 file=self.root / file,
                 title=title,
             )
-            if parse_chapter:
-                chapter.parse()
             chapters.append(chapter)
         return chapters
 
+    def _parse_chapters_in_parallel(self, workers, use_threads):
+        """
+        Parse all chapters using a pool of workers.
+
+        Chapters are parsed in the workers and sent back
+        using the format from :py:func:`lira.parsers.nodes.dump_nodes`.
+        Chapters found in the cache aren't sent to the workers.
+        """
+        pending = [chapter for chapter in self.chapters if not chapter._load_cached()]
+        if not pending:
+            return
+        # Imported here, since multiprocessing is slow to import.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            results = executor.map(_parse_file, [chapter.file for chapter in pending])
+            for chapter, (content, stat, metadata, data) in zip(pending, results):
+                chapter._set_contents(content, metadata, load_nodes(data), stat)
+
     def __repr__(self):
         title = self.metadata.get("title", "")
         return f"<Book: {title} -> {self.root.name}/>"
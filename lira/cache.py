@@ -0,0 +1,176 @@
+"""
+Persistent cache for parsed chapters.
+
+Parsing a chapter requires a full parse,
+this cache stores the result of parsing a chapter in disk,
+so only chapters that changed need to be parsed again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from lira import __version__
+from lira.parsers.nodes import dump_nodes, load_nodes
+
+log = logging.getLogger(__name__)
+
+
+class ChapterCache:
+
+    """
+    On-disk cache of parsed chapters.
+
+    Each entry is stored in its own file, and is keyed by the path of the chapter.
+    An entry is valid if the modification time and size of the chapter didn't change,
+    or if the hash of its content (and the version of lira) is the same.
+
+    .. code:: python
+
+       from pathlib import Path
+       from lira.cache import ChapterCache
+
+       cache = ChapterCache(Path('cache/'))
+       data = cache.get(Path('intro.rst'))
+       if data:
+           metadata, contents = data
+
+    :param root: Directory where the entries are stored.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _get_entry_file(self, file: Path):
+        name = hashlib.sha256(str(file.resolve()).encode()).hexdigest()
+        return self.root / f"{name}.json"
+
+    def _get_key(self, content: str):
+        data = f"{__version__}\n{content}".encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def _read_entry(self, file: Path):
+        entry_file = self._get_entry_file(file)
+        if not entry_file.exists():
+            return None
+        try:
+            with entry_file.open() as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Unable to read cache entry. file=%s error=%s", file, str(e))
+            return None
+        if entry.get("version") != __version__:
+            return None
+        return entry
+
+    def _write_entry(self, file: Path, entry):
+        entry_file = self._get_entry_file(file)
+        tmp_file = None
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            # The same entry can be written from several threads (like prefetches),
+            # each write uses its own temporary file.
+            fd, tmp_file = tempfile.mkstemp(
+                dir=self.root, prefix=f"{entry_file.stem}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_file, entry_file)
+        except OSError as e:
+            log.warning("Unable to write cache entry. file=%s error=%s", file, str(e))
+            if tmp_file:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+
+    def _load_data(self, entry):
+        try:
+            contents = load_nodes(entry["contents"])
+        except ValueError as e:
+            log.debug("Unable to load cache entry. error=%s", str(e))
+            return None
+        return entry["metadata"], contents
+
+    def get(self, file: Path, content: str = None, stat=None):
+        """
+        Get the metadata and contents of a chapter from the cache.
+
+        If `content` isn't given, the entry is validated
+        using the modification time and size of the file,
+        otherwise the hash of the content is used.
+
+        :param stat: Result of :py:func:`os.stat` on the file,
+         taken before reading `content`.
+         If it's `None`, the file is stat'ed when the entry is validated.
+        :returns: A tuple with the metadata and contents of the chapter,
+         or `None` if there isn't a valid entry.
+        """
+        entry = self._read_entry(file)
+        if not entry:
+            return None
+
+        if stat is None:
+            stat = file.stat()
+        if content is None:
+            if entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                return None
+            return self._load_data(entry)
+
+        if entry["key"] != self._get_key(content):
+            return None
+        data = self._load_data(entry)
+        if data:
+            # The file was touched, but its content didn't change.
+            entry["mtime"] = stat.st_mtime_ns
+            entry["size"] = stat.st_size
+            self._write_entry(file, entry)
+        return data
+
+    def get_chunks(self, file: Path):
+        """
+        Get the digests of the chunks of the chapter stored in the cache.
+
+        See :py:meth:`lira.book.BookChapter.parse`.
+
+        :returns: A list of digests, or `None` if there isn't an entry.
+        """
+        entry = self._read_entry(file)
+        if not entry:
+            return None
+        return entry.get("chunks")
+
+    def set(self, file: Path, content: str, metadata, contents, chunks=None, stat=None):
+        """
+        Save the metadata and contents of a chapter into the cache.
+
+        :param content: Source of the chapter.
+        :param chunks: Digests of the top-level sections of the chapter.
+        :param stat: Result of :py:func:`os.stat` on the file,
+         taken before reading `content`, so the entry isn't considered valid
+         if the file is modified while it's being parsed.
+         If it's `None`, the file is stat'ed when the entry is written.
+        """
+        if stat is None:
+            stat = file.stat()
+        entry = {
+            "version": __version__,
+            "path": str(file),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "key": self._get_key(content),
+            "metadata": metadata,
+            "contents": dump_nodes(contents),
+            "chunks": chunks,
+        }
+        self._write_entry(file, entry)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        if not self.root.exists():
+            return
+        for entry_file in self.root.glob("*.json"):
+            entry_file.unlink()
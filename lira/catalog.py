@@ -0,0 +1,148 @@
+"""
+Persistent index of the installed books.
+
+Showing the list of books only requires the metadata of each book,
+this index stores the metadata, chapters, and outline of each book in disk,
+so books don't need to be resolved or parsed on each launch.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from lira import __version__
+from lira.book import Book
+
+log = logging.getLogger(__name__)
+
+
+class BookCatalog:
+
+    """
+    On-disk index of books.
+
+    All entries are stored in a single file, and are keyed by the path of the book
+    from the configuration (see :py:meth:`lira.app.LiraApp.load_config`).
+    An entry is valid if the modification time of the directory of the book
+    and of its metadata file didn't change.
+
+    .. code:: python
+
+       from pathlib import Path
+       from lira.catalog import BookCatalog
+
+       catalog = BookCatalog(Path('catalog.json'))
+       catalog.load()
+       book = catalog.get('lira.books.intro')
+       if book:
+           print(book.metadata)
+
+    :param file: File where the index is stored.
+    """
+
+    def __init__(self, file: Path):
+        self.file = file
+        self._entries = {}
+        self._changed = False
+
+    def load(self):
+        """Read the index from disk, entries from other versions of lira are ignored."""
+        self._entries = {}
+        self._changed = False
+        if not self.file.exists():
+            return
+        try:
+            with self.file.open() as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Unable to read catalog. error=%s", str(e))
+            return
+        if data.get("version") == __version__:
+            self._entries = data["books"]
+
+    def save(self):
+        """Write the index to disk, it does nothing if it didn't change."""
+        if not self._changed:
+            return
+        data = {"version": __version__, "books": self._entries}
+        tmp_file = self.file.with_suffix(".tmp")
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("w") as f:
+                json.dump(data, f, separators=(",", ":"), default=str)
+            os.replace(tmp_file, self.file)
+            self._changed = False
+        except (OSError, TypeError) as e:
+            log.warning("Unable to write catalog. error=%s", str(e))
+
+    def _get_stat(self, root: Path):
+        return (
+            root.stat().st_mtime_ns,
+            (root / Book.meta_file).stat().st_mtime_ns,
+        )
+
+    def get(self, key: str, cache=None, residency=None):
+        """
+        Get a book from the index.
+
+        The book is returned with its metadata and chapters already loaded,
+        see :py:meth:`lira.book.Book.load_index`.
+
+        :param cache: Cache passed to the book,
+         see :py:class:`lira.cache.ChapterCache`.
+        :param residency: Residency manager passed to the book,
+         see :py:class:`lira.book.ChapterResidency`.
+        :returns: A :py:class:`lira.book.Book` instance,
+         or `None` if there isn't a valid entry.
+        """
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        root = Path(entry["root"])
+        try:
+            if list(self._get_stat(root)) != entry["mtime"]:
+                return None
+        except OSError:
+            return None
+        book = Book(root=root, cache=cache, residency=residency)
+        try:
+            book.load_index(entry["book"])
+        except (KeyError, TypeError, ValueError) as e:
+            log.warning("Unable to load catalog entry. key=%s error=%s", key, str(e))
+            return None
+        return book
+
+    def set(self, key: str, book: Book):
+        """
+        Add a book to the index.
+
+        The book needs to be parsed,
+        the source of each chapter is read to get its outline.
+        """
+        self._entries[key] = {
+            "root": str(book.root),
+            "mtime": list(self._get_stat(book.root)),
+            "book": book.dump_index(),
+        }
+        self._changed = True
+
+    def retain(self, keys):
+        """Remove all entries that aren't in `keys`."""
+        keys = set(keys)
+        for key in list(self._entries):
+            if key not in keys:
+                del self._entries[key]
+                self._changed = True
+
+    def clear(self):
+        """Remove all entries from the index."""
+        if self._entries:
+            self._changed = True
+        self._entries = {}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -28,3 +28,5 @@ CONFIG_DIR = _get_config_dir()
 CONFIG_FILE = CONFIG_DIR / "config.yaml"
 DATA_DIR = _get_data_dir()
 LOG_DIR = DATA_DIR / "log"
+CACHE_DIR = DATA_DIR / "cache"
+CATALOG_FILE = DATA_DIR / "catalog.json"
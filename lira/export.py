@@ -0,0 +1,223 @@
+"""
+Render books into files, without the terminal UI.
+
+The content of each chapter is rendered with :py:class:`lira.tui.render.Renderer`,
+and written as plain text, ANSI escape sequences, or HTML.
+"""
+
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from prompt_toolkit.data_structures import Size
+from prompt_toolkit.output.color_depth import ColorDepth
+from prompt_toolkit.output.vt100 import ANSI_COLORS_TO_RGB, Vt100_Output
+from prompt_toolkit.styles import default_pygments_style, default_ui_style, merge_styles
+
+from lira.book import BookChapter
+from lira.parsers.nodes import Section
+from lira.tui.render import Renderer
+from lira.tui.themes import style as lira_style
+
+FORMATS = {
+    "plain": ".txt",
+    "ansi": ".ansi",
+    "html": ".html",
+}
+"""Supported formats and the extension of their files."""
+
+MIN_CHAPTERS_PER_WORKER = 8
+"""
+Min number of chapters rendered by each process of the pool.
+
+Starting the processes and sending the chapters to them costs more
+than rendering a few chapters in the current process.
+"""
+
+_style = merge_styles([default_ui_style(), default_pygments_style(), lira_style])
+
+_html_header = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+<pre>"""
+
+_html_footer = """</pre>
+</body>
+</html>
+"""
+
+
+def _write_plain(items, file):
+    for item in items:
+        for _, text, *_ in item:
+            file.write(text)
+    file.write("\n")
+
+
+def _write_ansi(items, file):
+    output = Vt100_Output(
+        stdout=file,
+        get_size=lambda: Size(rows=24, columns=80),
+        term="xterm-256color",
+        write_binary=False,
+    )
+    color_depth = ColorDepth.DEPTH_8_BIT
+    cache = {}
+    current_attrs = None
+    for i, item in enumerate(items, start=1):
+        for style_str, text, *_ in item:
+            attrs = cache.get(style_str)
+            if attrs is None:
+                attrs = cache[style_str] = _style.get_attrs_for_style_str(style_str)
+            if attrs != current_attrs:
+                output.set_attributes(attrs, color_depth)
+                current_attrs = attrs
+            output.write(text)
+        # The output is buffered till it's flushed.
+        if i % 100 == 0:
+            output.flush()
+    output.reset_attributes()
+    output.write("\n")
+    output.flush()
+
+
+def _get_css_color(color):
+    if color in ANSI_COLORS_TO_RGB:
+        return "#{:02x}{:02x}{:02x}".format(*ANSI_COLORS_TO_RGB[color])
+    if color and color != "default":
+        return f"#{color}"
+    return None
+
+
+def _get_css(style_str, cache):
+    css = cache.get(style_str)
+    if css is not None:
+        return css
+    attrs = _style.get_attrs_for_style_str(style_str)
+    rules = []
+    color = _get_css_color(attrs.color)
+    if color:
+        rules.append(f"color: {color}")
+    bgcolor = _get_css_color(attrs.bgcolor)
+    if bgcolor:
+        rules.append(f"background-color: {bgcolor}")
+    if attrs.bold:
+        rules.append("font-weight: bold")
+    if attrs.italic:
+        rules.append("font-style: italic")
+    if attrs.underline:
+        rules.append("text-decoration: underline")
+    css = cache[style_str] = "; ".join(rules)
+    return css
+
+
+def _write_html(items, file, title):
+    file.write(_html_header.format(title=html.escape(title)))
+    cache = {}
+    # Consecutive fragments with the same style are written in the same span.
+    current_css = ""
+    for item in items:
+        for style_str, text, *_ in item:
+            if not text:
+                continue
+            css = _get_css(style_str, cache)
+            if css != current_css:
+                if current_css:
+                    file.write("</span>")
+                if css:
+                    file.write(f'<span style="{css}">')
+                current_css = css
+            file.write(html.escape(text))
+    if current_css:
+        file.write("</span>")
+    file.write(_html_footer)
+
+
+def export_chapter(file: Path, title: str, output: Path, format: str, width: int):
+    """
+    Render a chapter and write it into a file.
+
+    The content is written as it's rendered,
+    so the chapter isn't kept in memory.
+    It's a plain function, so it can be called from a worker.
+
+    :param file: Source of the chapter.
+    :param title: Title of the chapter.
+    :param output: File where the result is written.
+    :param format: One of :py:data:`FORMATS`.
+    :param width: Width used to render the chapter.
+    :returns: The path of the output file.
+    """
+    parser = BookChapter.parser_class(content=file.read_text(), source=file)
+    try:
+        contents = parser.parse_content()
+    finally:
+        parser.close()
+    section = Section(children=contents, attributes={"title": title})
+    renderer = Renderer(tui=None, section=section, width=width)
+    items = renderer.iter_render()
+    with output.open("w", encoding="utf-8") as f:
+        if format == "html":
+            _write_html(items, f, title=title)
+        elif format == "ansi":
+            _write_ansi(items, f)
+        else:
+            _write_plain(items, f)
+    return output
+
+
+def export_books(books, output: Path, format="plain", width=80, workers=1):
+    """
+    Render all chapters from `books` into files.
+
+    Each book is written into a directory with the name of the directory of the book,
+    with a file for each chapter (at the same path of the chapter inside the book).
+    Chapters are rendered in the current process,
+    or in parallel using a pool of processes if more workers are requested
+    and there are enough chapters (see :py:data:`MIN_CHAPTERS_PER_WORKER`).
+
+    .. code:: python
+
+       from pathlib import Path
+       from lira.book import Book
+       from lira.export import export_books
+
+       book = Book(Path('books/intro/'))
+       for file in export_books([book], Path('build/'), format='html'):
+           print(file)
+
+    :param format: One of :py:data:`FORMATS`.
+    :param workers: Max number of processes used to render the chapters,
+     if it's `None` the number of processors of the machine is used.
+    :returns: An iterator with the path of each file as soon as it's written.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+    jobs = []
+    for book in books:
+        book.parse()
+        book_output = output / book.root.name
+        for chapter in book.chapters:
+            # Keep the directories of the chapters, so their names don't collide.
+            file = book_output / chapter.file.relative_to(book.root)
+            file = file.with_suffix(FORMATS[format])
+            file.parent.mkdir(parents=True, exist_ok=True)
+            jobs.append((chapter.file, chapter.title, file, format, width))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs) // MIN_CHAPTERS_PER_WORKER)
+    if workers <= 1:
+        for job in jobs:
+            yield export_chapter(*job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export_chapter, *job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
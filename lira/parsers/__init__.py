@@ -25,6 +25,14 @@ class BaseParser:
     def parse_content(self):
         raise NotImplementedError
 
+    def close(self):
+        """
+        Release the resources used by the parser (like the docutils document).
+
+        Nodes returned by :py:meth:`parse_content` aren't affected,
+        but the parser can't be used after this.
+        """
+
 
 class State(Enum):
     UNKNOWN = "unknown"
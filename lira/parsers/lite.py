@@ -0,0 +1,492 @@
+"""
+Fast parser for the reduced reStructuredText syntax used by lira books.
+
+Lira books only make use of a small subset of reStructuredText
+(see ``design/format.md``):
+
+- A field list at the start of the document with the metadata.
+- Sections.
+- Paragraphs with inline strong, emphasis and literal text.
+- The ``code-block`` and ``test-block`` directives.
+- Comments.
+
+:py:class:`LiteRSTParser` tokenizes this subset directly,
+without paying the cost of docutils.
+If the content makes use of anything else,
+the parser falls back to :py:class:`lira.parsers.rst.RSTParser`.
+"""
+
+import logging
+import re
+import unicodedata
+
+from lira.parsers import BaseParser, State
+from lira.parsers import nodes as booknodes
+from lira.parsers.utils import guess_extension, validate_state
+
+logger = logging.getLogger(__name__)
+
+# ASCII versions of the punctuation characters used by docutils
+# to recognize inline markup, non-ASCII punctuation isn't supported.
+_openers = "\"'(<[{"
+_closers = "\"')>]}"
+_delimiters = "-/:"
+_closing_delimiters = "\\.,;!?"
+
+_start_string_prefix = r"(?:^|(?<=[\s%s%s]))" % (
+    re.escape(_openers),
+    re.escape(_delimiters),
+)
+_end_string_suffix = r"(?:$|(?=[\s%s%s%s]))" % (
+    re.escape(_closing_delimiters),
+    re.escape(_delimiters),
+    re.escape(_closers),
+)
+_inline_start = re.compile(_start_string_prefix + r"(\*\*|\*(?!\*)|``)(?![ \n])")
+_inline_end = {
+    "**": re.compile(r"(?<![ \n])(\*\*)" + _end_string_suffix),
+    "*": re.compile(r"(?<![ \n])(\*)" + _end_string_suffix),
+    "``": re.compile(r"(?<![ \n])(``)" + _end_string_suffix),
+}
+_inline_nodes = {
+    "**": booknodes.Strong,
+    "*": booknodes.Emphasis,
+    "``": booknodes.Literal,
+}
+# Interpreted text, references, substitutions, footnotes,
+# standalone URIs and emails.
+_unsupported_inline = re.compile(
+    r"`|\||\\|\]_|\w__?(?!\w)|[a-zA-Z][a-zA-Z0-9.+-]*:\S|@"
+)
+
+_markup_boundary = re.compile(r"[^\x00-\x7f](?=[*`])|(?<=[*`])[^\x00-\x7f]")
+
+_simplename = r"(?:(?!_)\w)+(?:[-._+:](?:(?!_)\w)+)*"
+_directive = re.compile(r"\.\.[ ]+(%s)[ ]?::([ ]+|$)" % _simplename)
+_field_marker = re.compile(r":(?![: ])((?:[^:\\]|\\.|:(?!([ `]|$)))*)(?<! ):( +|$)")
+_adornment = re.compile(r"([!-/:-@\[-`{-~])\1*$")
+_unsupported_blocks = [
+    # Bullet lists
+    re.compile(r"[-+*•‣⁃]( +|$)"),
+    # Enumerated lists
+    re.compile(
+        r"\(?([0-9]+|[a-z]|[A-Z]|[ivxlcdm]+|[IVXLCDM]+|#)[.)]( +|$)",
+    ),
+    # Field lists (only allowed at the start of the document),
+    # option lists, doctest blocks, line blocks and tables.
+    re.compile(r":|-|\+|/[a-zA-Z0-9]|>>>( +|$)|\|( +|$)|=+( +=+)+ *$"),
+    # Anonymous targets
+    re.compile(r"__( +|$)"),
+]
+
+
+class UnsupportedSyntax(Exception):
+
+    """Raised when the content uses syntax outside the subset supported."""
+
+    pass
+
+
+def _column_width(text):
+    width = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+    return width - len([c for c in text if unicodedata.combining(c)])
+
+
+def _check_markup_boundaries(text):
+    """
+    Check that there isn't non-ASCII punctuation around inline markup.
+
+    Docutils uses unicode punctuation to recognize inline markup,
+    we only support ASCII punctuation.
+    """
+    for match in _markup_boundary.finditer(text):
+        char = match.group()
+        if not (char.isalnum() or unicodedata.combining(char)):
+            raise UnsupportedSyntax("Non-ASCII punctuation around inline markup")
+
+
+def parse_inline(text):
+    """
+    Parse the inline markup from `text`.
+
+    It follows the same rules as docutils to recognize inline markup.
+
+    :returns: A list of tuples with the node class and its content.
+    :raises UnsupportedSyntax: If the text contains unsupported inline markup.
+    """
+    _check_markup_boundaries(text)
+    result = []
+    remaining = text
+    while remaining:
+        match = _inline_start.search(remaining)
+        if not match:
+            break
+        start, end = match.span(1)
+        if start > 0:
+            # Ignore start-strings at the end of the text,
+            # or surrounded by quotes or brackets, like "*".
+            quoted = end == len(remaining)
+            if not quoted:
+                index = _openers.find(remaining[start - 1])
+                quoted = index != -1 and remaining[end] == _closers[index]
+            if quoted:
+                result.append((booknodes.Text, remaining[:end]))
+                remaining = remaining[end:]
+                continue
+        markup = match.group(1)
+        end_match = _inline_end[markup].search(remaining[end:])
+        if not end_match or not end_match.start(1):
+            raise UnsupportedSyntax("Inline start-string without end-string")
+        result.append((booknodes.Text, remaining[:start]))
+        content_end = end + end_match.start(1)
+        result.append((_inline_nodes[markup], remaining[end:content_end]))
+        remaining = remaining[end + end_match.end(1) :]
+    result.append((booknodes.Text, remaining))
+
+    # Merge consecutive text nodes, and remove empty ones.
+    nodes = []
+    for node_class, content in result:
+        if not content:
+            continue
+        if node_class is not booknodes.Literal and _unsupported_inline.search(content):
+            raise UnsupportedSyntax("Inline markup not supported")
+        if node_class is booknodes.Text and nodes and nodes[-1][0] is node_class:
+            nodes[-1] = (node_class, nodes[-1][1] + content)
+        else:
+            nodes.append((node_class, content))
+    return nodes
+
+
+def _inline_text(text):
+    return "".join(content for _, content in parse_inline(text))
+
+
+class _Tokenizer:
+
+    """
+    Split the content into a tree of blocks.
+
+    Blocks are tuples, the first element is the type of the block.
+
+    - ``("section", title, children)``
+    - ``("paragraph", inline_nodes)``
+    - ``("code-block", language, lines)``
+    - ``("test-block", description, options, lines)``
+    """
+
+    def __init__(self, content):
+        if "\t" in content or "\v" in content or "\f" in content:
+            raise UnsupportedSyntax("Tabs aren't supported")
+        self.lines = [line.rstrip() for line in content.splitlines()]
+        self.index = 0
+        self.metadata = {}
+        self.blocks = []
+        self.styles = []
+        # Stack of (level, children) tuples of the open sections.
+        self.sections = [(0, self.blocks)]
+
+    @property
+    def line(self):
+        return self.lines[self.index]
+
+    def _next_line(self, offset=1):
+        index = self.index + offset
+        if index < len(self.lines):
+            return self.lines[index]
+        return None
+
+    def _skip_blank_lines(self):
+        while self.index < len(self.lines) and not self.line:
+            self.index += 1
+
+    def _check_blank_finish(self):
+        """Make sure the block is followed by a blank line or the end of the file."""
+        if self.index < len(self.lines) and self.line:
+            raise UnsupportedSyntax("Block ends without a blank line")
+
+    def tokenize(self):
+        self._skip_blank_lines()
+        if self.index < len(self.lines) and _field_marker.match(self.line):
+            self._parse_metadata()
+        while True:
+            self._skip_blank_lines()
+            if self.index >= len(self.lines):
+                break
+            line = self.line
+            if line[0].isspace():
+                raise UnsupportedSyntax("Indented blocks aren't supported")
+            if _directive.match(line) or line.startswith(".. ") or line == "..":
+                self._parse_explicit_markup()
+            elif not self._parse_title():
+                self._parse_paragraph()
+        return self.metadata, self.blocks
+
+    def _check_block_start(self, line):
+        for pattern in _unsupported_blocks:
+            if pattern.match(line):
+                raise UnsupportedSyntax(f"Block not supported: {line}")
+
+    def _parse_metadata(self):
+        while self.index < len(self.lines):
+            match = _field_marker.match(self.line)
+            if not match:
+                break
+            name = _inline_text(match.group(1))
+            value = self.line[match.end() :]
+            self.index += 1
+            next_line = self._next_line(offset=0)
+            if next_line and next_line[0].isspace():
+                raise UnsupportedSyntax("Multi-line fields aren't supported")
+            if value:
+                self._check_block_start(value)
+                if value.endswith("::"):
+                    raise UnsupportedSyntax("Literal blocks aren't supported")
+            self.metadata[name] = _inline_text(value)
+            self._check_blank_finish_or_field()
+            self._skip_blank_lines()
+
+    def _check_blank_finish_or_field(self):
+        if self.index < len(self.lines) and self.line:
+            if not _field_marker.match(self.line):
+                raise UnsupportedSyntax("Field list ends without a blank line")
+
+    def _parse_title(self):
+        line = self.line
+        next_line = self._next_line()
+        if _adornment.match(line):
+            # Title with overline and underline.
+            underline = self._next_line(offset=2)
+            if next_line is None or underline != line or not next_line.strip():
+                raise UnsupportedSyntax("Transitions aren't supported")
+            if len(line) < 4:
+                # Docutils treats short overlines as text.
+                raise UnsupportedSyntax("Title overline too short")
+            if _column_width(next_line) > len(line):
+                raise UnsupportedSyntax("Title overline too short")
+            title = next_line.strip()
+            style = (line[0], True)
+            length = 3
+        elif next_line and _adornment.match(next_line):
+            # Title with only underline.
+            self._check_block_start(line)
+            title = line
+            if _column_width(title) > len(next_line):
+                raise UnsupportedSyntax("Title underline too short")
+            style = (next_line[0], False)
+            length = 2
+        else:
+            return False
+
+        if style not in self.styles:
+            if len(self.styles) != self.sections[-1][0]:
+                raise UnsupportedSyntax("Title level inconsistent")
+            self.styles.append(style)
+        level = self.styles.index(style) + 1
+        while self.sections[-1][0] >= level:
+            self.sections.pop()
+        if level != self.sections[-1][0] + 1:
+            raise UnsupportedSyntax("Title level inconsistent")
+        children = []
+        self.sections[-1][1].append(("section", _inline_text(title), children))
+        self.sections.append((level, children))
+        self.index += length
+        return True
+
+    def _parse_paragraph(self):
+        self._check_block_start(self.line)
+        lines = []
+        while self.index < len(self.lines) and self.line:
+            line = self.line
+            if line[0].isspace():
+                raise UnsupportedSyntax("Definition lists aren't supported")
+            if lines and _adornment.match(line):
+                raise UnsupportedSyntax("Unexpected section title or transition")
+            lines.append(line)
+            self.index += 1
+        text = "\n".join(lines)
+        if text.endswith("::"):
+            raise UnsupportedSyntax("Literal blocks aren't supported")
+        self.sections[-1][1].append(("paragraph", parse_inline(text)))
+
+    def _get_indented_block(self):
+        """
+        Get the indented block following the current line.
+
+        The indentation of the block is removed,
+        and trailing blank lines are ignored.
+        """
+        start = self.index + 1
+        end = start
+        while end < len(self.lines):
+            line = self.lines[end]
+            if line and not line[0].isspace():
+                break
+            end += 1
+        self.index = end
+        while end > start and not self.lines[end - 1]:
+            end -= 1
+        if self.index == end:
+            # Explicit markup blocks can be followed by other explicit markup blocks.
+            next_line = self._next_line(offset=0)
+            if not (next_line and (next_line == ".." or next_line.startswith(".. "))):
+                self._check_blank_finish()
+        block = self.lines[start:end]
+        indents = [len(line) - len(line.lstrip()) for line in block if line]
+        indent = min(indents, default=0)
+        return [line[indent:] for line in block]
+
+    def _parse_explicit_markup(self):
+        line = self.line
+        match = _directive.match(line)
+        if not match:
+            if line == ".." or re.match(r"\.\.[ ]+[\[_|]", line) or "::" in line:
+                raise UnsupportedSyntax(f"Explicit markup not supported: {line}")
+            # Just a comment.
+            self._get_indented_block()
+            return
+
+        name = match.group(1)
+        first_line = line[match.end() :]
+        block = self._get_indented_block()
+        if name == "code-block":
+            self._parse_code_block(first_line, block)
+        elif name == "test-block":
+            self._parse_test_block(first_line, block)
+        else:
+            raise UnsupportedSyntax(f"Directive not supported: {name}")
+
+    def _split_directive_block(self, first_line, block):
+        """Split the block into the argument, options, and content blocks."""
+        if not first_line.strip():
+            raise UnsupportedSyntax("Directive without arguments")
+        lines = [first_line] + block
+        try:
+            index = lines.index("")
+        except ValueError:
+            index = len(lines)
+        arguments = lines[:index]
+        content = lines[index + 1 :]
+        while content and not content[0]:
+            content.pop(0)
+        options = []
+        for i, line in enumerate(arguments):
+            if _field_marker.match(line):
+                options = arguments[i:]
+                arguments = arguments[:i]
+                break
+        return arguments, options, content
+
+    def _parse_code_block(self, first_line, block):
+        arguments, options, content = self._split_directive_block(first_line, block)
+        arguments = "\n".join(arguments + options).split()
+        if len(arguments) != 1:
+            raise UnsupportedSyntax("Code blocks only accept one argument")
+        self.sections[-1][1].append(("code-block", arguments[0], content))
+
+    def _parse_test_block(self, first_line, block):
+        arguments, option_lines, content = self._split_directive_block(
+            first_line, block
+        )
+        text = "\n".join(arguments)
+        if not text.split():
+            raise UnsupportedSyntax("Test blocks require a description")
+        if len(text.split()) == 1:
+            description = text.strip()
+        else:
+            description = text.split(None, 0)[0]
+
+        options = {}
+        for line in option_lines:
+            match = _field_marker.match(line)
+            if not match:
+                raise UnsupportedSyntax("Multi-line options aren't supported")
+            name = _inline_text(match.group(1)).lower()
+            value = parse_inline(line[match.end() :])
+            if name in options or len(value) != 1 or value[0][0] != booknodes.Text:
+                raise UnsupportedSyntax(f"Invalid option: {line}")
+            value = value[0][1]
+            if name == "state":
+                try:
+                    value = validate_state(value)
+                except ValueError:
+                    raise UnsupportedSyntax(f"Invalid state: {value}")
+            elif name not in ("validator", "language"):
+                raise UnsupportedSyntax(f"Unknown option: {name}")
+            options[name] = value
+        if "validator" not in options:
+            raise UnsupportedSyntax("Test blocks require a validator")
+        self.sections[-1][1].append(("test-block", description, options, content))
+
+
+class LiteRSTParser(BaseParser):
+
+    """
+    Fast parser for the subset of reStructuredText used by lira books.
+
+    It produces the same nodes as :py:class:`lira.parsers.rst.RSTParser`,
+    and it falls back to it if the content uses anything outside the subset.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fallback = None
+        """Parser used if the content isn't supported by this parser."""
+
+        try:
+            self.metadata, self.blocks = _Tokenizer(self.content).tokenize()
+        except UnsupportedSyntax as e:
+            logger.debug(
+                "Falling back to docutils. source=%s reason=%s", self.source, str(e)
+            )
+            # Imported here, so docutils is only loaded if it's needed.
+            from lira.parsers.rst import RSTParser
+
+            self.fallback = RSTParser(content=self.content, source=self.source)
+
+    def parse_metadata(self):
+        if self.fallback:
+            return self.fallback.parse_metadata()
+        return dict(self.metadata)
+
+    def parse_content(self):
+        if self.fallback:
+            return self.fallback.parse_content()
+        return [self._build_node(block) for block in self.blocks]
+
+    def close(self):
+        if self.fallback:
+            self.fallback.close()
+        self.blocks = None
+
+    def _build_node(self, block):
+        tag = block[0]
+        if tag == "section":
+            _, title, children = block
+            return booknodes.Section(
+                children=[self._build_node(child) for child in children],
+                attributes=dict(title=title),
+            )
+        if tag == "paragraph":
+            return booknodes.Paragraph(
+                children=[
+                    node_class(content=content) for node_class, content in block[1]
+                ],
+            )
+        if tag == "code-block":
+            _, language, content = block
+            return booknodes.CodeBlock(
+                content=list(content),
+                attributes=dict(language=language),
+            )
+        _, description, options, content = block
+        language = options.get("language")
+        return booknodes.TestBlock(
+            content=list(content),
+            attributes=dict(
+                validator=options["validator"],
+                description=description,
+                state=options.get("state", State.UNKNOWN),
+                language=language,
+                extension=guess_extension(language),
+            ),
+        )
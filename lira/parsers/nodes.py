@@ -1,17 +1,89 @@
-from copy import copy
+from itertools import count
 
+from lira.parsers import State
 from lira.validators import TestBlockValidator, get_validator_class
 
+DATA_VERSION = 1
+"""Version of the format used by :py:meth:`Node.to_data`."""
 
-def _get_attributes_proxy(attributes, **values):
-    class AttributesProxy:
-        __slots__ = attributes
 
-        def __init__(self, **kwargs):
-            for item, value in kwargs.items():
-                setattr(self, item, value)
+class _Unchanged:
+    def __reduce__(self):
+        # Keep the identity of the marker when nodes are pickled or copied.
+        return "_unchanged"
+
+
+_unchanged = _Unchanged()
+"""Marker for a value that wasn't modified since the node was created."""
 
-    return AttributesProxy(**values)
+
+_node_classes = {}
+"""Node classes by their tag name."""
+
+_versions = count(1)
+"""Counter used to assign a new version to modified nodes."""
+
+
+def _create_attributes_class(node_class):
+    """
+    Create the class used to hold the attributes of `node_class`.
+
+    The class only accepts the attributes from ``node_class.valid_attributes``.
+    A snapshot of the initial values is taken the first time
+    an attribute is modified, so they can be restored with ``_reset()``.
+    Modifying an attribute updates the version of the node
+    (see :py:attr:`Node.version`).
+    """
+    names = tuple(sorted(node_class.valid_attributes))
+
+    class Attributes:
+        __slots__ = names + ("_initial", "_node")
+
+        def __init__(self, _node=None, **kwargs):
+            for item, value in kwargs.items():
+                object.__setattr__(self, item, value)
+            object.__setattr__(self, "_initial", _unchanged)
+            object.__setattr__(self, "_node", _node)
+
+        def __setattr__(self, name, value):
+            if self._initial is _unchanged:
+                initial = {
+                    name: getattr(self, name) for name in names if hasattr(self, name)
+                }
+                object.__setattr__(self, "_initial", initial)
+            object.__setattr__(self, name, value)
+            if self._node is not None:
+                self._node._touch()
+
+        def __getstate__(self):
+            return {
+                name: getattr(self, name)
+                for name in self.__slots__
+                if hasattr(self, name)
+            }
+
+        def __setstate__(self, state):
+            # Restore the values as they were,
+            # without taking a snapshot or updating the version of the node.
+            for name, value in state.items():
+                object.__setattr__(self, name, value)
+
+        def _reset(self):
+            if self._initial is _unchanged:
+                return
+            for name in names:
+                if name in self._initial:
+                    object.__setattr__(self, name, self._initial[name])
+                elif hasattr(self, name):
+                    object.__delattr__(self, name)
+            object.__setattr__(self, "_initial", _unchanged)
+            if self._node is not None:
+                self._node._touch()
+
+    # Make the class importable from the node class (so it can be pickled).
+    Attributes.__module__ = node_class.__module__
+    Attributes.__qualname__ = f"{node_class.__qualname__}.Attributes"
+    return Attributes
 
 
 class Node:
@@ -33,21 +105,43 @@ class Node:
     valid_attributes = set()
     """A set of valid attributes for this node."""
 
+    Attributes = None
+    """
+    Class of the :py:attr:`attributes` of this node.
+
+    It's created for each subclass from its :py:attr:`valid_attributes`.
+    """
+
+    __slots__ = (
+        "_content",
+        "children",
+        "attributes",
+        "parent",
+        "_initial_content",
+        "_version",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.Attributes = _create_attributes_class(cls)
+        _node_classes[cls.__name__] = cls
+
     def __init__(self, content=None, *, children=None, attributes=None):
         if self.is_terminal and children:
             raise ValueError("A terminal node can't have children")
         if not self.is_terminal and content:
             raise ValueError("A no terminal node can't have content")
 
-        self.content = content
-        """Raw content of the node"""
+        self._content = content
+        self._initial_content = _unchanged
+        self._version = 0
 
         self.children = children or []
         """List of children of this node."""
 
         attributes = attributes or {}
-        self.attributes = _get_attributes_proxy(self.valid_attributes, **attributes)
-        """Named tuple with the attributes for this node"""
+        self.attributes = self.Attributes(_node=self, **attributes)
+        """Object with the attributes for this node"""
 
         self.parent = None
         """Parent node"""
@@ -55,8 +149,37 @@ class Node:
         for child in self.children:
             child.parent = self
 
-        self._initial_attributes = copy(self.attributes)
-        self._initial_content = copy(self.content)
+    @property
+    def content(self):
+        """Raw content of the node."""
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        # Keep the initial content only if the node is modified,
+        # the content should be replaced, not modified in place.
+        if self._initial_content is _unchanged:
+            self._initial_content = self._content
+        self._content = value
+        self._touch()
+
+    @property
+    def version(self):
+        """
+        Version of the node.
+
+        It changes each time the content or attributes of the node
+        or any of its descendants are modified.
+        """
+        return self._version
+
+    def _touch(self):
+        """Assign a new version to the node and its ancestors."""
+        version = next(_versions)
+        node = self
+        while node is not None:
+            node._version = version
+            node = node.parent
 
     def _trim_text(self, text, max_len=30):
         split = text.split("\n")
@@ -65,10 +188,51 @@ class Node:
             text = text[:max_len] + "..."
         return text
 
+    def to_data(self):
+        """
+        Convert the node into a compact structure of plain python objects.
+
+        The node is represented as a list with its tag name, content,
+        attributes, and children (trailing empty values are omitted).
+        The result can be serialized as JSON, or sent to another process.
+        Use :py:meth:`from_data` to convert it back into a node.
+        """
+        attributes = {}
+        for name in sorted(self.valid_attributes):
+            if hasattr(self.attributes, name):
+                attributes[name] = _encode_value(getattr(self.attributes, name))
+        children = [child.to_data() for child in self.children]
+        data = [self.tagname, self.content, attributes, children]
+        if not children:
+            data.pop()
+            if not attributes:
+                data.pop()
+                if self.content is None:
+                    data.pop()
+        return data
+
+    @staticmethod
+    def from_data(data):
+        """Create a node from the result of :py:meth:`to_data`."""
+        tag, content, attributes, children = list(data) + [None] * (4 - len(data))
+        node_class = _node_classes.get(tag)
+        if not node_class:
+            raise ValueError(f"Unknown node: {tag}")
+        return node_class(
+            content=content,
+            children=[Node.from_data(child) for child in children or []],
+            attributes={
+                name: _decode_value(value) for name, value in (attributes or {}).items()
+            },
+        )
+
     def reset(self):
         """Reset attributes and content of the node to their initial values."""
-        self.content = copy(self._initial_content)
-        self.attributes = copy(self._initial_attributes)
+        if self._initial_content is not _unchanged:
+            self._content = self._initial_content
+            self._initial_content = _unchanged
+            self._touch()
+        self.attributes._reset()
 
     def text(self):
         """Text representation of the node."""
@@ -86,7 +250,48 @@ class Node:
         return f"<{self.tagname}: {self.children}>"
 
 
+Node.Attributes = _create_attributes_class(Node)
+
+
+def _encode_value(value):
+    if isinstance(value, State):
+        return {"State": value.value}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return State(value["State"])
+    return value
+
+
+def dump_nodes(nodes):
+    """
+    Convert a list of nodes into a versioned structure of plain python objects.
+
+    See :py:meth:`Node.to_data`.
+    """
+    return {
+        "version": DATA_VERSION,
+        "nodes": [node.to_data() for node in nodes],
+    }
+
+
+def load_nodes(data):
+    """
+    Convert the result of :py:func:`dump_nodes` back into a list of nodes.
+
+    :raises ValueError: If the data is from another version of the format.
+    """
+    version = data.get("version") if isinstance(data, dict) else None
+    if version != DATA_VERSION:
+        raise ValueError(f"Unsupported version: {version}")
+    return [Node.from_data(item) for item in data["nodes"]]
+
+
 class NestedNode(Node):
+    __slots__ = ()
+
     def text(self):
         content = [child.text() for child in self.children]
         return "\n\n".join(content)
@@ -105,6 +310,8 @@ class Paragraph(Node):
     - :py:class:`Literal`
     """
 
+    __slots__ = ()
+
     def text(self):
         content = [child.text() for child in self.children]
         return "".join(content)
@@ -115,6 +322,7 @@ class Text(Node):
     """Plain text node."""
 
     is_terminal = True
+    __slots__ = ()
 
 
 class Strong(Node):
@@ -122,6 +330,7 @@ class Strong(Node):
     """Text represented as **bold**."""
 
     is_terminal = True
+    __slots__ = ()
 
 
 class Emphasis(Node):
@@ -129,6 +338,7 @@ class Emphasis(Node):
     """Text represented as *italics*."""
 
     is_terminal = True
+    __slots__ = ()
 
 
 class Literal(Node):
@@ -136,6 +346,7 @@ class Literal(Node):
     """Text represented with a ``mono space font``."""
 
     is_terminal = True
+    __slots__ = ()
 
 
 class Section(NestedNode):
@@ -156,6 +367,7 @@ class Section(NestedNode):
     """
 
     valid_attributes = {"title"}
+    __slots__ = ()
 
     def __repr__(self):
         title = self.attributes.title
@@ -178,6 +390,7 @@ class Admonition(NestedNode):
     """
 
     valid_attributes = {"title", "type"}
+    __slots__ = ()
 
     def __repr__(self):
         title = self.attributes.title
@@ -198,6 +411,7 @@ class CodeBlock(Node):
 
     is_terminal = True
     valid_attributes = {"language"}
+    __slots__ = ()
 
     def text(self):
         return "\n".join(self.content)
@@ -224,10 +438,13 @@ class TestBlock(Node):
 
     is_terminal = True
     valid_attributes = {"validator", "description", "state", "language", "extension"}
+    __slots__ = ("_validator",)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._validator = self._get_validator()
+        # The validator is created on the first validation,
+        # so parsing a chapter doesn't import the validators.
+        self._validator = None
 
     def _get_validator(self):
         class_ = get_validator_class(
@@ -241,10 +458,12 @@ class TestBlock(Node):
 
     def reset(self):
         super().reset()
-        self._validator = self._get_validator()
+        self._validator = None
 
     def validate(self):
         """Run the validator for this node."""
+        if not self._validator:
+            self._validator = self._get_validator()
         return self._validator.run()
 
     def __repr__(self):
@@ -258,3 +477,4 @@ class Prompt(Node):
     # TODO
 
     is_terminal = True
+    __slots__ = ()
@@ -0,0 +1,167 @@
+"""
+Lightweight scanner for the outline of a reStructuredText document.
+
+The outline is extracted directly from the source, without docutils,
+it's useful when only the titles of the sections are needed
+(like when listing the sections of a chapter).
+"""
+
+import re
+
+_adornment_chars = set("!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~")
+_inline_markup = re.compile(r"(\*\*|\*|``)(\S|\S.*?\S)\1")
+_test_block = re.compile(r"^\s*\.\. test-block::")
+
+
+class OutlineSection:
+
+    """
+    Section found by :py:func:`scan_outline`.
+
+    :param title: Title of the section (without inline markup)
+    :param level: Heading level, starting at 1
+    :param line: Line number (zero-indexed) where the section header starts
+    """
+
+    def __init__(self, title: str, level: int, line: int):
+        self.title = title
+        self.level = level
+        self.line = line
+
+        self.test_blocks = 0
+        """Number of test blocks in the section (including its sub-sections)."""
+
+        self.children = []
+        """List of sub-sections."""
+
+    def __repr__(self):
+        return f"<OutlineSection {self.title}: {self.children}>"
+
+
+def _is_adornment(line):
+    return len(line) > 0 and line[0] in _adornment_chars and line == line[0] * len(line)
+
+
+def _is_text(line):
+    return line and not line[0].isspace() and not _is_adornment(line)
+
+
+def _is_title(title, underline):
+    title = title.strip()
+    return len(underline) >= len(title) or len(underline) >= 4
+
+
+def _get_title(text):
+    return _inline_markup.sub(r"\2", text.strip())
+
+
+def scan_outline(content: str, depth: int = 2):
+    """
+    Return a list of :py:class:`OutlineSection` from the content of a document.
+
+    Headings levels are assigned in the order in which the styles are found,
+    just like docutils does.
+
+    :param depth: Depth of the outline.
+    """
+    lines = [line.rstrip() for line in content.splitlines()]
+    styles = []
+    stack = []
+    outline = []
+    previous_blank = True
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        header = None
+        if previous_blank and _is_adornment(line) and i + 2 < len(lines):
+            # Title with overline and underline.
+            title, underline = lines[i + 1], lines[i + 2]
+            if title.strip() and underline == line and _is_title(title, line):
+                header = (title, (line[0], True), 3)
+        elif previous_blank and _is_text(line) and i + 1 < len(lines):
+            # Title with only underline.
+            underline = lines[i + 1]
+            if _is_adornment(underline) and _is_title(line, underline):
+                header = (line, (underline[0], False), 2)
+
+        if header:
+            title, style, length = header
+            if style not in styles:
+                styles.append(style)
+            level = styles.index(style) + 1
+            while stack and stack[-1].level >= level:
+                stack.pop()
+            section = OutlineSection(title=_get_title(title), level=level, line=i)
+            if stack:
+                stack[-1].children.append(section)
+            else:
+                outline.append(section)
+            stack.append(section)
+            i += length
+            previous_blank = True
+            continue
+
+        if _test_block.match(line):
+            for section in stack:
+                section.test_blocks += 1
+        previous_blank = not line
+        i += 1
+
+    return _limit_depth(outline, depth)
+
+
+def dump_outline(sections):
+    """Convert a list of :py:class:`OutlineSection` into plain python objects."""
+    return [
+        {
+            "title": section.title,
+            "level": section.level,
+            "line": section.line,
+            "test_blocks": section.test_blocks,
+            "children": dump_outline(section.children),
+        }
+        for section in sections
+    ]
+
+
+def load_outline(data, depth: int = 2):
+    """
+    Convert the result of :py:func:`dump_outline` back into a list of sections.
+
+    :param depth: Depth of the outline.
+    """
+    if depth <= 0:
+        return []
+    sections = []
+    for item in data:
+        section = OutlineSection(
+            title=item["title"],
+            level=item["level"],
+            line=item["line"],
+        )
+        section.test_blocks = item["test_blocks"]
+        section.children = load_outline(item["children"], depth=depth - 1)
+        sections.append(section)
+    return sections
+
+
+def split_sections(content: str):
+    """
+    Split the content of a document at the boundaries of its top-level sections.
+
+    :returns: A list of strings, the first element is the content
+     before the first section (it can be empty),
+     followed by the content of each top-level section.
+    """
+    lines = content.splitlines(keepends=True)
+    starts = [section.line for section in scan_outline(content, depth=1)]
+    boundaries = [0] + starts + [len(lines)]
+    return ["".join(lines[start:end]) for start, end in zip(boundaries, boundaries[1:])]
+
+
+def _limit_depth(sections, depth):
+    if depth <= 0:
+        return []
+    for section in sections:
+        section.children = _limit_depth(section.children, depth - 1)
+    return sections
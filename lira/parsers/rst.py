@@ -1,13 +1,15 @@
 import logging
+import threading
+from contextlib import contextmanager
 
 from docutils.frontend import OptionParser
 from docutils.nodes import Element
-from docutils.parsers.rst import Directive, Parser, directives
+from docutils.parsers.rst import Directive, Parser, directives, states
 from docutils.utils import new_document
 
 from lira.parsers import BaseParser, State
 from lira.parsers import nodes as booknodes
-from lira.parsers.utils import guess_extension
+from lira.parsers.utils import guess_extension, validate_state
 
 logger = logging.getLogger(__name__)
 
@@ -53,16 +55,6 @@ class CodeBlockDirective(BaseDirective):
     required_arguments = 1
 
 
-def validate_state(value):
-    value = value.lower().strip()
-    if not value:
-        return State.UNKNOWN
-    for state in State:
-        if value == state.value:
-            return state
-    raise ValueError("Invalid state")
-
-
 class TestBlockDirective(BaseDirective):
 
     """
@@ -96,9 +88,105 @@ class TestBlockDirective(BaseDirective):
     has_content = True
 
 
+class ParserContext:
+
+    """
+    Docutils state shared by :py:class:`RSTParser` instances.
+
+    Creating the docutils settings and parser is expensive,
+    so a context is created once and reused to parse all chapters.
+    Use :py:meth:`get_default` to get the context shared by the whole process,
+    or create a new context to use a custom set of directives.
+
+    .. code:: python
+
+       from lira.parsers.rst import ParserContext, RSTParser
+
+       context = ParserContext()
+       context.register_directive("my-directive", MyDirective)
+       parser = RSTParser(content=content, context=context)
+
+    The directives are only registered in docutils while parsing a document,
+    so contexts with different directives don't interfere with each other.
+
+    :param directives: Dictionary of directive names and classes,
+     defaults to :py:attr:`default_directives`.
+    """
+
+    default_directives = {
+        "test-block": TestBlockDirective,
+        "code-block": CodeBlockDirective,
+    }
+    """Directives supported by lira."""
+
+    _default = None
+    _lock = threading.RLock()
+
+    def __init__(self, directives: dict = None):
+        if directives is None:
+            directives = self.default_directives
+        self.directives = dict(directives)
+        self.settings = OptionParser(components=(Parser,)).get_default_values()
+        self.parser = Parser()
+
+    @classmethod
+    def get_default(cls):
+        """Return the context shared by the process, it's created on the first call."""
+        with cls._lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def register_directive(self, name: str, directive):
+        """Add a directive to this context."""
+        self.directives[name] = directive
+
+    @contextmanager
+    def _register_directives(self):
+        registry = directives._directives
+        previous = {name: registry.get(name) for name in self.directives}
+        registry.update(self.directives)
+        try:
+            yield
+        finally:
+            for name, directive in previous.items():
+                if directive is None:
+                    registry.pop(name, None)
+                else:
+                    registry[name] = directive
+
+    def parse(self, content: str, source: str):
+        """Parse `content` and return a docutils document."""
+        document = new_document(source, self.settings)
+        # The parser and the directives registry are shared,
+        # only one document can be parsed at a time.
+        with self._lock, self._register_directives():
+            try:
+                self.parser.parse(content, document)
+            finally:
+                self._release()
+        return document
+
+    def _release(self):
+        """Drop the references to the last parsed document kept by docutils."""
+        self.parser.document = None
+        self.parser.statemachine = None
+        self.parser.inputstring = None
+        # Nested state machines are cached at class level, with a reference
+        # to the memo of the document they parsed.
+        cache = states.RSTState.nested_sm_cache
+        while cache:
+            cache.pop().unlink()
+
+
 class RSTParser(BaseParser):
 
-    """reStructuredText parser for lira, powered by docutils."""
+    """
+    reStructuredText parser for lira, powered by docutils.
+
+    :param context: :py:class:`ParserContext` used to parse the content,
+     defaults to the context shared by the process.
+    """
 
     terminal_nodes = {
         "#text": booknodes.Text,
@@ -110,21 +198,14 @@ class RSTParser(BaseParser):
         "paragraph": booknodes.Paragraph,
     }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, context: ParserContext = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.context = context or ParserContext.get_default()
         self.document = self._get_document(self.content)
 
     def _get_document(self, content):
-        settings = OptionParser(components=(Parser,)).get_default_values()
-        directives.register_directive("test-block", TestBlockDirective)
-        directives.register_directive("code-block", CodeBlockDirective)
-
-        parser = Parser()
         source = str(self.source) if self.source else "lira-unknown-source"
-        document = new_document(source, settings)
-
-        parser.parse(content, document)
-        return document
+        return self.context.parse(content, source)
 
     def parse_metadata(self):
         # TODO: set a spec for the metadata
@@ -142,6 +223,9 @@ class RSTParser(BaseParser):
     def parse_content(self):
         return self._parse_content(self.document)
 
+    def close(self):
+        self.document = None
+
     def _parse_content(self, node, start=0):
         nodes = []
         for child in node.children[start:]:
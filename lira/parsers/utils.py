@@ -1,3 +1,5 @@
+from lira.parsers import State
+
 _languages = {
     "python": ".py",
     "c": ".c",
@@ -13,3 +15,13 @@ _languages = {
 def guess_extension(language):
     language = language or ""
     return _languages.get(language.strip().lower(), ".txt")
+
+
+def validate_state(value):
+    value = value.lower().strip()
+    if not value:
+        return State.UNKNOWN
+    for state in State:
+        if value == state.value:
+            return state
+    raise ValueError("Invalid state")
@@ -1,5 +1,5 @@
 from prompt_toolkit.application import Application
-from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
+from prompt_toolkit.clipboard import DynamicClipboard
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.key_binding.bindings.focus import focus_next, focus_previous
 from prompt_toolkit.keys import Keys
@@ -7,17 +7,37 @@ from prompt_toolkit.layout import Dimension, Layout
 from prompt_toolkit.layout.containers import HSplit, VSplit
 
 from lira.app import LiraApp
+from lira.tui.prefetch import ChapterPrefetcher
 from lira.tui.themes import style, theme
 from lira.tui.utils import exit_app, set_title
 from lira.tui.windows import ContentArea, SidebarMenu, StatusBar
+from lira.utils import Timer
 
 
 class TerminalUI:
-    def __init__(self):
-        self.lira = LiraApp()
-        self.lira.setup()
 
+    """
+    Terminal interface of Lira.
+
+    :param timer: Timer used to measure each phase of the startup,
+     see :py:class:`lira.utils.Timer`.
+    """
+
+    def __init__(self, timer: Timer = None):
+        self.timer = timer or Timer()
+        self.exit_after_startup = False
+        self._clipboard = None
+
+        with self.timer.measure("setup"):
+            self.lira = LiraApp()
+            # Books are loaded in the background after the first frame.
+            self.lira.setup(read_books=False)
+
+        self.prefetcher = ChapterPrefetcher(
+            depth=self.lira.config.get("prefetch_depth")
+        )
         self.content = ContentArea(self)
+        self.lira.residency.on_unload.append(self.content.discard_chapter)
         self.status = StatusBar(self)
         self.menu = SidebarMenu(self)
 
@@ -45,8 +65,9 @@ class TerminalUI:
             full_screen=True,
             style=style,
             after_render=self._ready,
-            clipboard=PyperclipClipboard(),
+            clipboard=DynamicClipboard(self._get_clipboard),
         )
+        self.app.after_render += self.content.check_width
 
     def get_key_bindings(self):
         keys = KeyBindings()
@@ -65,12 +86,41 @@ class TerminalUI:
 
         return keys
 
+    def _get_clipboard(self):
+        # Pyperclip isn't loaded until the clipboard is used.
+        if self._clipboard is None:
+            from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
+
+            self._clipboard = PyperclipClipboard()
+        return self._clipboard
+
     def _ready(self, app):
         key = "__is_ready"
         if not hasattr(self, key):
-            set_title()
-            self.status.notify("Ready!")
             setattr(self, key, True)
+            self.timer.stop("first render")
+            if self.lira.books_loaded:
+                self._books_loaded()
+            else:
+                self.timer.start("book discovery")
+                task = self.menu.load_books()
+                task.add_done_callback(self._books_loaded)
+            if not self.exit_after_startup:
+                set_title()
+                self.status.notify("Ready!")
+
+    def _books_loaded(self, task=None):
+        self.timer.stop("book discovery")
+        if self.exit_after_startup:
+            exit_app()
+
+    def run(self, exit_after_startup: bool = False):
+        """
+        Run the application.
 
-    def run(self):
+        :param exit_after_startup: Exit as soon as the first frame is rendered
+         and the books are loaded, used to measure the startup time.
+        """
+        self.exit_after_startup = exit_after_startup
+        self.timer.start("first render")
         self.app.run()
@@ -0,0 +1,155 @@
+"""
+Parse chapters in the background before they are opened.
+
+Chapters are parsed when they are opened,
+this module guesses the chapters the user is going to open next,
+and parses them in a worker thread while the user is reading.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+log = logging.getLogger(__name__)
+
+
+class ChapterPrefetcher:
+
+    """
+    Prefetch the chapters around the chapter the user is looking at.
+
+    When a chapter is focused or opened, the chapter itself,
+    the next `depth` chapters, and the previously visited chapter are parsed
+    in a worker thread (see :py:meth:`lira.book.BookChapter.prefetch`).
+    The result is loaded into the chapter from the event loop.
+
+    Prefetches of chapters that aren't around the new chapter are cancelled.
+
+    :param depth: Number of chapters after the current one to prefetch,
+     use 0 to prefetch only the current and the previously visited chapter.
+    """
+
+    depth = 1
+    """Default number of chapters to prefetch after the current one."""
+
+    def __init__(self, depth: int = None):
+        if depth is not None:
+            self.depth = depth
+
+        self.tasks = {}
+        """Pending prefetches, keyed by chapter."""
+
+        self.current = None
+        """Last opened chapter."""
+
+        self.previous = None
+        """Chapter opened before :py:attr:`current`."""
+
+        self._callbacks = {}
+        """Callbacks waiting for the prefetch of a chapter, see :py:meth:`load`."""
+
+        self._executor = None
+
+    def _get_executor(self):
+        # A single worker, so prefetches don't compete with each other,
+        # and the ones that are waiting can be cancelled.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="lira-prefetch"
+            )
+        return self._executor
+
+    def _get_targets(self, chapter):
+        chapters = chapter.book.chapters
+        try:
+            index = chapters.index(chapter)
+        except ValueError:
+            return []
+        targets = [chapter]
+        targets.extend(chapters[index + 1 : index + 1 + self.depth])
+        previous = self.previous if chapter is self.current else self.current
+        if previous is not None and previous is not chapter and previous not in targets:
+            targets.append(previous)
+        return targets
+
+    def visit(self, chapter):
+        """
+        Mark `chapter` as opened, and prefetch it and the chapters around it.
+
+        A prefetch of the chapter that is already running isn't cancelled,
+        use :py:meth:`load` to wait for it.
+        """
+        if chapter is not self.current:
+            self.previous = self.current
+            self.current = chapter
+        self._prefetch(self._get_targets(chapter))
+
+    def load(self, chapter, callback):
+        """
+        Call `callback` once `chapter` is parsed.
+
+        If the chapter is being prefetched, the callback is called
+        when the prefetch is done, instead of parsing the chapter again.
+        The callback isn't called if the prefetch is cancelled,
+        or if another chapter was opened in the meantime.
+        Otherwise the chapter is parsed (if needed) and the callback is called
+        right away.
+        """
+        task = self.tasks.get(chapter)
+        if task is None or chapter.is_parsed:
+            if not chapter.is_parsed:
+                chapter.parse()
+            callback()
+            return
+        if chapter not in self._callbacks:
+            task.add_done_callback(partial(self._prefetched, chapter))
+        self._callbacks.setdefault(chapter, []).append(callback)
+
+    def _prefetched(self, chapter, task):
+        callbacks = self._callbacks.pop(chapter, [])
+        if task.cancelled() or chapter is not self.current:
+            return
+        if not chapter.is_parsed:
+            # The prefetch failed.
+            chapter.parse()
+        for callback in callbacks:
+            callback()
+
+    def prefetch(self, chapter):
+        """Prefetch `chapter` and the chapters around it (like when it gains focus)."""
+        self._prefetch(self._get_targets(chapter))
+
+    def cancel(self):
+        """Cancel all pending prefetches, and the callbacks waiting for them."""
+        self._callbacks.clear()
+        self._prefetch([])
+
+    def _prefetch(self, chapters):
+        for chapter, task in list(self.tasks.items()):
+            if chapter not in chapters:
+                task.cancel()
+                del self.tasks[chapter]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Without an event loop, chapters are parsed when they are opened.
+            return
+        for chapter in chapters:
+            if chapter.is_parsed or chapter in self.tasks:
+                continue
+            self.tasks[chapter] = asyncio.create_task(self._prefetch_chapter(chapter))
+
+    async def _prefetch_chapter(self, chapter):
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(self._get_executor(), chapter.prefetch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Unable to prefetch chapter. file=%s error=%s", chapter.file, e)
+            return
+        finally:
+            if self.tasks.get(chapter) is asyncio.current_task():
+                del self.tasks[chapter]
+        chapter.load_prefetched(data)
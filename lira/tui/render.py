@@ -1,15 +1,15 @@
 import logging
-from functools import partial, wraps
+from functools import wraps
 from textwrap import indent
 
 import click
-import pygments
 from prompt_toolkit.formatted_text import PygmentsTokens, to_formatted_text
 from prompt_toolkit.mouse_events import MouseEventType
 from prompt_toolkit.widgets.base import Border
 
 from lira.parsers import State
 from lira.tui.utils import copy_to_clipboard, get_lexer, notify_after_copy
+from lira.utils import LRUCache
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +25,31 @@ def action(func, *args, **kwargs):
     return _handler
 
 
+def _get_highlight_key(code, language):
+    return ((language or "").strip().lower(), code)
+
+
+def highlight(code, language):
+    """
+    Highlight `code` with the Pygments lexer of `language`.
+
+    Plain text is returned if there isn't a lexer for `language`.
+    It doesn't touch any shared state, so it can be run in a thread.
+    """
+    lexer = get_lexer(language or "")
+    if lexer:
+        import pygments
+
+        return to_formatted_text(
+            PygmentsTokens(list(pygments.lex(code=code, lexer=lexer)))
+        )
+    return to_formatted_text(code, style="")
+
+
+def _count_newlines(formatted_text):
+    return sum(fragment[1].count("\n") for fragment in formatted_text)
+
+
 class Renderer:
 
     styles = {
@@ -39,53 +64,170 @@ class Renderer:
         State.VALID: ("✓", "class:status.valid"),
     }
 
-    def __init__(self, tui, section, width=60):
+    highlight_cache = LRUCache(maxsize=256)
+    """
+    Highlighted blocks, keyed by their language and content.
+
+    The cache is shared by all renderers,
+    so unchanged blocks aren't highlighted again on each render.
+    """
+
+    def __init__(self, tui, section, width=60, progressive=False):
         self.tui = tui
         self.section = section
         self.width = width
 
+        self.progressive = progressive
+        """
+        If `True`, blocks that aren't in :py:attr:`highlight_cache`
+        are rendered without highlighting, and added to :py:attr:`pending`.
+        """
+
+        self.pending = {}
+        """
+        Blocks waiting to be highlighted.
+
+        The keys are the nodes, and the values are tuples
+        with the arguments to pass to :py:func:`highlight`.
+        """
+
+        self.spans = {}
+        """
+        Lines used by each code and test block from the last render.
+
+        The keys are the nodes, and the values are tuples
+        with the first line and the line after the last line of the node.
+        """
+
     def render(self):
-        return self._render([self.section])
+        """
+        Render the section.
 
-    def _render(self, children):
-        content = []
+        The lines used by each code and test block are recorded in :py:attr:`spans`,
+        so a single block can be rendered again with :py:meth:`update_node`.
+        """
+        return list(self.iter_render())
+
+    def iter_render(self):
+        """
+        Iterate over the rendered content of the section.
+
+        The nodes are rendered as the iterator is consumed,
+        so the content can be displayed before the whole section is rendered.
+        :py:attr:`spans` is filled with the blocks rendered so far.
+        """
+        self.spans = {}
+        self.pending = {}
+        line = 0
+        for node, content in self._render([self.section]):
+            newlines = sum(_count_newlines(item) for item in content)
+            if node is not None:
+                self.spans[node] = (line, line + newlines + 1)
+            line += newlines
+            yield from content
+
+    def estimate_lines(self):
+        """
+        Estimate the number of lines of the rendered section, without rendering it.
+
+        Only the metadata of the nodes is used
+        (like the number of lines of code and test blocks).
+        """
+        return self._estimate_newlines([self.section]) + 1
+
+    def _estimate_newlines(self, children):
+        newlines = 0
         for child in children:
             tag = child.tagname
             if tag == "Section":
-                content.append(
-                    to_formatted_text(child.attributes.title, "class:text.title")
-                )
-                content.extend(self._render(child.children))
+                if child is not self.section:
+                    newlines += 2
+                newlines += self._estimate_newlines(child.children)
             elif tag == "Paragraph":
-                content.extend(self._render_separator())
-                content.extend(self._render(child.children))
+                newlines += 2 + self._estimate_newlines(child.children)
             elif tag == "CodeBlock":
-                content.extend(self._render_separator())
-                content.extend(self._render_code_block(child))
+                newlines += 2 + len(child.content) + 4
             elif tag == "TestBlock":
-                content.extend(self._render_separator())
-                content.extend(self._render_test_block(child))
+                newlines += 2 + len(child.content) + 6
             elif tag in ("Text", "Strong", "Emphasis", "Literal"):
-                content.append(to_formatted_text(child.text(), self.styles[tag]))
+                newlines += child.text().count("\n")
+        return newlines
+
+    def render_node(self, node):
+        """Render a code or test block."""
+        if node.tagname == "CodeBlock":
+            return self._render_code_block(node)
+        return self._render_test_block(node)
+
+    def update_node(self, node):
+        """
+        Render a code or test block again, and update the spans of the nodes after it.
+
+        :returns: A tuple with the lines that the node used to have
+         (like in :py:attr:`spans`), and the new content of the node.
+        """
+        start, end = self.spans[node]
+        content = self.render_node(node)
+        lines = sum(_count_newlines(item) for item in content) + 1
+        offset = start + lines - end
+        for other, (other_start, other_end) in self.spans.items():
+            if other_start >= end:
+                self.spans[other] = (other_start + offset, other_end + offset)
+        self.spans[node] = (start, start + lines)
+        return (start, end), content
+
+    def _render(self, children):
+        """
+        Render the nodes from `children`.
+
+        :returns: An iterator of tuples with the code or test block being rendered
+         (or `None` for other nodes), and its content.
+        """
+        for child in children:
+            tag = child.tagname
+            if tag == "Section":
+                if child is not self.section:
+                    yield None, self._render_separator()
+                yield None, [
+                    to_formatted_text(child.attributes.title, "class:text.title")
+                ]
+                yield from self._render(child.children)
+            elif tag == "Paragraph":
+                yield None, self._render_separator()
+                yield from self._render(child.children)
+            elif tag in ("CodeBlock", "TestBlock"):
+                yield None, self._render_separator()
+                yield child, self.render_node(child)
+            elif tag in ("Text", "Strong", "Emphasis", "Literal"):
+                yield None, [to_formatted_text(child.text(), self.styles[tag])]
             else:
                 log.warning("Node not rendered. Unknown node: %s", tag)
-        return content
 
     def _render_separator(self):
         return [to_formatted_text("\n\n")]
 
-    def _render_highlighted_block(self, content, language):
+    def _render_highlighted_block(self, node, content, language):
         code = indent(content, " " * 2)
-        lexer = get_lexer(language or "")
-        if lexer:
-            formatted_text = PygmentsTokens(pygments.lex(code=code, lexer=lexer))
-        else:
-            formatted_text = to_formatted_text(
-                code,
-                style="",
-            )
+        key = _get_highlight_key(code, language)
+        formatted_text = self.highlight_cache.get(key)
+        if formatted_text is not None:
+            self.pending.pop(node, None)
+            return formatted_text
+
+        if self.progressive and get_lexer(language or ""):
+            # Render the block as plain text (like Pygments does,
+            # it always ends with a newline) till it's highlighted.
+            self.pending[node] = (code, language)
+            return to_formatted_text(code.strip("\n") + "\n", style="")
+
+        formatted_text = highlight(code, language)
+        self.set_highlighted(code, language, formatted_text)
         return formatted_text
 
+    def set_highlighted(self, code, language, formatted_text):
+        """Save the result of :py:func:`highlight` in :py:attr:`highlight_cache`."""
+        self.highlight_cache.set(_get_highlight_key(code, language), formatted_text)
+
     def _render_top_seperator(self, title=None):
         title = title or ""
         formatted_text = [
@@ -166,10 +308,11 @@ class Renderer:
 
     def _render_code_block(self, node):
         menu = self._render_menu(
-            [("Copy", partial(self._copy_action, node))],
+            [("Copy", action(self._copy_action, node))],
             top=True,
         )
         content = self._render_highlighted_block(
+            node=node,
             content=node.text(),
             language=node.attributes.language,
         )
@@ -190,6 +333,7 @@ class Renderer:
             state=node.attributes.state,
         )
         content = self._render_highlighted_block(
+            node=node,
             content=node.text(),
             language=node.attributes.language,
         )
@@ -204,7 +348,7 @@ class Renderer:
         validator = node.validate()
         if validator.message:
             self.notify(validator.message)
-        self.tui.content.update_section(self.section)
+        self.tui.content.update_section(self.section, node=node)
 
     def _copy_action(self, node):
         text = node.text()
@@ -214,13 +358,13 @@ class Renderer:
 
     def _reset_action(self, node):
         node.reset()
-        self.tui.content.update_section(self.section)
+        self.tui.content.update_section(self.section, node=node)
         msg = "Let's try again"
         self.notify(msg)
 
     def _edit_action(self, node):
         self._open_editor(node)
-        self.tui.content.update_section(self.section)
+        self.tui.content.update_section(self.section, node=node)
 
     def _open_editor(self, node):
         """
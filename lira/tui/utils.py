@@ -1,7 +1,7 @@
+from functools import lru_cache
+
 from prompt_toolkit.application import get_app
 from prompt_toolkit.shortcuts import set_title as set_app_title
-from pygments.lexers import get_lexer_by_name
-from pygments.util import ClassNotFound
 
 
 def exit_app():
@@ -17,7 +17,17 @@ def set_title(title=""):
     set_app_title(text)
 
 
+@lru_cache(maxsize=None)
 def get_lexer(language):
+    """
+    Get a Pygments lexer by its name (lexers are created only once).
+
+    Pygments is imported on the first call,
+    so it isn't loaded till a code block is rendered.
+    """
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
     try:
         return get_lexer_by_name(language.strip().lower())
     except ClassNotFound:
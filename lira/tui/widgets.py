@@ -1,5 +1,8 @@
+import asyncio
 import logging
+from bisect import bisect_left
 from functools import partial
+from itertools import accumulate
 
 from prompt_toolkit.application import get_app
 from prompt_toolkit.buffer import Buffer
@@ -22,6 +25,7 @@ from prompt_toolkit.layout import (
     Window,
     WindowAlign,
 )
+from prompt_toolkit.layout.controls import UIContent, UIControl
 from prompt_toolkit.layout.processors import (
     Document,
     HighlightSelectionProcessor,
@@ -76,33 +80,96 @@ class FormatTextProcessor(Processor):
     Custom processor to represent formatted text.
 
     It makes use of :py:class:`FormattedBufferControl`.
+
+    Transformations are cached per line,
+    the cache is invalidated when the generation of the control changes
+    (this is, when its lines are replaced).
     """
 
+    def __init__(self):
+        self._transformations = {}
+        self._control = None
+        self._generation = None
+
+    def _check_generation(self, buffer_control):
+        if (
+            buffer_control is not self._control
+            or buffer_control.generation != self._generation
+        ):
+            self._transformations.clear()
+            self._control = buffer_control
+            self._generation = buffer_control.generation
+
     def apply_transformation(self, transformation_input):
-        formatted_lines = transformation_input.buffer_control.formatted_lines
+        buffer_control = transformation_input.buffer_control
         lineno = transformation_input.lineno
-        max_lineno = len(formatted_lines) - 1
-        if lineno > max_lineno:
+        self._check_generation(buffer_control)
+
+        transformation = self._transformations.get(lineno)
+        if transformation is not None:
+            return transformation
+
+        formatted_lines = buffer_control.formatted_lines
+        if lineno < len(formatted_lines):
+            transformation = Transformation(to_formatted_text(formatted_lines[lineno]))
+        else:
+            # The document and the formatted lines are out of sync,
+            # this is logged only once, since the result is cached
+            # till the lines are updated.
             log.warning(
                 "Index error when parsing document. max_lineno=%s lineno=%s",
-                max_lineno,
+                len(formatted_lines) - 1,
                 lineno,
             )
-            lineno = max_lineno
-        line = formatted_lines[lineno]
-        return Transformation(to_formatted_text(line))
+            transformation = Transformation([])
+        self._transformations[lineno] = transformation
+        return transformation
+
+
+def _get_line_index(fragments):
+    """Return a list with the column where each fragment of the line ends."""
+    return list(accumulate(len(fragment[1]) for fragment in fragments))
+
+
+def _call_handler(fragments, line_index, mouse_event):
+    """Call the handler of the fragment under the cursor (if any)."""
+    index = bisect_left(line_index, mouse_event.position.x + 1)
+    if index < len(fragments):
+        item = fragments[index]
+        if len(item) >= 3:
+            handler = item[2]
+            return handler(mouse_event)
 
 
 class FormattedBufferControl(BufferControl):
 
-    """Control to support formatted_text and mouse events."""
+    """
+    Control to support formatted_text and mouse events.
+
+    The column where each fragment ends is indexed for each line,
+    so the handler under the cursor can be found with a binary search.
+    """
+
+    handled_events = {MouseEventType.MOUSE_UP, MouseEventType.MOUSE_DOWN}
+    """Mouse events that are passed to the handlers of the fragments."""
 
     def __init__(self, formatted_text, **kwargs):
-        self.formatted_lines = list(split_lines(formatted_text))
+        self.generation = 0
+        """Incremented each time the lines are replaced."""
+
+        self.update_formatted_text(formatted_text)
         super().__init__(**kwargs)
 
     def update_formatted_text(self, formatted_text):
+        self.generation += 1
         self.formatted_lines = list(split_lines(formatted_text))
+        self.lines_index = [_get_line_index(line) for line in self.formatted_lines]
+
+    def replace_lines(self, start, end, lines):
+        """Replace the lines from `start` to `end` (exclusive) with `lines`."""
+        self.generation += 1
+        self.formatted_lines[start:end] = lines
+        self.lines_index[start:end] = [_get_line_index(line) for line in lines]
 
     def mouse_handler(self, mouse_event):
         """
@@ -112,6 +179,8 @@ class FormattedBufferControl(BufferControl):
         """
         response = super().mouse_handler(mouse_event)
 
+        if mouse_event.event_type not in self.handled_events:
+            return response
         if mouse_event.position.y >= len(self.formatted_lines):
             return response
 
@@ -119,19 +188,12 @@ class FormattedBufferControl(BufferControl):
         return response
 
     def select(self, mouse_event):
-        fragments = self.formatted_lines[mouse_event.position.y]
-        # Find position in the fragment list.
-        xpos = mouse_event.position.x + 1
-
-        # Find mouse handler for this character.
-        count = 0
-        for item in fragments:
-            count += len(item[1])
-            if count >= xpos:
-                if len(item) >= 3:
-                    handler = item[2]
-                    return handler(mouse_event)
-                break
+        lineno = mouse_event.position.y
+        return _call_handler(
+            self.formatted_lines[lineno],
+            self.lines_index[lineno],
+            mouse_event,
+        )
 
 
 class FormattedTextArea:
@@ -206,6 +268,43 @@ class FormattedTextArea:
         current_position = min(self.document.cursor_position, len(plain_text))
         self.document = Document(plain_text, current_position)
 
+    @property
+    def cursor_position(self):
+        """Position of the cursor (column and row)."""
+        document = self.document
+        return Point(document.cursor_position_col, document.cursor_position_row)
+
+    @cursor_position.setter
+    def cursor_position(self, point):
+        document = self.document
+        row = max(0, min(point.y, document.line_count - 1))
+        col = max(0, min(point.x, len(document.lines[row])))
+        index = document.translate_row_col_to_index(row, col)
+        self.document = Document(document.text, index)
+
+    def replace_lines(self, start, end, text):
+        """
+        Replace the lines from `start` to `end` (exclusive) with `text`.
+
+        Only the given lines are updated,
+        the cursor is kept in the same position relative to the content.
+        """
+        lines = list(split_lines(to_formatted_text(text)))
+        self.control.replace_lines(start, end, lines)
+
+        document = self.document
+        text_lines = list(document.lines)
+        text_lines[start:end] = [fragment_list_to_text(line) for line in lines]
+        row = document.cursor_position_row
+        col = document.cursor_position_col
+        if row >= end:
+            row += len(lines) - (end - start)
+        elif row >= start:
+            row = min(row, start + len(lines) - 1)
+        col = min(col, len(text_lines[row]))
+        position = sum(len(line) + 1 for line in text_lines[:row]) + col
+        self.document = Document("\n".join(text_lines), position)
+
     def copy_selection(self):
         data = self.buffer.copy_selection()
         text = data.text
@@ -235,6 +334,256 @@ class FormattedTextArea:
         return self.window
 
 
+class LazyLines:
+
+    """
+    Formatted lines materialized on demand from an iterator of formatted text.
+
+    The iterator is consumed only till the requested line is found,
+    so the content can be displayed before it's generated in full.
+
+    :param items: Iterator of formatted text.
+    :param estimated_count: Number of lines to report
+     till all lines are materialized.
+    """
+
+    def __init__(self, items, estimated_count=0):
+        self._items = iter(items)
+        self._current = []
+        self.estimated_count = estimated_count
+
+        self.lines = []
+        """Lines materialized so far."""
+
+        self.exhausted = False
+        """All lines were materialized."""
+
+    def materialize(self, count=None):
+        """
+        Materialize lines till there are at least `count` lines.
+
+        If `count` isn't given, all lines are materialized.
+        """
+        while not self.exhausted and (count is None or len(self.lines) < count):
+            item = next(self._items, None)
+            if item is None:
+                self.lines.append(self._current)
+                self._current = []
+                self.exhausted = True
+                break
+            first, *rest = split_lines(to_formatted_text(item))
+            self._current.extend(first)
+            for line in rest:
+                self.lines.append(self._current)
+                self._current = line
+
+    def get(self, lineno):
+        """Get the fragments of a line (empty if the line doesn't exist)."""
+        self.materialize(lineno + 1)
+        if lineno < len(self.lines):
+            return self.lines[lineno]
+        return []
+
+    def get_materialized(self, lineno):
+        """Like :py:meth:`get`, but without materializing new lines."""
+        if lineno < len(self.lines):
+            return self.lines[lineno]
+        return []
+
+    @property
+    def count(self):
+        """Number of lines (it's an estimate till all lines are materialized)."""
+        if self.exhausted:
+            return len(self.lines)
+        return max(len(self.lines) + 1, self.estimated_count)
+
+
+class LazyFormattedControl(UIControl):
+
+    """
+    Control to display :py:class:`LazyLines`, with support for mouse events.
+
+    Each time the content is created only the lines of the visible viewport
+    (plus a margin) are materialized,
+    the lines after them are displayed empty till they are materialized.
+    """
+
+    margin = 50
+    """Number of lines to materialize after the viewport."""
+
+    def __init__(self, lines, key_bindings=None, focusable=False):
+        self.lines = lines
+        self.cursor = Point(0, 0)
+        self.lines_index = {}
+        self.key_bindings = key_bindings
+        self.focusable = focusable
+
+    def update_lines(self, lines):
+        """Replace the lines, the cursor is kept in the same position."""
+        self.lines = lines
+        self.lines_index = {}
+
+    def is_focusable(self):
+        return self.focusable
+
+    def get_key_bindings(self):
+        return self.key_bindings
+
+    def create_content(self, width, height):
+        self.lines.materialize(self.cursor.y + height + self.margin)
+        self.move_cursor(self.cursor.x, self.cursor.y)
+        return UIContent(
+            get_line=self.lines.get_materialized,
+            line_count=self.lines.count,
+            cursor_position=self.cursor,
+            show_cursor=self.focusable,
+        )
+
+    def move_cursor(self, col, row):
+        """Move the cursor to the given position, keeping it inside the content."""
+        self.lines.materialize(row + 1)
+        row = max(0, min(row, self.lines.count - 1))
+        width = sum(len(fragment[1]) for fragment in self.lines.get(row))
+        col = max(0, min(col, width))
+        self.cursor = Point(col, row)
+
+    def move_cursor_down(self):
+        self.move_cursor(self.cursor.x, self.cursor.y + 1)
+
+    def move_cursor_up(self):
+        self.move_cursor(self.cursor.x, self.cursor.y - 1)
+
+    def mouse_handler(self, mouse_event):
+        if mouse_event.event_type not in FormattedBufferControl.handled_events:
+            return NotImplemented
+        position = mouse_event.position
+        self.move_cursor(position.x, position.y)
+        if self.focusable and mouse_event.event_type == MouseEventType.MOUSE_UP:
+            get_app().layout.current_control = self
+        return self.select(mouse_event)
+
+    def select(self, mouse_event):
+        lineno = mouse_event.position.y
+        fragments = self.lines.get(lineno)
+        line_index = self.lines_index.get(lineno)
+        if line_index is None:
+            line_index = self.lines_index[lineno] = _get_line_index(fragments)
+        return _call_handler(fragments, line_index, mouse_event)
+
+
+class VirtualizedTextArea:
+
+    """
+    Like :py:class:`FormattedTextArea`, but the content is rendered lazily.
+
+    Useful for very long content,
+    only the visible lines need to be generated before displaying it.
+    Selecting and copying text isn't supported.
+
+    :param items: Iterator of formatted text.
+    :param estimated_count: Estimated number of lines of the content.
+    """
+
+    def __init__(
+        self,
+        items,
+        estimated_count=0,
+        focusable=False,
+        wrap_lines=True,
+        width=None,
+        height=None,
+        scrollbar=False,
+        dont_extend_height=True,
+        dont_extend_width=False,
+    ):
+        self.control = LazyFormattedControl(
+            lines=LazyLines(items, estimated_count=estimated_count),
+            key_bindings=self.get_key_bindings(),
+            focusable=focusable,
+        )
+        self.scrollbar = scrollbar
+        right_margins = [
+            ConditionalMargin(
+                ScrollbarMargin(display_arrows=True),
+                filter=Condition(lambda: self.scrollbar),
+            ),
+        ]
+        self.window = Window(
+            content=self.control,
+            width=width,
+            height=height,
+            wrap_lines=wrap_lines,
+            right_margins=right_margins,
+            dont_extend_height=dont_extend_height,
+            dont_extend_width=dont_extend_width,
+        )
+
+    @property
+    def lines(self):
+        return self.control.lines
+
+    @property
+    def cursor_position(self):
+        """Position of the cursor (column and row)."""
+        return self.control.cursor
+
+    @cursor_position.setter
+    def cursor_position(self, point):
+        self.control.move_cursor(point.x, point.y)
+
+    def update_content(self, items, estimated_count=0):
+        """Replace the content, the cursor is kept in the same position."""
+        self.control.update_lines(LazyLines(items, estimated_count=estimated_count))
+
+    def _get_page_size(self):
+        render_info = self.window.render_info
+        if render_info:
+            return render_info.window_height
+        return 10
+
+    def get_key_bindings(self):
+        keys = KeyBindings()
+
+        @keys.add(Keys.Up)
+        def _(event):
+            self.control.move_cursor_up()
+
+        @keys.add(Keys.Down)
+        def _(event):
+            self.control.move_cursor_down()
+
+        @keys.add(Keys.Left)
+        def _(event):
+            cursor = self.control.cursor
+            self.control.move_cursor(cursor.x - 1, cursor.y)
+
+        @keys.add(Keys.Right)
+        def _(event):
+            cursor = self.control.cursor
+            self.control.move_cursor(cursor.x + 1, cursor.y)
+
+        @keys.add(Keys.PageUp)
+        def _(event):
+            cursor = self.control.cursor
+            self.control.move_cursor(cursor.x, cursor.y - self._get_page_size())
+
+        @keys.add(Keys.PageDown)
+        def _(event):
+            cursor = self.control.cursor
+            self.control.move_cursor(cursor.x, cursor.y + self._get_page_size())
+
+        @keys.add(" ")
+        @keys.add(Keys.Enter)
+        def _(event):
+            mouse_event = MouseEvent(self.control.cursor, MouseEventType.MOUSE_UP)
+            self.control.select(mouse_event)
+
+        return keys
+
+    def __pt_container__(self):
+        return self.window
+
+
 class ListElement:
 
     """
@@ -450,26 +799,67 @@ class LiraList:
 
 class BooksList(LiraList):
 
-    """List of :py:class:`lira.book.Book`."""
+    """
+    List of :py:class:`lira.book.Book`.
+
+    If the books of the app weren't loaded yet,
+    a placeholder is shown for each book till :py:meth:`load_books` is called.
+    """
+
+    def __init__(self, tui):
+        self.placeholders = []
+        super().__init__(tui)
 
     def _get_title(self):
         return to_formatted_text([("class:title", "Books")])
 
     def _get_elements(self):
+        if not self.lira.books_loaded:
+            self.placeholders = [
+                ListElement(text=f"Loading {book_path}...")
+                for book_path in self.lira.book_paths
+            ]
+            return list(self.placeholders)
+
         elements = []
         for i, book in enumerate(self.lira.books):
-            book.parse()
-            title = book.metadata["title"]
-            elements.append(
-                ListElement(
-                    text=title,
-                    on_select=partial(self._select, book, i),
-                    on_focus=partial(self._focus, book, i),
-                )
-            )
+            if not book.metadata:
+                book.parse()
+            elements.append(self._get_element(book, i))
         return elements
 
+    def _get_element(self, book, index):
+        return ListElement(
+            text=book.metadata["title"],
+            on_select=partial(self._select, book, index),
+            on_focus=partial(self._focus, book, index),
+        )
+
+    def load_books(self):
+        """
+        Load the books in the background.
+
+        Each placeholder is replaced as soon as its book is loaded,
+        or removed if the book couldn't be loaded.
+        """
+        return asyncio.create_task(
+            self.lira.read_books_async(callback=self._replace_placeholder)
+        )
+
+    def _replace_placeholder(self, index, book):
+        widget = self.container
+        placeholder = self.placeholders[index]
+        position = widget.elements.index(placeholder)
+        if book:
+            widget.elements[position] = self._get_element(book, position)
+        else:
+            widget.elements.pop(position)
+            widget.index = max(min(widget.index, len(widget.elements) - 1), 0)
+            widget.cursor = Point(0, widget.index)
+        get_app().invalidate()
+
     def _select(self, book, index=0):
+        self.tui.prefetcher.cancel()
         widget = BookChaptersList(tui=self.tui, book=book)
         set_title(book.metadata["title"])
         self.tui.menu.push(widget)
@@ -522,11 +912,19 @@ class BooksList(LiraList):
 
 class BookChaptersList(LiraList):
 
-    """List of :py:class:`lira.book.BookChapter`."""
+    """
+    List of :py:class:`lira.book.BookChapter`.
+
+    Chapters are parsed when they are opened,
+    the chapters around the focused chapter are prefetched in the background
+    (see :py:class:`lira.tui.prefetch.ChapterPrefetcher`).
+    """
 
     def __init__(self, tui, book):
         self.book = book
         super().__init__(tui)
+        if self.book.chapters:
+            self.tui.prefetcher.prefetch(self.book.chapters[0])
 
     def _get_title(self):
         book_title = self.book.metadata["title"]
@@ -538,16 +936,17 @@ class BookChaptersList(LiraList):
     def _get_elements(self):
         elements = []
         for i, chapter in enumerate(self.book.chapters):
-            chapter.parse()
             elements.append(
                 ListElement(
                     text=chapter.title,
                     on_select=partial(self._select, chapter, i),
+                    on_focus=partial(self.tui.prefetcher.prefetch, chapter),
                 )
             )
         return elements
 
     def _select(self, chapter, index):
+        self.tui.prefetcher.visit(chapter)
         widget = ChapterSectionsList(
             tui=self.tui,
             chapter=chapter,
@@ -558,14 +957,19 @@ class BookChaptersList(LiraList):
 
 class ChapterSectionsList(LiraList):
 
-    """List of :py:class:`lira.parsers.nodes.Section`."""
+    """
+    List of :py:class:`lira.parsers.nodes.Section`.
+
+    The titles are taken from the outline of the chapter,
+    the chapter is parsed only when a section is selected.
+    """
 
     allow_select = True
 
     def __init__(self, tui, chapter, index):
         self.index = index
         self.chapter = chapter
-        self.toc = self.chapter.toc(depth=1)
+        self.outline = self.chapter.outline(depth=1)
         super().__init__(tui)
 
         # Select first item automatically
@@ -588,14 +992,29 @@ class ChapterSectionsList(LiraList):
 
     def _get_elements(self):
         elements = []
-        for section, _ in self.toc:
+        for i, section in enumerate(self.outline):
             elements.append(
                 ListElement(
-                    text=section.attributes.title,
-                    on_select=partial(self._select, section),
+                    text=section.title,
+                    on_select=partial(self._select, i),
                 )
             )
         return elements
 
-    def _select(self, section):
+    def _select(self, index):
+        # The chapter may be being parsed in the background.
+        self.tui.prefetcher.load(self.chapter, partial(self._show_section, index))
+
+    def _show_section(self, index):
+        residency = self.chapter.book.residency
+        if residency is not None:
+            # The progress of the displayed chapter is kept in its nodes.
+            residency.pin(self.chapter)
+        toc = self.chapter.toc(depth=1)
+        if index >= len(toc):
+            log.warning(
+                "Section not found. chapter=%s index=%s", self.chapter.file, index
+            )
+            return
+        section, _ = toc[index]
         self.tui.content.render_section(section)
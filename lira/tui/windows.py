@@ -1,4 +1,5 @@
 import asyncio
+from collections import deque
 from functools import partial
 from textwrap import dedent
 
@@ -17,9 +18,10 @@ from prompt_toolkit.layout import (
 from prompt_toolkit.widgets import Box, Label, TextArea
 
 from lira import __version__
-from lira.tui.render import Renderer
+from lira.tui.render import Renderer, highlight
 from lira.tui.utils import exit_app, notify_after_copy, set_title
-from lira.tui.widgets import BooksList, Button, FormattedTextArea
+from lira.tui.widgets import BooksList, Button, FormattedTextArea, VirtualizedTextArea
+from lira.utils import LRUCache
 
 
 class WindowContainer:
@@ -68,9 +70,56 @@ class WindowContainer:
 
 
 class ContentArea(WindowContainer):
+
+    virtualize_threshold = 1000
+    """
+    Sections with more lines than this are rendered lazily.
+
+    See :py:class:`lira.tui.widgets.VirtualizedTextArea`.
+    """
+
+    progressive_highlighting = True
+    """
+    Display code blocks as plain text first, and highlight them in the background.
+
+    See :py:attr:`lira.tui.render.Renderer.progressive`.
+    """
+
+    render_width = 60
+    """
+    Width used to render sections.
+
+    It's updated from the width of the content area before rendering a section.
+    """
+
+    width_step = 5
+    """
+    Sections are rendered with a width that is a multiple of this value.
+
+    This way a section is rendered (and cached) only once for similar widths.
+    """
+
+    min_width = 20
+    """Minimum width used to render sections."""
+
+    resize_delay = 0.2
+    """Seconds to wait for the width to stop changing before rendering again."""
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.text_area = self._get_default_container()
+        self.renderer = None
+        self.highlight_task = None
+        self.resize_task = None
+
+        self.section_cache = LRUCache(maxsize=16)
+        """
+        Recently rendered sections.
+
+        The keys are tuples with the section and the width used to render it,
+        and the values are tuples with the version of the section,
+        its renderer, and its text area.
+        """
 
     def get_container(self):
         if self.pages:
@@ -106,20 +155,169 @@ class ContentArea(WindowContainer):
         )
         return text_area
 
-    def render_section(self, section):
-        renderer = Renderer(tui=self.tui, section=section)
-        self.text_area = FormattedTextArea(
-            merge_formatted_text(renderer.render()),
-            scrollbar=True,
-            focusable=True,
-            after_copy=partial(notify_after_copy, self.tui),
+    def _get_renderer(self, section, progressive=True):
+        progressive = progressive and self.progressive_highlighting
+        if progressive:
+            # Highlighting in the background requires a running event loop.
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                progressive = False
+        return Renderer(
+            tui=self.tui,
+            section=section,
+            width=self.render_width,
+            progressive=progressive,
         )
+
+    def _get_width(self):
+        """
+        Get the width to render sections, from the width of the last render.
+
+        The width is rounded down to a multiple of :py:attr:`width_step`.
+        """
+        render_info = self.text_area.window.render_info
+        if render_info is None:
+            return self.render_width
+        width = render_info.window_width
+        return max(self.min_width, width - width % self.width_step)
+
+    def check_width(self, *args):
+        """
+        Render the current section again if the width of the content area changed.
+
+        It's called after each render of the application,
+        the section is rendered only after the width stops changing
+        for :py:attr:`resize_delay` seconds
+        (resizing a terminal triggers several renders).
+        """
+        if self.renderer is None:
+            return
+        width = self._get_width()
+        if self.resize_task:
+            self.resize_task.cancel()
+            self.resize_task = None
+        if width != self.renderer.width:
+            self.resize_task = asyncio.create_task(self._resize())
+
+    async def _resize(self):
+        await asyncio.sleep(self.resize_delay)
+        self.resize_task = None
+        cursor_position = self.text_area.cursor_position
+        self.render_section(self.renderer.section)
+        self.text_area.cursor_position = cursor_position
+        get_app().invalidate()
+
+    def render_section(self, section):
+        self.render_width = self._get_width()
+        cached = self.section_cache.get((section, self.render_width))
+        if cached and cached[0] == section.version:
+            _, self.renderer, self.text_area = cached
+            self.reset(self.text_area)
+            self._highlight_pending()
+            return
+
+        self.renderer = self._get_renderer(section)
+        estimated_lines = self.renderer.estimate_lines()
+        if estimated_lines > self.virtualize_threshold:
+            # Only the visible blocks are rendered, they are highlighted right away.
+            self.renderer.progressive = False
+            self.text_area = VirtualizedTextArea(
+                self.renderer.iter_render(),
+                estimated_count=estimated_lines,
+                scrollbar=True,
+                focusable=True,
+            )
+        else:
+            self.text_area = FormattedTextArea(
+                merge_formatted_text(self.renderer.render()),
+                scrollbar=True,
+                focusable=True,
+                after_copy=partial(notify_after_copy, self.tui),
+            )
         self.reset(self.text_area)
+        self._cache_section()
+        self._highlight_pending()
+
+    def _cache_section(self):
+        section = self.renderer.section
+        self.section_cache.set(
+            (section, self.renderer.width),
+            (section.version, self.renderer, self.text_area),
+        )
 
-    def update_section(self, section):
-        renderer = Renderer(tui=self.tui, section=section)
-        self.text_area.text = merge_formatted_text(renderer.render())
+    def discard_chapter(self, chapter):
+        """
+        Remove the sections of `chapter` from the cache of rendered sections.
+
+        Called when the chapter is unloaded
+        (see :py:attr:`lira.book.ChapterResidency.on_unload`),
+        so its nodes aren't kept alive by the cache.
+        """
+        nodes = {id(node) for node in chapter.contents}
+        for key in self.section_cache.keys():
+            root = key[0]
+            while root.parent is not None:
+                root = root.parent
+            if id(root) in nodes:
+                self.section_cache.discard(key)
+
+    def update_section(self, section, node=None):
+        """
+        Render the section again.
+
+        :param node: If given, only the lines of this node are rendered again.
+        """
+        renderer = self.renderer
+        if isinstance(self.text_area, VirtualizedTextArea):
+            # The content is rendered lazily, there is no need to patch it.
+            self.renderer = self._get_renderer(section, progressive=False)
+            self.text_area.update_content(
+                self.renderer.iter_render(),
+                estimated_count=self.renderer.estimate_lines(),
+            )
+        elif (
+            node is not None
+            and renderer is not None
+            and renderer.section is section
+            and node in renderer.spans
+        ):
+            (start, end), content = renderer.update_node(node)
+            self.text_area.replace_lines(start, end, merge_formatted_text(content))
+        else:
+            self.renderer = self._get_renderer(section)
+            self.text_area.text = merge_formatted_text(self.renderer.render())
         self.reset(self.text_area)
+        self._cache_section()
+        task = self.highlight_task
+        if self.renderer is not renderer or not task or task.done():
+            self._highlight_pending()
+
+    def _highlight_pending(self):
+        """Highlight the pending blocks of the current renderer in the background."""
+        if self.highlight_task:
+            self.highlight_task.cancel()
+            self.highlight_task = None
+        if self.renderer.pending:
+            self.highlight_task = asyncio.create_task(
+                self._highlight_blocks(self.renderer)
+            )
+
+    async def _highlight_blocks(self, renderer):
+        loop = asyncio.get_running_loop()
+        while renderer.pending:
+            node = next(iter(renderer.pending))
+            code, language = renderer.pending[node]
+            formatted_text = await loop.run_in_executor(None, highlight, code, language)
+            if self.renderer is not renderer:
+                # The user navigated away, the result is stale
+                # (the block is kept as pending in case the section is displayed again).
+                return
+            renderer.pending.pop(node, None)
+            renderer.set_highlighted(code, language, formatted_text)
+            if node in renderer.spans:
+                self.update_section(renderer.section, node=node)
+                get_app().invalidate()
 
 
 class SidebarMenu(WindowContainer):
@@ -146,7 +344,12 @@ class SidebarMenu(WindowContainer):
         )
 
     def _get_default_container(self):
-        return BooksList(tui=self.tui)
+        self.books_list = BooksList(tui=self.tui)
+        return self.books_list
+
+    def load_books(self):
+        """Load the books of the list of books in the background."""
+        return self.books_list.load_books()
 
     def get_key_bindings(self):
         keys = KeyBindings()
@@ -164,12 +367,31 @@ class SidebarMenu(WindowContainer):
 
 
 class StatusBar(WindowContainer):
+
+    """
+    Bar at the bottom of the screen to show short messages.
+
+    Notifications are put in a queue, and shown one after the other
+    by a single task.
+    If several notifications are sent in a short period of time,
+    only the last one is shown.
+    """
+
+    history_size = 100
+    """Max number of messages kept in the history."""
+
+    coalesce_delay = 0.1
+    """Seconds to wait for more notifications before showing one."""
+
     def __init__(self, *args, **kwargs):
+        self.status_area = self._get_status_area()
         super().__init__(*args, **kwargs)
-        self.history = []
+        self.history = deque(maxlen=self.history_size)
+        self._queue = None
+        self._task = None
 
     def _get_default_container(self):
-        return to_container(self._get_status_area())
+        return to_container(self.status_area)
 
     def _get_status_area(self, status=""):
         return TextArea(
@@ -184,15 +406,44 @@ class StatusBar(WindowContainer):
 
     def update_status(self, status=""):
         self.history.append(status)
-        self.reset(self._get_status_area(status))
-        get_app().invalidate()
+        if self.status_area.text != status:
+            self.status_area.text = status
+            get_app().invalidate()
 
     def notify(self, text, delay=1.5):
-        # TODO: create a queue, so notifications don't overlap.
-        async def _main():
-            await asyncio.sleep(0.1)
+        """
+        Show `text` in the status bar for `delay` seconds.
+
+        :returns: A future that is done after the message has been shown,
+         or after it has been replaced by a newer one.
+        """
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._consume())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, delay, future))
+        return future
+
+    async def _consume(self):
+        item = None
+        while True:
+            if item is None:
+                item = await self._queue.get()
+            await asyncio.sleep(self.coalesce_delay)
+            items = [item]
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                items.append(item)
+
+            text, delay, _ = item
             self.update_status(text)
-            await asyncio.sleep(delay)
-            self.update_status()
-
-        return asyncio.create_task(_main())
+            # The status is cleared only if there isn't another message waiting.
+            try:
+                item = await asyncio.wait_for(self._queue.get(), delay)
+            except asyncio.TimeoutError:
+                item = None
+                self.update_status()
+
+            for *_, future in items:
+                if not future.done():
+                    future.set_result(None)
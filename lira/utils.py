@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class LRUCache:
+
+    """
+    Cache that keeps only the most recently used items.
+
+    .. code:: python
+
+       from lira.utils import LRUCache
+
+       cache = LRUCache(maxsize=2)
+       cache.set("one", 1)
+       cache.get("one")
+       print(cache.hits, cache.misses)
+
+    :param maxsize: Maximum number of items to keep.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+
+        self.hits = 0
+        """Number of lookups that found an item."""
+
+        self.misses = 0
+        """Number of lookups that didn't find an item."""
+
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        """Get the item for `key`, or `default` if it isn't in the cache."""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Add an item, removing the least recently used item if the cache is full."""
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, key):
+        """Remove the item for `key`, if it's in the cache."""
+        self._items.pop(key, None)
+
+    def keys(self):
+        """Return a list with the keys of the cache, from the least recently used."""
+        return list(self._items)
+
+    def clear(self):
+        """Remove all items and reset the counters."""
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return (
+            f"<LRUCache hits={self.hits} misses={self.misses} "
+            f"size={len(self)}/{self.maxsize}>"
+        )
+
+
+class Timer:
+
+    """
+    Measure the duration of named phases.
+
+    .. code:: python
+
+       from lira.utils import Timer
+
+       timer = Timer()
+       with timer.measure("setup"):
+           setup()
+       print(timer.timings["setup"])
+    """
+
+    def __init__(self):
+        self.timings = {}
+        """Duration in seconds of each phase, in the order they finished."""
+
+        self._started = {}
+
+    def start(self, name):
+        self._started[name] = time.perf_counter()
+
+    def stop(self, name):
+        """Stop measuring `name`, it does nothing if it wasn't started."""
+        start = self._started.pop(name, None)
+        if start is not None:
+            self.timings[name] = time.perf_counter() - start
+
+    @contextmanager
+    def measure(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def total(self):
+        return sum(self.timings.values())
@@ -1,5 +1,6 @@
 import importlib
 import logging
+from functools import lru_cache
 
 from lira.parsers import State
 
@@ -13,6 +14,21 @@ class ValidationError(Exception):
     pass
 
 
+class ValidatorsResolutionError(Exception):
+
+    """
+    Exception raised when one or more validators can't be resolved.
+
+    :param errors: Dictionary with the dotted path of each validator
+     and the exception raised while resolving it.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        messages = [f"{path}: {error!r}" for path, error in errors.items()]
+        super().__init__("Unable to resolve validators:\n" + "\n".join(messages))
+
+
 class Validator:
 
     """
@@ -130,10 +146,14 @@ class TestBlockValidator(Validator):
         self.node.attributes.state = State.UNKNOWN
 
 
+@lru_cache(maxsize=None)
 def get_validator_class(validator_path, subclass=None):
     """
     Get a validator class from a dotted path.
 
+    Classes are cached by the whole process,
+    so each validator is imported only once.
+
     :raises ValueError: If the class isn't a subclass of :py:class:`Validator`.
     """
     module_name, class_name = validator_path.rsplit(".", 1)
@@ -142,15 +162,36 @@ def get_validator_class(validator_path, subclass=None):
     subclass = subclass or Validator
     if not issubclass(subclass, Validator):
         log.warning(
-            "Subclass isn't a subclass of validator. subclass=%",
+            "Subclass isn't a subclass of validator. subclass=%s",
             subclass.__name__,
         )
         raise ValueError
-    if not issubclass(validator, subclass):
+    if not isinstance(validator, type) or not issubclass(validator, subclass):
         log.warning(
-            "Validator isn't a subclass of validator. subclass=% validator=%s",
+            "Validator isn't a subclass of validator. subclass=%s validator=%s",
             subclass.__name__,
             validator_path,
         )
         raise ValueError
     return validator
+
+
+def resolve_validator_classes(validator_paths, subclass=None):
+    """
+    Get the validator classes from a list of dotted paths.
+
+    All paths are resolved, even if some of them fail.
+
+    :raises ValidatorsResolutionError: With all the validators that failed.
+    :returns: A dictionary with the dotted path and class of each validator.
+    """
+    classes = {}
+    errors = {}
+    for path in validator_paths:
+        try:
+            classes[path] = get_validator_class(path, subclass=subclass)
+        except Exception as e:
+            errors[path] = e
+    if errors:
+        raise ValidatorsResolutionError(errors)
+    return classes
@@ -1,8 +1,11 @@
+from pathlib import Path
+
 import nox
 
 files = [
     "lira",
     "tests",
+    "benchmarks",
     "setup.py",
     "noxfile.py",
     "docs/conf.py",
@@ -16,6 +19,13 @@ def tests(session):
     session.run("coverage", "run", "-m", "pytest", "tests", *session.posargs)
 
 
+@nox.session
+def benchmarks(session):
+    session.install("-e", ".")
+    for file in sorted(Path("benchmarks").glob("bench_*.py")):
+        session.run("python", "-m", f"benchmarks.{file.stem}")
+
+
 @nox.session
 def coverage(session):
     session.install("coverage")
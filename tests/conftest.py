@@ -0,0 +1,13 @@
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path):
+    """Don't write the catalog and the cache of the user while running the tests."""
+    data_dir = tmp_path / "data"
+    with mock.patch("lira.app.CATALOG_FILE", data_dir / "catalog.json"), mock.patch(
+        "lira.app.CACHE_DIR", data_dir / "cache"
+    ):
+        yield data_dir
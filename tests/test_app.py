@@ -1,6 +1,9 @@
+import time
 from pathlib import Path
 from unittest import mock
 
+import pytest
+
 from lira.app import LiraApp
 
 data_dir = Path(__file__).parent / "data"
@@ -56,3 +59,72 @@ class TestApp:
         book = books[0]
         book.parse()
         assert book.metadata["title"] == "Intro to Lira"
+
+    @mock.patch.object(LiraApp, "_read_config")
+    def test_residency_config(self, read_config):
+        read_config.return_value = {
+            "books": ["lira.books.intro"],
+            "max_chapters": 4,
+            "max_memory": 2,
+        }
+
+        app = LiraApp()
+        app.setup()
+
+        assert app.residency.max_chapters == 4
+        assert app.residency.max_size == 2 * 1024 ** 2
+        assert app.books[0].residency is app.residency
+
+    @pytest.mark.asyncio
+    @mock.patch.object(LiraApp, "_read_config")
+    async def test_read_books_async(self, read_config):
+        read_config.return_value = {
+            "books": [
+                "lira.not.found.module",
+                "lira.books.intro",
+                str(data_dir / "books/example"),
+            ],
+        }
+
+        app = LiraApp()
+        app.setup(read_books=False)
+        assert not app.books_loaded
+        assert app.books == []
+        assert len(app.book_paths) == 3
+
+        loaded = []
+        books = await app.read_books_async(
+            callback=lambda index, book: loaded.append((index, book))
+        )
+
+        assert app.books_loaded
+        assert app.books == books
+        assert [book.metadata["title"] for book in books] == [
+            "Intro to Lira",
+            "Basic Introduction to Python",
+        ]
+        assert sorted(index for index, _ in loaded) == [0, 1, 2]
+        assert dict(loaded)[0] is None
+
+    @pytest.mark.asyncio
+    @mock.patch.object(LiraApp, "_read_config")
+    async def test_read_books_async_slow_book(self, read_config):
+        read_config.return_value = {"books": ["slow", "lira.books.intro"]}
+        app = LiraApp()
+        app.setup(read_books=False)
+
+        load_book = app._load_book
+
+        def _load_book(book_path):
+            if book_path == "slow":
+                time.sleep(0.2)
+                return None
+            return load_book(book_path)
+
+        loaded = []
+        with mock.patch.object(app, "_load_book", _load_book):
+            await app.read_books_async(callback=lambda i, book: loaded.append(i))
+
+        # The slow book doesn't block the others.
+        assert loaded == [1, 0]
+        assert len(app.books) == 1
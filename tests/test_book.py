@@ -1,8 +1,19 @@
+import json
 from pathlib import Path
+from textwrap import dedent
+from unittest import mock
 
-from lira.book import Book, BookChapter
+import pytest
+
+from lira import validators
+from lira.book import Book, BookChapter, ChapterResidency
+from lira.cache import ChapterCache
+from lira.parsers import State
+from lira.parsers.lite import LiteRSTParser
+from lira.validators import ValidatorsResolutionError
 
 books_path = Path(__file__).parent / "data/books"
+tutorial_path = Path(__file__).parent / "../lira/books/python_tutorial"
 
 
 class TestBook:
@@ -124,6 +135,276 @@ class TestBookChapter:
             toc,
         )
 
+    def test_chapter_dump_and_load(self):
+        data = json.loads(json.dumps(self.chapter_two.dump()))
+        chapter = BookChapter(book=self.book, file=self.chapter_two.file)
+        chapter.load(data)
+        assert chapter.is_parsed
+        assert chapter.metadata == self.chapter_two.metadata
+        assert str(chapter.contents) == str(self.chapter_two.contents)
+        assert chapter.dump() == self.chapter_two.dump()
+
     def test_chapter_repr(self):
         assert str(self.chapter_one) == "<BookChapter: Introduction>"
         assert str(self.chapter_two) == "<BookChapter: Nested Content>"
+
+
+class TestBookParallel:
+    @pytest.mark.parametrize("use_threads", [True, False])
+    def test_parse_in_parallel(self, use_threads):
+        book = Book(root=books_path / "example")
+        book.parse(all=True)
+
+        parallel_book = Book(root=books_path / "example")
+        parallel_book.parse(all=True, workers=2, use_threads=use_threads)
+
+        assert len(parallel_book.chapters) == len(book.chapters)
+        for chapter, expected in zip(parallel_book.chapters, book.chapters):
+            assert chapter.is_parsed
+            assert chapter.book is parallel_book
+            assert chapter.title == expected.title
+            assert chapter.metadata == expected.metadata
+            assert str(chapter.contents) == str(expected.contents)
+
+    def test_parse_in_parallel_with_cache(self, tmp_path):
+        cache = ChapterCache(tmp_path)
+        book = Book(root=books_path / "example", cache=cache)
+        book.parse(all=True, workers=2)
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+        book = Book(root=books_path / "example", cache=cache)
+        with mock.patch("concurrent.futures.ProcessPoolExecutor") as executor:
+            book.parse(all=True, workers=2)
+        executor.assert_not_called()
+        assert all(chapter.is_parsed for chapter in book.chapters)
+
+
+class TestChapterResidency:
+    def setup_method(self):
+        self.residency = ChapterResidency(max_chapters=2)
+        self.book = Book(root=tutorial_path, residency=self.residency)
+        self.book.parse()
+        self.chapters = self.book.chapters
+
+    def _parsed(self):
+        return [chapter.is_parsed for chapter in self.chapters]
+
+    def test_max_chapters(self):
+        for chapter in self.chapters:
+            chapter.parse()
+        assert self._parsed() == [False, False, True, True]
+        assert len(self.residency) == 2
+        assert self.chapters[0].contents == []
+
+        self.chapters[0].parse()
+        assert self._parsed() == [True, False, False, True]
+
+    def test_least_recently_used(self):
+        self.chapters[0].parse()
+        self.chapters[1].parse()
+        self.chapters[0].toc()
+        self.chapters[2].parse()
+        assert self._parsed() == [True, False, True, False]
+
+    def test_max_size(self):
+        residency = ChapterResidency(max_size=1)
+        book = Book(root=tutorial_path, residency=residency)
+        book.parse(all=True)
+        # The last parsed chapter is always kept.
+        assert [chapter.is_parsed for chapter in book.chapters] == [
+            False,
+            False,
+            False,
+            True,
+        ]
+        assert residency.size > 0
+
+    def test_pinned_chapter(self):
+        self.chapters[0].parse()
+        self.residency.pin(self.chapters[0])
+        for chapter in self.chapters[1:]:
+            chapter.parse()
+        assert self._parsed() == [True, False, False, True]
+
+    def test_restore_progress(self):
+        book = Book(root=books_path / "example", residency=ChapterResidency(1))
+        book.parse()
+        chapter = book.chapters[0]
+        chapter.parse()
+        test_block = chapter.contents[0].children[3]
+        test_block.content = ["# Changed"]
+        test_block.attributes.state = State.VALID
+
+        book.chapters[1].parse()
+        assert not chapter.is_parsed
+
+        chapter.parse()
+        unmodified, test_block = chapter.contents[0].children[2:]
+        assert test_block.content == ["# Changed"]
+        assert test_block.attributes.state == State.VALID
+        # Unmodified test blocks aren't touched.
+        assert unmodified.version == 0
+
+        test_block.reset()
+        assert test_block.content == ["# I'm a comment"]
+
+    def test_skip_changed_progress(self, tmp_path):
+        (tmp_path / "book.yaml").write_text("chapters:\n  Chapter: chapter.rst\n")
+        file = tmp_path / "chapter.rst"
+        content = dedent(
+            """
+            .. test-block:: Write a comment
+               :validator: lira.validators.CommentValidator
+
+               # Comment
+            """
+        )
+        file.write_text(content)
+        book = Book(root=tmp_path, residency=self.residency)
+        book.parse()
+        chapter = book.chapters[0]
+        chapter.parse()
+        chapter.contents[0].content = ["# Changed"]
+        chapter.contents[0].attributes.state = State.VALID
+        chapter.unload()
+
+        file.write_text(content.replace("Write a comment", "Write two comments"))
+        chapter.parse()
+        assert chapter.contents[0].content == ["# Comment"]
+        assert chapter.contents[0].attributes.state == State.UNKNOWN
+
+
+class TestBookChapterIncremental:
+
+    content = dedent(
+        """
+        :level: easy
+
+        Introduction.
+
+        First
+        =====
+
+        .. test-block:: Write a comment
+           :validator: lira.validators.CommentValidator
+
+        Second
+        ======
+
+        Some text.
+        """
+    )
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_dir = tmp_path
+        self.file = tmp_path / "chapter.rst"
+        self.file.write_text(self.content)
+        self.chapter = self._get_chapter()
+        self.chapter.parse()
+
+    def _get_chapter(self, cache=None):
+        book = Book(root=self.tmp_dir, cache=cache)
+        return BookChapter(book=book, file=self.file)
+
+    def _parse(self, chapter):
+        with mock.patch.object(
+            BookChapter, "parser_class", wraps=LiteRSTParser
+        ) as parser:
+            chapter.parse(incremental=True)
+        return [call.kwargs["content"] for call in parser.call_args_list]
+
+    def test_unchanged_file(self):
+        contents = self.chapter.contents
+        assert self._parse(self.chapter) == []
+        assert self.chapter.contents == contents
+
+    def test_changed_section(self):
+        first, second = self.chapter.contents[1:]
+        test_block = first.children[0]
+        test_block.attributes.state = State.VALID
+
+        self.file.write_text(self.content.replace("Some text.", "New text."))
+        assert self._parse(self.chapter) == ["Second\n======\n\nNew text.\n"]
+
+        assert self.chapter.metadata == {"level": "easy"}
+        assert len(self.chapter.contents) == 3
+        assert self.chapter.contents[0].text() == "Introduction."
+        assert self.chapter.contents[1] is first
+        assert first.children[0] is test_block
+        assert test_block.attributes.state == State.VALID
+        assert self.chapter.contents[2] is not second
+        assert self.chapter.contents[2].text() == "New text."
+
+    def test_changed_metadata(self):
+        first = self.chapter.contents[1]
+        self.file.write_text(self.content.replace("easy", "hard"))
+        self._parse(self.chapter)
+        assert self.chapter.metadata == {"level": "hard"}
+        assert self.chapter.contents[1] is first
+
+    def test_new_section(self):
+        first, second = self.chapter.contents[1:]
+        self.file.write_text(self.content + "\nThird\n=====\n\nThe end.\n")
+        assert len(self._parse(self.chapter)) == 2
+        assert self.chapter.contents[1] is first
+        assert self.chapter.contents[2] is not second
+        assert self.chapter.toc(depth=1)[-1][0].attributes.title == "Third"
+
+    def test_not_parsed_chapter(self):
+        chapter = self._get_chapter()
+        assert self._parse(chapter) == [self.content]
+        assert chapter.is_parsed
+
+    def test_cached_chapter(self):
+        cache = ChapterCache(self.tmp_dir / "cache")
+        self._get_chapter(cache=cache).parse()
+
+        chapter = self._get_chapter(cache=cache)
+        chapter.parse()
+        first = chapter.contents[1]
+        self.file.write_text(self.content.replace("Some text.", "New text."))
+        assert len(self._parse(chapter)) == 1
+        assert chapter.contents[1] is first
+
+
+class TestBookValidators:
+    def test_parse_doesnt_import_validators(self):
+        book = Book(root=books_path / "example")
+        with mock.patch("lira.validators.importlib.import_module") as import_module:
+            book.parse(all=True)
+        import_module.assert_not_called()
+
+    def test_resolve_validators(self):
+        book = Book(root=books_path / "example")
+        book.parse()
+        classes = book.resolve_validators()
+        assert classes == {
+            "lira.validators.TestBlockValidator": validators.TestBlockValidator,
+        }
+        assert all(chapter.is_parsed for chapter in book.chapters)
+
+    def test_resolve_validators_errors(self, tmp_path):
+        (tmp_path / "book.yaml").write_text("chapters:\n  Chapter: chapter.rst\n")
+        (tmp_path / "chapter.rst").write_text(
+            dedent(
+                """
+                .. test-block:: One
+                   :validator: lira.validators.NotFound
+
+                .. test-block:: Two
+                   :validator: lira.not.found.Validator
+
+                .. test-block:: Three
+                   :validator: lira.validators.TestBlockValidator
+                """
+            )
+        )
+        book = Book(root=tmp_path)
+        book.parse()
+        with pytest.raises(ValidatorsResolutionError) as excinfo:
+            book.resolve_validators()
+        assert set(excinfo.value.errors) == {
+            "lira.validators.NotFound",
+            "lira.not.found.Validator",
+        }
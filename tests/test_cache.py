@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from lira.book import Book, BookChapter
+from lira.cache import ChapterCache
+from lira.parsers import State
+
+books_path = Path(__file__).parent / "data/books"
+
+
+class TestChapterCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_dir = tmp_path
+        shutil.copytree(books_path / "example", self.tmp_dir / "example")
+        self.cache = ChapterCache(self.tmp_dir / "cache")
+        self.book = Book(root=self.tmp_dir / "example", cache=self.cache)
+        self.book.parse()
+
+    def _parse(self):
+        book = Book(root=self.tmp_dir / "example", cache=self.cache)
+        book.parse()
+        chapter = book.chapters[0]
+        with mock.patch.object(BookChapter, "parser_class") as parser:
+            chapter.parse()
+        return chapter, parser
+
+    def test_cache_miss(self):
+        chapter = self.book.chapters[0]
+        assert self.cache.get(chapter.file) is None
+
+        chapter.parse()
+        metadata, contents = self.cache.get(chapter.file)
+        assert metadata == chapter.metadata
+        assert str(contents) == str(chapter.contents)
+
+    def test_cache_hit(self):
+        self.book.chapters[0].parse()
+
+        chapter, parser = self._parse()
+        parser.assert_not_called()
+        assert chapter.metadata == {"tags": "comments", "level": "easy"}
+
+        section = chapter.contents[0]
+        assert section.attributes.title == "Comments"
+        assert [child.tagname for child in section.children] == [
+            "Paragraph",
+            "CodeBlock",
+            "TestBlock",
+            "TestBlock",
+        ]
+        for child in section.children:
+            assert child.parent is section
+        testblock = section.children[3]
+        assert testblock.attributes.state == State.UNKNOWN
+        assert testblock.attributes.language == "python"
+        assert testblock.text() == "# I'm a comment"
+
+    def test_cache_touched_file(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        stat = chapter.file.stat()
+        os.utime(chapter.file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        chapter, parser = self._parse()
+        parser.assert_not_called()
+        assert chapter.metadata == {"tags": "comments", "level": "easy"}
+
+    def test_cache_modified_file(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        with chapter.file.open("a") as f:
+            f.write("\nNew paragraph.\n")
+
+        book = Book(root=self.tmp_dir / "example", cache=self.cache)
+        book.parse()
+        chapter = book.chapters[0]
+        chapter.parse()
+        section = chapter.contents[0]
+        assert section.children[-1].text() == "New paragraph."
+
+        chapter, parser = self._parse()
+        parser.assert_not_called()
+        assert chapter.contents[0].children[-1].text() == "New paragraph."
+
+    def test_file_modified_while_parsing(self):
+        chapter = self.book.chapters[0]
+        parser_class = chapter.parser_class
+
+        def _parser_class(**kwargs):
+            # Modify the file after it was read.
+            with chapter.file.open("a") as f:
+                f.write("\nNew paragraph.\n")
+            return parser_class(**kwargs)
+
+        with mock.patch.object(BookChapter, "parser_class", side_effect=_parser_class):
+            chapter.parse()
+        assert chapter.contents[0].children[-1].text() != "New paragraph."
+        assert self.cache.get(chapter.file) is None
+
+        book = Book(root=self.tmp_dir / "example", cache=self.cache)
+        book.parse()
+        chapter = book.chapters[0]
+        chapter.parse()
+        assert chapter.contents[0].children[-1].text() == "New paragraph."
+
+    def test_cache_invalid_version(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        with mock.patch("lira.cache.__version__", "0.0.0"):
+            assert self.cache.get(chapter.file) is None
+
+    def test_cache_old_format(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        entry_file = self.cache._get_entry_file(chapter.file)
+        entry = json.loads(entry_file.read_text())
+        entry["contents"]["version"] = 0
+        entry_file.write_text(json.dumps(entry))
+        assert self.cache.get(chapter.file) is None
+
+    def test_cache_corrupted_entry(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        entry_file = self.cache._get_entry_file(chapter.file)
+        entry_file.write_text("{")
+        assert self.cache.get(chapter.file) is None
+
+    def test_concurrent_writes(self):
+        chapter = self.book.chapters[0]
+        content = chapter.file.read_text()
+        chapter.parse()
+
+        def _write():
+            for _ in range(20):
+                self.cache.set(
+                    chapter.file, content, chapter.metadata, chapter.contents
+                )
+
+        threads = [threading.Thread(target=_write) for _ in range(4)]
+        with mock.patch("lira.cache.log") as log:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        log.warning.assert_not_called()
+        assert not list(self.cache.root.glob("*.tmp"))
+        metadata, contents = self.cache.get(chapter.file)
+        assert str(contents) == str(chapter.contents)
+
+    def test_write_error(self):
+        chapter = self.book.chapters[0]
+        chapter.parse()
+        self.cache.clear()
+        with mock.patch("lira.cache.os.replace", side_effect=OSError):
+            chapter.parse()
+        assert not list(self.cache.root.iterdir())
+
+    def test_clear(self):
+        for chapter in self.book.chapters:
+            chapter.parse()
+        assert len(list(self.cache.root.glob("*.json"))) == 2
+        self.cache.clear()
+        assert len(list(self.cache.root.glob("*.json"))) == 0
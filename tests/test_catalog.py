@@ -0,0 +1,204 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from lira.__main__ import main
+from lira.app import LiraApp
+from lira.book import Book
+from lira.catalog import BookCatalog
+
+books_path = Path(__file__).parent / "data/books"
+intro_path = (Path(__file__).parent / "../lira/books/intro").resolve()
+
+
+def _touch(file, delta=10):
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta * 10 ** 9))
+
+
+class TestBookCatalog:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_dir = tmp_path
+        self.root = self.tmp_dir / "example"
+        shutil.copytree(books_path / "example", self.root)
+        self.file = self.tmp_dir / "catalog.json"
+        self.catalog = BookCatalog(self.file)
+        self.book = Book(root=self.root)
+        self.book.parse()
+
+    def _reload(self):
+        catalog = BookCatalog(self.file)
+        catalog.load()
+        return catalog
+
+    def test_get(self):
+        assert self.catalog.get("example") is None
+
+        self.catalog.set("example", self.book)
+        self.catalog.save()
+
+        with mock.patch.object(Book, "parse") as parse:
+            book = self._reload().get("example")
+        parse.assert_not_called()
+
+        assert book.root == self.root
+        assert book.metadata == self.book.metadata
+        assert [(c.title, c.file) for c in book.chapters] == [
+            (c.title, c.file) for c in self.book.chapters
+        ]
+        assert book.chapters[0].book is book
+
+    def test_outline(self):
+        self.catalog.set("example", self.book)
+        book = self.catalog.get("example")
+        chapter = book.chapters[0]
+
+        with mock.patch("lira.book.scan_outline") as scan_outline:
+            outline = chapter.outline(depth=1)
+        scan_outline.assert_not_called()
+
+        expected = self.book.chapters[0].outline(depth=1)
+        assert [(s.title, s.level, s.line, s.test_blocks) for s in outline] == [
+            (s.title, s.level, s.line, s.test_blocks) for s in expected
+        ]
+        assert all(not section.children for section in outline)
+
+        # The outline is scanned again if the chapter changed.
+        with chapter.file.open("a") as f:
+            f.write("\nNew section\n-----------\n")
+        titles = [section.title for section in chapter.outline(depth=1)]
+        assert titles[-1] == "New section"
+
+    def test_invalidate_on_metadata_change(self):
+        self.catalog.set("example", self.book)
+        assert self.catalog.get("example")
+
+        _touch(self.root / "book.yaml")
+        assert self.catalog.get("example") is None
+
+    def test_invalidate_on_new_file(self):
+        self.catalog.set("example", self.book)
+        (self.root / "new.rst").write_text("New\n===\n")
+        _touch(self.root)
+        assert self.catalog.get("example") is None
+
+    def test_invalidate_on_missing_book(self):
+        self.catalog.set("example", self.book)
+        shutil.rmtree(self.root)
+        assert self.catalog.get("example") is None
+
+    def test_ignore_other_versions(self):
+        self.catalog.set("example", self.book)
+        self.catalog.save()
+
+        data = json.loads(self.file.read_text())
+        data["version"] = "0.0.0"
+        self.file.write_text(json.dumps(data))
+        assert len(self._reload()) == 0
+
+    def test_ignore_invalid_file(self):
+        self.file.write_text("{")
+        catalog = self._reload()
+        assert len(catalog) == 0
+
+    def test_save_only_if_changed(self):
+        self.catalog.save()
+        assert not self.file.exists()
+
+        self.catalog.set("example", self.book)
+        self.catalog.save()
+        assert self.file.exists()
+
+        self.file.unlink()
+        self.catalog.save()
+        assert not self.file.exists()
+
+    def test_retain_and_clear(self):
+        self.catalog.set("one", self.book)
+        self.catalog.set("two", self.book)
+
+        self.catalog.retain(["two"])
+        assert "one" not in self.catalog
+        assert "two" in self.catalog
+
+        self.catalog.clear()
+        assert len(self.catalog) == 0
+
+
+class TestAppCatalog:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.catalog_file = tmp_path / "catalog.json"
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            f"books:\n  - lira.books.intro\n  - {books_path / 'example'}\n"
+        )
+        patches = [
+            mock.patch("lira.app.CATALOG_FILE", self.catalog_file),
+            mock.patch("lira.app.CONFIG_FILE", config_file),
+        ]
+        for patch in patches:
+            patch.start()
+        yield
+        for patch in patches:
+            patch.stop()
+
+    def test_load_from_catalog(self):
+        app = LiraApp()
+        app.setup()
+        assert self.catalog_file.exists()
+        assert len(app.catalog) == 2
+
+        app = LiraApp()
+        with mock.patch("lira.app.resolve_book_path") as resolve_book_path:
+            app.setup()
+        resolve_book_path.assert_not_called()
+        assert [book.metadata["title"] for book in app.books] == [
+            "Intro to Lira",
+            "Basic Introduction to Python",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_read_books_async_from_catalog(self):
+        app = LiraApp()
+        app.setup()
+
+        app = LiraApp()
+        app.setup(read_books=False)
+        with mock.patch.object(app, "_load_book") as load_book:
+            books = await app.read_books_async()
+        load_book.assert_not_called()
+        assert len(books) == 2
+
+    def test_index_books(self):
+        app = LiraApp()
+        app.setup(read_books=False)
+        app.catalog.set("not/in/config", Book(root=books_path / "example"))
+
+        books = app.index_books()
+        assert len(books) == 2
+        assert "not/in/config" not in app.catalog
+
+        with mock.patch.object(app, "_load_book") as load_book:
+            app.index_books()
+        load_book.assert_not_called()
+
+        books = app.index_books(rebuild=True)
+        assert len(books) == 2
+        assert len(app.catalog) == 2
+
+    def test_index_command(self):
+        runner = CliRunner()
+        result = runner.invoke(main, ["index", "--rebuild"])
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            f"Intro to Lira ({intro_path})",
+            f"Basic Introduction to Python ({books_path / 'example'})",
+        ]
+        assert self.catalog_file.exists()
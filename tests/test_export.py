@@ -0,0 +1,161 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+from prompt_toolkit.formatted_text import fragment_list_to_text
+
+from lira.__main__ import main
+from lira.book import Book
+from lira.export import FORMATS, _write_html, export_books
+from lira.parsers.nodes import Section
+from lira.tui.render import Renderer
+
+books_path = Path(__file__).parent / "data/books"
+
+
+class TestExport:
+    def setup_method(self):
+        self.book = Book(root=books_path / "renderer")
+
+    def _get_expected_text(self, width):
+        book = Book(root=books_path / "renderer")
+        book.parse(all=True)
+        chapter = book.chapters[0]
+        section = Section(
+            children=chapter.contents,
+            attributes={"title": chapter.title},
+        )
+        renderer = Renderer(tui=None, section=section, width=width)
+        return "".join(fragment_list_to_text(item) for item in renderer.render())
+
+    def test_export_plain(self, tmp_path):
+        files = list(export_books([self.book], tmp_path, width=40, workers=1))
+        assert files == [
+            tmp_path / "renderer/code-blocks.txt",
+            tmp_path / "renderer/test-blocks.txt",
+        ]
+        assert files[0].read_text() == self._get_expected_text(width=40) + "\n"
+
+    def test_export_ansi(self, tmp_path):
+        files = list(export_books([self.book], tmp_path, format="ansi", workers=1))
+        text = files[0].read_text()
+        assert "\x1b[" in text
+        assert "Code Blocks" in text
+        assert "\r" not in text
+
+    def test_export_html(self, tmp_path):
+        files = list(export_books([self.book], tmp_path, format="html", workers=1))
+        text = files[1].read_text()
+        assert text.startswith("<!DOCTYPE html>")
+        assert "<title>Test Blocks</title>" in text
+        title = '<span style="color: #ffffff; font-weight: bold">Test Blocks</span>'
+        assert title in text
+
+    def test_html_escape(self):
+        file = io.StringIO()
+        items = [[("class:text.strong", "<b>"), ("class:text.strong", " & ")]]
+        _write_html(items, file, title="<Title>")
+        text = file.getvalue()
+        assert "<title>&lt;Title&gt;</title>" in text
+        assert (
+            '<pre><span style="font-weight: bold">&lt;b&gt; &amp; </span></pre>' in text
+        )
+
+    def test_export_in_parallel(self, tmp_path):
+        books = [self.book, Book(root=books_path / "example")]
+        with mock.patch("lira.export.MIN_CHAPTERS_PER_WORKER", 1), mock.patch(
+            "lira.export.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as executor:
+            files = list(export_books(books, tmp_path, workers=2))
+        executor.assert_called_once_with(max_workers=2)
+        assert sorted(files) == sorted(
+            [
+                tmp_path / "renderer/code-blocks.txt",
+                tmp_path / "renderer/test-blocks.txt",
+            ]
+            + [
+                tmp_path / f"example/{file.stem}.txt"
+                for file in _get_chapters(books[1])
+            ]
+        )
+        assert files
+        for file in files:
+            assert file.read_text()
+
+    @pytest.mark.parametrize("workers", [1, 2, None])
+    def test_few_chapters_in_one_process(self, tmp_path, workers):
+        with mock.patch("lira.export.ProcessPoolExecutor") as executor:
+            files = list(export_books([self.book], tmp_path, workers=workers))
+        executor.assert_not_called()
+        assert len(files) == 2
+
+    def test_chapters_in_directories(self, tmp_path):
+        root = tmp_path / "book"
+        for directory in ["a", "b"]:
+            (root / directory).mkdir(parents=True)
+            (root / directory / "intro.rst").write_text(f"Intro {directory}.\n")
+        (root / "book.yaml").write_text(
+            "chapters:\n  A: a/intro.rst\n  B: b/intro.rst\n"
+        )
+        output = tmp_path / "build"
+        files = list(export_books([Book(root=root)], output, workers=1))
+        assert files == [
+            output / "book/a/intro.txt",
+            output / "book/b/intro.txt",
+        ]
+        assert "Intro a." in files[0].read_text()
+        assert "Intro b." in files[1].read_text()
+
+    def test_invalid_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            list(export_books([self.book], tmp_path, format="pdf"))
+
+
+def _get_chapters(book):
+    book.parse()
+    return [chapter.file for chapter in book.chapters]
+
+
+class TestRenderCommand:
+    def test_formats(self):
+        option = next(
+            param for param in main.commands["render"].params if param.name == "format_"
+        )
+        assert option.type.choices == list(FORMATS)
+
+    def test_render(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [
+                "render",
+                str(books_path / "renderer"),
+                "--output",
+                str(tmp_path),
+                "--format",
+                "html",
+                "--workers",
+                "1",
+            ],
+        )
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            str(tmp_path / "renderer/code-blocks.html"),
+            str(tmp_path / "renderer/test-blocks.html"),
+        ]
+
+    def test_render_book_not_found(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, ["render", "lira.books.nope", "-o", str(tmp_path)])
+        assert result.exit_code != 0
+        assert "Unable to find book: lira.books.nope" in result.output
+
+    def test_render_directory_without_book(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, ["render", str(tmp_path), "-o", str(tmp_path)])
+        assert result.exit_code != 0
+        assert f"Unable to find book: {tmp_path}" in result.output
+        assert not isinstance(result.exception, FileNotFoundError)
@@ -0,0 +1,168 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from lira.parsers import State
+from lira.parsers.lite import LiteRSTParser, UnsupportedSyntax, parse_inline
+from lira.parsers.nodes import Emphasis, Literal, Strong, Text, dump_nodes
+from lira.parsers.rst import RSTParser
+
+root = Path(__file__).parent.parent
+chapters = sorted(
+    list((root / "lira/books").glob("*/*.rst"))
+    + list((root / "tests/data/books").glob("*/*.rst"))
+)
+
+# Snippets that should be parsed without falling back to docutils.
+supported = [
+    "Just text.",
+    "Multiline\nparagraph.\n\nAnother one.",
+    "Some **strong**, *emphasis*, and ``literal`` text.",
+    "Markup inside ``*literal*`` text.",
+    "Quoted '*' and (*) and \"**\" markup, and a*b, 2 * 3, and x**.",
+    "Punctuation around *markup*: (*emphasis*), -**strong**-, ``literal``.",
+    "Unicode text: canción, ñandú, *acción*.",
+    ":tags: comments\n:level: easy\n\nText.",
+    ":tags: *comments*\n\n:level: easy\n",
+    "Title\n=====\n\nText.",
+    "=====\nTitle\n=====\n\nText.",
+    "=============\n  Inset title\n=============\n\nText.",
+    "A\n=\n\nB\n-\n\nC\n~\n\nD\n-\n\nE\n=\n",
+    "Title with *emphasis*\n---------------------\n",
+    ".. A comment\n   with more lines\n\nText.",
+    ".. A comment\n.. Another comment\n\nText.",
+    ".. code-block:: python\n\n   for i in range(3):\n       print(i)\n",
+    ".. code-block:: python\n\n\n   x = 1\n\n   y = 2\n\n\nText.",
+    ".. code-block:: python\n",
+    dedent(
+        """
+        .. test-block:: Write a comment
+           :validator: lira.validators.CommentValidator
+           :language: python
+           :state: valid
+
+           # Just write a simple comment :)
+        """
+    ),
+    ".. test-block:: Description\n   on two lines\n   :validator: lira.Validator",
+    ".. test-block::   Spaces   around   \n   :validator: lira.Validator",
+]
+
+# Snippets that should fall back to docutils.
+unsupported = [
+    "- A list",
+    "1. An enumerated list",
+    "Definition\n   list",
+    "A literal block::\n\n   code",
+    "A `reference`_.",
+    "A footnote [1]_.",
+    "A |substitution|.",
+    "A link https://lira.rtfd.io.",
+    "An email lira@example.com.",
+    "Escaped \\*text\\*.",
+    "An *unclosed emphasis.",
+    "Unicode «*punctuation*».",
+    ":tags: comments\n  on two lines",
+    "Text\n\n:field: in the middle",
+    "Title\n==\n",
+    "--\nA\n--\n",
+    "Text\n\n----\n\nText",
+    ".. note:: A note",
+    ".. _target:",
+    "..\n\n   Empty comment",
+    ".. code-block::\n\n   code",
+    ".. code-block:: python\n   :linenos:\n\n   code",
+    ".. code-block:: python\nText right after.",
+    ".. test-block:: Description\n   :validator: lira.Validator\n   :state: none",
+    ".. test-block:: Description\n   :validator: lira.Validator\n   :unknown: foo",
+    "\tTabs",
+]
+
+
+def _parse(parser_class, content):
+    parser = parser_class(content=content)
+    return parser.parse_metadata(), dump_nodes(parser.parse_content())
+
+
+class TestConformance:
+
+    """
+    Check that the fast parser produces the same result as the docutils parser.
+    """
+
+    @pytest.mark.parametrize("file", chapters, ids=lambda file: file.name)
+    def test_chapters(self, file):
+        content = file.read_text()
+        parser = LiteRSTParser(content=content, source=file)
+        assert parser.fallback is None
+        assert _parse(LiteRSTParser, content) == _parse(RSTParser, content)
+
+    @pytest.mark.parametrize("content", supported)
+    def test_supported(self, content):
+        parser = LiteRSTParser(content=content)
+        assert parser.fallback is None
+        assert _parse(LiteRSTParser, content) == _parse(RSTParser, content)
+
+    @pytest.mark.parametrize("content", unsupported)
+    def test_unsupported(self, content):
+        parser = LiteRSTParser(content=content)
+        assert isinstance(parser.fallback, RSTParser)
+        assert _parse(LiteRSTParser, content) == _parse(RSTParser, content)
+
+
+class TestLiteRSTParser:
+    def test_parse_test_block(self):
+        content = dedent(
+            """
+            .. test-block:: Write a comment
+               :validator: lira.validators.CommentValidator
+               :language: python
+               :state: valid
+
+               # Write a comment
+            """
+        )
+        parser = LiteRSTParser(content=content)
+        (test_block,) = parser.parse_content()
+        assert test_block.tagname == "TestBlock"
+        assert test_block.attributes.description == "Write a comment"
+        assert test_block.attributes.validator == "lira.validators.CommentValidator"
+        assert test_block.attributes.state == State.VALID
+        assert test_block.attributes.language == "python"
+        assert test_block.attributes.extension == ".py"
+        assert test_block.content == ["# Write a comment"]
+
+    def test_close(self):
+        parser = LiteRSTParser(content="Title\n=====\n\n:title:`Text`.")
+        parser.parse_content()
+        assert parser.fallback.document is not None
+        parser.close()
+        assert parser.fallback.document is None
+        assert parser.blocks is None
+
+    def test_docutils_isnt_used(self):
+        parser = LiteRSTParser(content="Title\n=====\n\nText.")
+        assert parser.fallback is None
+        assert not hasattr(parser, "document")
+
+
+class TestParseInline:
+    def test_parse_inline(self):
+        assert parse_inline("Some **strong**, *emphasis* and ``lit``") == [
+            (Text, "Some "),
+            (Strong, "strong"),
+            (Text, ", "),
+            (Emphasis, "emphasis"),
+            (Text, " and "),
+            (Literal, "lit"),
+        ]
+
+    def test_quoted_markup(self):
+        assert parse_inline('Quoted "*" and 2 * 3') == [
+            (Text, 'Quoted "*" and 2 * 3'),
+        ]
+
+    def test_unsupported_markup(self):
+        with pytest.raises(UnsupportedSyntax):
+            parse_inline("A `reference`_")
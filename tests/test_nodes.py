@@ -1,3 +1,7 @@
+import copy
+import json
+import pickle
+
 import pytest
 
 from lira.parsers import State, nodes
@@ -99,6 +103,56 @@ class TestNodes:
         assert node.attributes.state == State.UNKNOWN
         assert node.text() == "# Write a comment"
 
+    def test_block_node_reset_without_changes(self):
+        content = ["# Write a comment"]
+        node = nodes.TestBlock(
+            content=content,
+            attributes=dict(
+                validator="lira.validators.TestBlockValidator",
+                state=State.UNKNOWN,
+            ),
+        )
+        attributes = node.attributes
+        node.reset()
+        assert node.content is content
+        assert node.attributes is attributes
+        assert node.attributes.state == State.UNKNOWN
+
+    def test_block_node_reset_twice(self):
+        node = nodes.TestBlock(
+            content=["# Write a comment"],
+            attributes=dict(
+                validator="lira.validators.TestBlockValidator",
+                state=State.UNKNOWN,
+            ),
+        )
+        for _ in range(2):
+            node.attributes.state = State.VALID
+            node.attributes.language = "python"
+            node.content = ["One"]
+            node.content = ["Two"]
+
+            node.reset()
+
+            assert node.attributes.state == State.UNKNOWN
+            assert not hasattr(node.attributes, "language")
+            assert node.content == ["# Write a comment"]
+
+    def test_test_block_validator_is_lazy(self):
+        node = nodes.TestBlock(
+            content=["# Write a comment"],
+            attributes=dict(
+                validator="lira.not.found.Validator",
+                language="python",
+                state=State.UNKNOWN,
+                description="I'm a validator",
+                extension=".txt",
+            ),
+        )
+        assert node.tagname == "TestBlock"
+        with pytest.raises(ModuleNotFoundError):
+            node.validate()
+
     @pytest.mark.parametrize(
         "type",
         ["note", "warning", "tip"],
@@ -147,3 +201,201 @@ class TestNodes:
 
         for child in node.children:
             assert child.parent is node
+
+    def test_attributes_class(self):
+        section = nodes.Section(attributes={"title": "One"})
+        other = nodes.Section(attributes={"title": "Two"})
+        assert type(section.attributes) is nodes.Section.Attributes
+        assert type(other.attributes) is nodes.Section.Attributes
+        assert nodes.Section.Attributes is not nodes.Admonition.Attributes
+        assert nodes.Section.Attributes.__qualname__ == "Section.Attributes"
+
+        with pytest.raises(AttributeError):
+            section.attributes.language = "python"
+        with pytest.raises(AttributeError):
+            nodes.Section(attributes={"language": "python"})
+
+    def test_version(self):
+        test_block = nodes.TestBlock(
+            content=["# comment"],
+            attributes={"state": State.UNKNOWN},
+        )
+        paragraph = nodes.Paragraph(children=[nodes.Text("Hello")])
+        section = nodes.Section(
+            children=[
+                paragraph,
+                nodes.Section(children=[test_block]),
+            ]
+        )
+        assert section.version == 0
+
+        test_block.attributes.state = State.VALID
+        version = section.version
+        assert version > 0
+        assert test_block.version == version
+        assert paragraph.version == 0
+
+        test_block.content = ["# another comment"]
+        assert section.version > version
+        version = section.version
+
+        test_block.reset()
+        assert section.version > version
+        assert test_block.content == ["# comment"]
+        version = section.version
+
+        # Nothing to reset.
+        test_block.reset()
+        assert section.version == version
+
+    def test_nodes_have_slots(self):
+        node = nodes.TestBlock(
+            content=["# comment"],
+            attributes={"validator": "lira.validators.CommentValidator"},
+        )
+        assert not hasattr(node, "__dict__")
+        assert not hasattr(node.attributes, "__dict__")
+        with pytest.raises(AttributeError):
+            node.foo = "bar"
+
+    @pytest.mark.parametrize(
+        "clone",
+        [
+            lambda node: pickle.loads(pickle.dumps(node)),
+            copy.copy,
+            copy.deepcopy,
+        ],
+    )
+    def test_copy(self, clone):
+        node = nodes.TestBlock(
+            content=["# Write a comment"],
+            attributes={
+                "validator": "lira.validators.CommentValidator",
+                "state": State.UNKNOWN,
+            },
+        )
+        node.attributes.state = State.VALID
+        node.content = ["# Comment"]
+
+        node = clone(node)
+        version = node.version
+        assert node.attributes.state == State.VALID
+        assert node.content == ["# Comment"]
+
+        node.reset()
+        assert node.attributes.state == State.UNKNOWN
+        assert node.content == ["# Write a comment"]
+        assert node.version > version
+
+        # Unmodified nodes stay unmodified.
+        node = clone(node)
+        version = node.version
+        node.reset()
+        assert node.version == version
+
+    def test_pickle_tree(self):
+        test_block = nodes.TestBlock(
+            content=["# Write a comment"],
+            attributes={"validator": "lira.validators.CommentValidator"},
+        )
+        section = nodes.Section(children=[test_block], attributes={"title": "Title"})
+
+        section = pickle.loads(pickle.dumps(section))
+        (test_block,) = section.children
+        assert test_block.parent is section
+        assert section.attributes.title == "Title"
+
+        version = section.version
+        test_block.attributes.state = State.VALID
+        assert section.version > version
+
+
+class TestNodesData:
+    def get_tree(self):
+        return [
+            nodes.Section(
+                children=[
+                    nodes.Paragraph(
+                        children=[
+                            nodes.Text("Some "),
+                            nodes.Strong("strong"),
+                            nodes.Emphasis("emphasis"),
+                            nodes.Literal("literal"),
+                            nodes.Text(""),
+                        ]
+                    ),
+                    nodes.Admonition(
+                        children=[nodes.Paragraph(children=[nodes.Text("Note")])],
+                        attributes={"title": "Note", "type": "note"},
+                    ),
+                    nodes.CodeBlock(content=[], attributes={"language": "python"}),
+                    nodes.TestBlock(
+                        content=["# Write a comment", ""],
+                        attributes={
+                            "validator": "lira.validators.TestBlockValidator",
+                            "description": "I'm a validator",
+                            "state": State.VALID,
+                            "language": None,
+                        },
+                    ),
+                    nodes.Prompt("Prompt"),
+                ],
+                attributes={"title": "Title"},
+            ),
+        ]
+
+    def assert_equal(self, node, other):
+        assert type(node) is type(other)
+        assert node.content == other.content
+        for name in node.valid_attributes:
+            assert getattr(node.attributes, name, "unset") == getattr(
+                other.attributes, name, "unset"
+            )
+        assert len(node.children) == len(other.children)
+        for child, other_child in zip(node.children, other.children):
+            assert child.parent is node
+            self.assert_equal(child, other_child)
+
+    def test_round_trip(self):
+        tree = self.get_tree()
+        for node in tree:
+            data = json.loads(json.dumps(node.to_data()))
+            self.assert_equal(nodes.Node.from_data(data), node)
+
+    def test_compact_format(self):
+        section = self.get_tree()[0]
+        paragraph, admonition, code, test_block, prompt = section.children
+        assert paragraph.children[0].to_data() == ["Text", "Some "]
+        assert paragraph.children[-1].to_data() == ["Text", ""]
+        assert code.to_data() == ["CodeBlock", [], {"language": "python"}]
+        assert test_block.to_data() == [
+            "TestBlock",
+            ["# Write a comment", ""],
+            {
+                "description": "I'm a validator",
+                "language": None,
+                "state": {"State": "valid"},
+                "validator": "lira.validators.TestBlockValidator",
+            },
+        ]
+        assert nodes.Paragraph().to_data() == ["Paragraph"]
+        assert section.to_data()[:3] == ["Section", None, {"title": "Title"}]
+
+    def test_dump_and_load_nodes(self):
+        tree = self.get_tree()
+        data = json.loads(json.dumps(nodes.dump_nodes(tree)))
+        assert data["version"] == nodes.DATA_VERSION
+        (section,) = nodes.load_nodes(data)
+        self.assert_equal(section, tree[0])
+
+    def test_load_nodes_invalid_version(self):
+        data = nodes.dump_nodes(self.get_tree())
+        data["version"] = nodes.DATA_VERSION + 1
+        with pytest.raises(ValueError):
+            nodes.load_nodes(data)
+        with pytest.raises(ValueError):
+            nodes.load_nodes([])
+
+    def test_unknown_node(self):
+        with pytest.raises(ValueError):
+            nodes.Node.from_data(["Unknown", "text"])
@@ -0,0 +1,144 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from lira.book import Book
+from lira.parsers.outline import scan_outline, split_sections
+
+root_path = Path(__file__).parent.parent
+books = [
+    root_path / "lira/books/intro",
+    root_path / "lira/books/python_tutorial",
+    root_path / "tests/data/books/example",
+    root_path / "tests/data/books/renderer",
+]
+
+
+class TestOutline:
+    def assert_outline(self, outline, expected):
+        assert len(outline) == len(expected)
+        for section, (title, level, line, test_blocks, children) in zip(
+            outline, expected
+        ):
+            assert section.title == title
+            assert section.level == level
+            assert section.line == line
+            assert section.test_blocks == test_blocks
+            self.assert_outline(section.children, children)
+
+    def test_scan_outline(self):
+        content = dedent(
+            """
+            :tags: outline
+
+            =====
+            Title
+            =====
+
+            Some *text*.
+
+            A **strong** subtitle
+            ---------------------
+
+            .. test-block:: Write a comment
+               :validator: lira.validators.TestBlockValidator
+
+            Nested
+            ~~~~~~
+
+            .. test-block:: Write a comment
+               :validator: lira.validators.TestBlockValidator
+
+            Another subtitle
+            ----------------
+            Some text
+            ---------
+
+            Not a title
+            ---
+            """
+        ).lstrip()
+        outline = scan_outline(content, depth=99)
+        expected = [
+            (
+                "Title",
+                1,
+                2,
+                2,
+                [
+                    ("A strong subtitle", 2, 8, 2, [("Nested", 3, 14, 1, [])]),
+                    ("Another subtitle", 2, 20, 0, []),
+                    ("Some text", 2, 22, 0, []),
+                ],
+            )
+        ]
+        self.assert_outline(outline, expected)
+
+    def test_scan_outline_depth(self):
+        content = dedent(
+            """
+            Title
+            =====
+
+            Subtitle
+            --------
+            """
+        )
+        outline = scan_outline(content, depth=1)
+        self.assert_outline(outline, [("Title", 1, 1, 0, [])])
+
+        assert scan_outline(content, depth=0) == []
+
+    def test_code_isnt_a_title(self):
+        content = dedent(
+            """
+            .. code-block:: rst
+
+               Title
+               -----
+
+            Some text
+            ---------
+            """
+        )
+        outline = scan_outline(content)
+        self.assert_outline(outline, [("Some text", 1, 6, 0, [])])
+
+    def test_split_sections(self):
+        content = dedent(
+            """\
+            :level: easy
+
+            Title
+            =====
+
+            Subtitle
+            --------
+
+            Another title
+            =============
+            """
+        )
+        assert split_sections(content) == [
+            ":level: easy\n\n",
+            "Title\n=====\n\nSubtitle\n--------\n\n",
+            "Another title\n=============\n",
+        ]
+        assert "".join(split_sections(content)) == content
+        assert split_sections("Title\n=====\n") == ["", "Title\n=====\n"]
+
+    @pytest.mark.parametrize("book_path", books)
+    def test_outline_matches_toc(self, book_path):
+        book = Book(root=book_path)
+        book.parse(all=True)
+        for chapter in book.chapters:
+            outline = chapter.outline(depth=99)
+            toc = chapter.toc(depth=99)
+            self.assert_same_titles(outline, toc)
+
+    def assert_same_titles(self, outline, toc):
+        assert len(outline) == len(toc)
+        for section, (node, children) in zip(outline, toc):
+            assert section.title == node.attributes.title
+            self.assert_same_titles(section.children, children)
@@ -1,8 +1,14 @@
+import gc
 import logging
+import weakref
 from pathlib import Path
+from textwrap import dedent
 from unittest.mock import patch
 
-from lira.parsers.rst import RSTParser
+from docutils.parsers.rst import directives
+
+from lira.parsers import rst
+from lira.parsers.rst import CodeBlockDirective, ParserContext, RSTParser
 
 books_path = Path(__file__).parent / "data/books"
 
@@ -97,6 +103,24 @@ class TestRSTParser:
         assert testblock.text() == "# I'm a comment"
         assert testblock.attributes.validator == "lira.validators.TestBlockValidator"
 
+    def test_close(self):
+        self.parser.parse_metadata()
+        contents = self.parser.parse_content()
+        self.parser.close()
+        assert self.parser.document is None
+        assert contents[0].tagname == "Section"
+
+    def test_close_releases_document(self):
+        file = books_path / "example/nested.rst"
+        parser = RSTParser(content=file.read_text(), source=file)
+        document = weakref.ref(parser.document)
+        parser.parse_metadata()
+        contents = parser.parse_content()
+        parser.close()
+        gc.collect()
+        assert document() is None
+        assert contents
+
     def test_parse_invalid_node(self):
         logger = logging.getLogger("lira.parsers.rst")
         with patch.object(logger, "warning") as mocked_logger:
@@ -106,3 +130,59 @@ class TestRSTParser:
             mocked_logger.assert_called_once_with(
                 "Node with tag %(tag)s is not supported", {"tag": tag}
             )
+
+
+class TestParserContext:
+    def test_default_context_is_shared(self):
+        context = ParserContext.get_default()
+        assert ParserContext.get_default() is context
+
+        parser_a = RSTParser(content="Hello", source="a")
+        parser_b = RSTParser(content="World", source="b")
+        assert parser_a.context is context
+        assert parser_b.context is context
+        assert parser_a.document is not parser_b.document
+
+    def test_directives_are_not_leaked(self):
+        RSTParser(content="Hello", source="test")
+        assert "test-block" not in directives._directives
+        assert "code-block" not in directives._directives
+
+    def test_custom_directives(self):
+        content = dedent(
+            """
+            .. test-block:: Write a comment
+               :validator: lira.validators.TestBlockValidator
+
+            .. code-block:: python
+
+               print("Hello")
+            """
+        )
+        context = ParserContext(directives={"code-block": CodeBlockDirective})
+        assert list(context.directives) == ["code-block"]
+
+        parser = RSTParser(content=content, source="test", context=context)
+        nodes = parser.parse_content()
+        assert [node.tagname for node in nodes] == ["CodeBlock"]
+
+        context.register_directive("test-block", rst.TestBlockDirective)
+        parser = RSTParser(content=content, source="test", context=context)
+        nodes = parser.parse_content()
+        assert [node.tagname for node in nodes] == ["TestBlock", "CodeBlock"]
+
+    def test_custom_directives_dont_affect_default_context(self):
+        content = dedent(
+            """
+            .. code-block:: python
+
+               print("Hello")
+            """
+        )
+        context = ParserContext(directives={})
+        parser = RSTParser(content=content, source="test", context=context)
+        assert parser.parse_content() == []
+
+        parser = RSTParser(content=content, source="test")
+        nodes = parser.parse_content()
+        assert [node.tagname for node in nodes] == ["CodeBlock"]
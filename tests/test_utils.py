@@ -0,0 +1,46 @@
+from lira.utils import LRUCache
+
+
+class TestLRUCache:
+    def test_get_and_set(self):
+        cache = LRUCache(maxsize=2)
+        assert cache.get("one") is None
+        assert cache.get("one", 0) == 0
+        cache.set("one", 1)
+        assert cache.get("one") == 1
+        assert "one" in cache
+        assert len(cache) == 1
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    def test_evict_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("one", 1)
+        cache.set("two", 2)
+        cache.get("one")
+        cache.set("three", 3)
+        assert "one" in cache
+        assert "two" not in cache
+        assert "three" in cache
+        assert len(cache) == 2
+
+    def test_discard(self):
+        cache = LRUCache(maxsize=3)
+        cache.set("one", 1)
+        cache.set("two", 2)
+        cache.get("one")
+        assert cache.keys() == ["two", "one"]
+        cache.discard("one")
+        cache.discard("three")
+        assert cache.keys() == ["two"]
+
+    def test_clear(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("one", 1)
+        cache.get("one")
+        cache.get("two")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 0
+        assert cache.misses == 0
+        assert str(cache) == "<LRUCache hits=0 misses=0 size=0/2>"
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import pytest
+
+from lira import validators
+from lira.validators import (
+    Validator,
+    ValidatorsResolutionError,
+    get_validator_class,
+    resolve_validator_classes,
+)
+
+
+class TestGetValidatorClass:
+    def setup_method(self):
+        get_validator_class.cache_clear()
+
+    def test_get_validator_class(self):
+        validator = get_validator_class("lira.validators.TestBlockValidator")
+        assert validator is validators.TestBlockValidator
+
+    def test_classes_are_cached(self):
+        with mock.patch.object(
+            validators.importlib,
+            "import_module",
+            wraps=validators.importlib.import_module,
+        ) as import_module:
+            for _ in range(3):
+                validator = get_validator_class(
+                    "lira.validators.TestBlockValidator",
+                    subclass=validators.TestBlockValidator,
+                )
+                assert validator is validators.TestBlockValidator
+        import_module.assert_called_once_with("lira.validators")
+
+    def test_invalid_validator(self):
+        with pytest.raises(ValueError):
+            get_validator_class("lira.validators.NotFound")
+        with pytest.raises(ValueError):
+            get_validator_class(
+                "lira.validators.Validator", subclass=validators.TestBlockValidator
+            )
+        with pytest.raises(ModuleNotFoundError):
+            get_validator_class("lira.not.found.Validator")
+
+    def test_resolve_validator_classes(self):
+        classes = resolve_validator_classes(
+            ["lira.validators.Validator", "lira.validators.TestBlockValidator"]
+        )
+        assert classes == {
+            "lira.validators.Validator": Validator,
+            "lira.validators.TestBlockValidator": validators.TestBlockValidator,
+        }
+
+    def test_resolve_validator_classes_errors(self):
+        with pytest.raises(ValidatorsResolutionError) as excinfo:
+            resolve_validator_classes(
+                [
+                    "lira.validators.NotFound",
+                    "lira.validators.TestBlockValidator",
+                    "lira.not.found.Validator",
+                ]
+            )
+        errors = excinfo.value.errors
+        assert list(errors) == ["lira.validators.NotFound", "lira.not.found.Validator"]
+        assert isinstance(errors["lira.validators.NotFound"], ValueError)
+        assert isinstance(errors["lira.not.found.Validator"], ModuleNotFoundError)
+        assert "lira.not.found.Validator" in str(excinfo.value)
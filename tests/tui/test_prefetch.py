@@ -0,0 +1,220 @@
+import asyncio
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from lira.book import Book
+from lira.cache import ChapterCache
+from lira.tui.prefetch import ChapterPrefetcher
+
+book_path = Path(__file__).parent / "../../lira/books/python_tutorial"
+
+
+class TestChapterPrefetcher:
+    def setup_method(self):
+        self.book = Book(root=book_path)
+        self.book.parse()
+        self.chapters = self.book.chapters
+        self.prefetcher = ChapterPrefetcher()
+
+    async def _wait(self):
+        await asyncio.gather(*self.prefetcher.tasks.values())
+
+    def _parsed(self):
+        return [chapter.is_parsed for chapter in self.chapters]
+
+    @pytest.mark.asyncio
+    async def test_prefetch(self):
+        self.prefetcher.prefetch(self.chapters[1])
+        assert set(self.prefetcher.tasks) == {self.chapters[1], self.chapters[2]}
+        await self._wait()
+
+        assert self._parsed() == [False, True, True, False]
+        assert not self.prefetcher.tasks
+
+        chapter = Book(root=book_path)
+        chapter.parse()
+        chapter = chapter.chapters[1]
+        chapter.parse()
+        assert str(self.chapters[1].contents) == str(chapter.contents)
+
+    @pytest.mark.asyncio
+    async def test_depth(self):
+        self.prefetcher.depth = 2
+        self.prefetcher.prefetch(self.chapters[0])
+        await self._wait()
+        assert self._parsed() == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_visit(self):
+        self.prefetcher.depth = 0
+        self.prefetcher.visit(self.chapters[3])
+        assert set(self.prefetcher.tasks) == {self.chapters[3]}
+        await self._wait()
+
+        # The previously visited chapter is prefetched.
+        self.prefetcher.visit(self.chapters[0])
+        assert set(self.prefetcher.tasks) == {self.chapters[0]}
+        assert self.prefetcher.previous is self.chapters[3]
+        self.chapters[3].unload()
+        self.prefetcher.visit(self.chapters[0])
+        assert set(self.prefetcher.tasks) == {self.chapters[0], self.chapters[3]}
+        await self._wait()
+        assert self._parsed() == [True, False, False, True]
+
+    def _block_prefetch(self, chapter):
+        """Make the prefetch of `chapter` wait until the returned event is set."""
+        started = threading.Event()
+        release = threading.Event()
+        prefetch = chapter.prefetch
+
+        def _prefetch():
+            started.set()
+            release.wait(timeout=5)
+            return prefetch()
+
+        return mock.patch.object(chapter, "prefetch", _prefetch), started, release
+
+    @pytest.mark.asyncio
+    async def test_visit_keeps_prefetch(self):
+        chapter = self.chapters[1]
+        patch, started, release = self._block_prefetch(chapter)
+        callback = mock.Mock()
+        with patch, mock.patch.object(chapter, "parse") as parse:
+            self.prefetcher.prefetch(chapter)
+            task = self.prefetcher.tasks[chapter]
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+            # Opening the chapter waits for its prefetch.
+            self.prefetcher.visit(chapter)
+            assert self.prefetcher.tasks[chapter] is task
+            self.prefetcher.load(chapter, callback)
+            callback.assert_not_called()
+
+            release.set()
+            await self._wait()
+            await asyncio.sleep(0)
+
+        callback.assert_called_once_with()
+        parse.assert_not_called()
+        assert chapter.is_parsed
+
+    @pytest.mark.asyncio
+    async def test_cancel_pending_load(self):
+        chapter = self.chapters[1]
+        patch, started, release = self._block_prefetch(chapter)
+        callback = mock.Mock()
+        with patch:
+            self.prefetcher.visit(chapter)
+            task = self.prefetcher.tasks[chapter]
+            self.prefetcher.load(chapter, callback)
+            self.prefetcher.cancel()
+            release.set()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        callback.assert_not_called()
+        assert not chapter.is_parsed
+
+    @pytest.mark.asyncio
+    async def test_load_other_chapter_opened(self):
+        chapter = self.chapters[1]
+        patch, started, release = self._block_prefetch(chapter)
+        callback = mock.Mock()
+        with patch:
+            self.prefetcher.visit(chapter)
+            self.prefetcher.load(chapter, callback)
+            self.prefetcher.visit(self.chapters[3])
+            # The previous chapter is still prefetched.
+            assert chapter in self.prefetcher.tasks
+            release.set()
+            await self._wait()
+            await asyncio.sleep(0)
+
+        callback.assert_not_called()
+        assert chapter.is_parsed
+
+    @pytest.mark.asyncio
+    async def test_load_failed_prefetch(self):
+        chapter = self.chapters[1]
+        callback = mock.Mock()
+        with mock.patch.object(chapter, "prefetch", side_effect=OSError):
+            self.prefetcher.visit(chapter)
+            self.prefetcher.load(chapter, callback)
+            await self._wait()
+            await asyncio.sleep(0)
+
+        # The chapter is parsed when its prefetch fails.
+        callback.assert_called_once_with()
+        assert chapter.is_parsed
+
+    def test_load(self):
+        callback = mock.Mock()
+        self.prefetcher.load(self.chapters[0], callback)
+        callback.assert_called_once_with()
+        assert self._parsed() == [True, False, False, False]
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_jump(self):
+        patch, started, release = self._block_prefetch(self.chapters[1])
+        self.prefetcher.depth = 0
+        with patch:
+            self.prefetcher.prefetch(self.chapters[1])
+            task = self.prefetcher.tasks[self.chapters[1]]
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+            self.prefetcher.prefetch(self.chapters[3])
+            assert set(self.prefetcher.tasks) == {self.chapters[3]}
+            release.set()
+            await self._wait()
+
+        assert task.cancelled()
+        assert self._parsed() == [False, False, False, True]
+
+    @pytest.mark.asyncio
+    async def test_keep_parsed_chapter(self):
+        chapter = self.chapters[0]
+        data = chapter.prefetch()
+        chapter.parse()
+        contents = chapter.contents
+
+        chapter.load_prefetched(data)
+        assert chapter.contents is contents
+
+        self.prefetcher.prefetch(chapter)
+        assert chapter not in self.prefetcher.tasks
+
+    @pytest.mark.asyncio
+    async def test_cancel(self):
+        self.prefetcher.prefetch(self.chapters[0])
+        tasks = list(self.prefetcher.tasks.values())
+        self.prefetcher.cancel()
+        assert not self.prefetcher.tasks
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(task.cancelled() for task in tasks)
+
+    def test_cache_written_by_prefetch(self, tmp_path):
+        cache = ChapterCache(tmp_path)
+        book = Book(root=book_path, cache=cache)
+        book.parse()
+        chapter = book.chapters[0]
+
+        data = chapter.prefetch()
+        assert cache.get(chapter.file)
+
+        # Loading the result doesn't touch the cache.
+        with mock.patch.object(cache, "set") as set, mock.patch.object(
+            cache, "get"
+        ) as get:
+            chapter.load_prefetched(data)
+        set.assert_not_called()
+        get.assert_not_called()
+        assert chapter.is_parsed
+        assert chapter._chunks == cache.get_chunks(chapter.file)
+
+    def test_without_event_loop(self):
+        self.prefetcher.prefetch(self.chapters[0])
+        assert not self.prefetcher.tasks
+        assert not any(self._parsed())
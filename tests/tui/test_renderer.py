@@ -8,7 +8,7 @@ from prompt_toolkit.formatted_text import (
 )
 
 from lira.book import Book
-from lira.tui.render import Renderer
+from lira.tui.render import Renderer, highlight
 
 books_path = Path(__file__).parent / "../data/books"
 
@@ -19,6 +19,7 @@ class TestRenderer:
         book.parse(all=True)
         self.tui = mock.MagicMock()
         self.chapters = book.chapters
+        Renderer.highlight_cache.clear()
 
     def _to_text(self, formatted_text_list):
         return fragment_list_to_text(
@@ -148,6 +149,108 @@ This is just plain text:
         )
         assert node.text() == text
 
+    def test_highlight_cache(self):
+        toc = self.chapters[1].toc()
+        section = toc[0][0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        content = renderer.render()
+        cache = Renderer.highlight_cache
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        # Rendering again doesn't highlight the block again.
+        assert self._to_text(renderer.render()) == self._to_text(content)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Only changed blocks are highlighted again.
+        node = section.children[1]
+        assert node.tagname == "TestBlock"
+        node.content = ["# Changed"]
+        assert "# Changed" in self._to_text(renderer.render())
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_nested_sections(self):
+        book = Book(root=books_path / "example")
+        book.parse(all=True)
+        section = book.chapters[1].contents[0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        text = self._to_text(renderer.render())
+        assert text.startswith(
+            "I'm a title\n\n"
+            "Some content. With some nodes.\n\n"
+            "I'm a subtitle\n\n"
+            "I'm more text.\n\n"
+            "I'm another subtitle\n\n"
+        )
+        assert text.endswith("──\n\nAnother one\n\nThe end!")
+
+    def test_spans(self):
+        toc = self.chapters[1].toc()
+        section = toc[1][0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        lines = self._to_text(renderer.render()).split("\n")
+        node = section.children[1]
+        assert node.tagname == "TestBlock"
+        start, end = renderer.spans[node]
+        assert lines[start:end] == self._to_text(renderer.render_node(node)).split("\n")
+        assert lines[start].startswith("┌─ Who is Guido?")
+        assert lines[end - 1].startswith("└──")
+
+    def test_update_node(self):
+        section = self.chapters[1].toc()[0][0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        renderer.render()
+        nodes = list(renderer.spans)
+        assert len(nodes) == 1
+
+        node = nodes[0]
+        node.content = ["One", "Two", "Three"]
+        (start, end), content = renderer.update_node(node)
+        assert "One\n  Two\n  Three" in self._to_text(content)
+        assert renderer.spans[node] == (start, end + 2)
+
+        # The spans are the same as the ones from a full render.
+        spans = renderer.spans
+        renderer.render()
+        assert spans == renderer.spans
+
+    def test_iter_render(self):
+        section = self.chapters[1].toc()[1][0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        expected = self._to_text(renderer.render())
+
+        items = renderer.iter_render()
+        title = self._to_text([next(items)])
+        assert title == section.attributes.title
+        assert renderer.spans == {}
+        assert title + self._to_text(list(items)) == expected
+        assert list(renderer.spans) == [section.children[1]]
+
+    def test_estimate_lines(self):
+        for chapter in self.chapters:
+            for section, _ in chapter.toc():
+                renderer = Renderer(tui=self.tui, section=section, width=37)
+                lines = self._to_text(renderer.render()).split("\n")
+                assert abs(renderer.estimate_lines() - len(lines)) <= 1
+
+    def test_progressive_highlighting(self):
+        section = self.chapters[0].toc()[0][0]
+        renderer = Renderer(tui=self.tui, section=section, width=37)
+        expected = renderer.render()
+        node = list(renderer.spans)[0]
+        Renderer.highlight_cache.clear()
+
+        renderer = Renderer(tui=self.tui, section=section, width=37, progressive=True)
+        content = renderer.render()
+        assert list(renderer.pending) == [node]
+        assert self._to_text(content) == self._to_text(expected)
+        assert "class:pygments" not in str(content)
+
+        code, language = renderer.pending[node]
+        renderer.set_highlighted(code, language, highlight(code, language))
+        _, content = renderer.update_node(node)
+        assert "class:pygments" in str(content)
+        assert renderer.pending == {}
+
     def test_test_block_reset_action(self):
         pass
 
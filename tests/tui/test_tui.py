@@ -1,9 +1,16 @@
+import subprocess
+import sys
+from textwrap import dedent
+
 from prompt_toolkit.application import create_app_session
 from prompt_toolkit.input import create_pipe_input
 from prompt_toolkit.output import DummyOutput
 
 from lira.tui import TerminalUI
 
+STARTUP_BUDGET = 0.5
+"""Max time in seconds from the creation of the UI till the first frame."""
+
 
 class TestTUI:
     def test_layout(self):
@@ -16,3 +23,36 @@ class TestTUI:
             children = layout.container.get_children()
             assert len(children) == 2
             assert len(children[0].get_children()) == 2
+
+            # Rendered sections are dropped when their chapter is unloaded.
+            assert tui.content.discard_chapter in tui.lira.residency.on_unload
+
+    def test_time_to_first_frame(self):
+        input = create_pipe_input()
+        with create_app_session(input=input, output=DummyOutput()):
+            tui = TerminalUI()
+            tui.run(exit_after_startup=True)
+
+        timings = tui.timer.timings
+        assert list(timings) == ["setup", "first render", "book discovery"]
+        assert timings["setup"] + timings["first render"] < STARTUP_BUDGET
+        assert tui.lira.books_loaded
+
+    def test_lazy_imports(self):
+        code = dedent(
+            """
+            import sys
+            import lira.__main__
+            import lira.tui
+
+            modules = ["docutils", "pygments", "pyperclip", "multiprocessing"]
+            print(",".join(m for m in modules if m in sys.modules))
+            """
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        )
+        assert result.stdout.strip() == ""
@@ -2,20 +2,26 @@ from pathlib import Path
 from textwrap import dedent
 from unittest import mock
 
+import pytest
 from prompt_toolkit.clipboard import ClipboardData
 from prompt_toolkit.data_structures import Point
-from prompt_toolkit.formatted_text import HTML, to_formatted_text
+from prompt_toolkit.formatted_text import HTML, fragment_list_to_text, to_formatted_text
+from prompt_toolkit.layout.processors import TransformationInput
 from prompt_toolkit.mouse_events import MouseEvent, MouseEventType
 
 from lira.app import LiraApp
+from lira.tui.prefetch import ChapterPrefetcher
 from lira.tui.widgets import (
     BookChaptersList,
     BooksList,
     Button,
     ChapterSectionsList,
     FormattedTextArea,
+    FormatTextProcessor,
+    LazyLines,
     List,
     ListElement,
+    VirtualizedTextArea,
 )
 
 from .utils import to_text
@@ -126,6 +132,90 @@ class TestFormattedTextArea:
         text_area.control.mouse_handler(mouse_event)
         handler.assert_not_called()
 
+    def test_mouse_handler_lookup(self):
+        handlers = [mock.MagicMock() for _ in range(3)]
+        formatted_text = to_formatted_text(
+            [
+                ("", "one", handlers[0]),
+                ("", ""),
+                ("", "two", handlers[1]),
+                ("", "\n"),
+                ("", "three", handlers[2]),
+            ]
+        )
+        text_area = FormattedTextArea(formatted_text)
+        control = text_area.control
+
+        expected = [(0, 0, 0), (2, 0, 0), (3, 0, 1), (5, 0, 1), (6, 0, None)]
+        expected += [(0, 1, 2), (4, 1, 2), (5, 1, None)]
+        for x, y, index in expected:
+            for handler in handlers:
+                handler.reset_mock()
+            control.select(MouseEvent(Point(x, y), MouseEventType.MOUSE_UP))
+            for i, handler in enumerate(handlers):
+                assert handler.called == (i == index), (x, y, i)
+
+    def test_mouse_handler_ignored_events(self):
+        handler = mock.MagicMock()
+        text_area = FormattedTextArea(to_formatted_text([("", "hello", handler)]))
+        for event_type in [MouseEventType.SCROLL_UP, MouseEventType.SCROLL_DOWN]:
+            text_area.control.mouse_handler(MouseEvent(Point(0, 0), event_type))
+        handler.assert_not_called()
+
+        text_area.control.mouse_handler(
+            MouseEvent(Point(0, 0), MouseEventType.MOUSE_DOWN)
+        )
+        handler.assert_called_once()
+
+    def test_replace_lines_updates_index(self):
+        handler = mock.MagicMock()
+        text_area = FormattedTextArea(to_formatted_text("one\ntwo\nthree"))
+        text_area.replace_lines(
+            1, 2, to_formatted_text([("", "a", handler), ("", "b")])
+        )
+        assert text_area.text == "one\nab\nthree"
+        assert len(text_area.control.lines_index) == 3
+        text_area.control.select(MouseEvent(Point(0, 1), MouseEventType.MOUSE_UP))
+        handler.assert_called_once()
+
+    def _transform(self, processor, text_area, lineno):
+        return processor.apply_transformation(
+            TransformationInput(
+                buffer_control=text_area.control,
+                document=text_area.document,
+                lineno=lineno,
+                source_to_display=lambda i: i,
+                fragments=[],
+                width=80,
+                height=10,
+            )
+        )
+
+    def test_format_processor_cache(self):
+        text_area = FormattedTextArea(to_formatted_text("one\ntwo"))
+        processor = FormatTextProcessor()
+
+        transformation = self._transform(processor, text_area, 1)
+        assert transformation.fragments == [("", "two")]
+        assert self._transform(processor, text_area, 1) is transformation
+
+        text_area.replace_lines(1, 2, "three")
+        transformation = self._transform(processor, text_area, 1)
+        assert transformation.fragments == [("", "three")]
+
+        text_area.text = "four"
+        transformation = self._transform(processor, text_area, 0)
+        assert transformation.fragments == [("", "four")]
+
+    def test_format_processor_index_error(self, caplog):
+        text_area = FormattedTextArea(to_formatted_text("one"))
+        processor = FormatTextProcessor()
+        for _ in range(3):
+            transformation = self._transform(processor, text_area, 2)
+            assert transformation.fragments == []
+        assert len(caplog.records) == 1
+        assert "Index error" in caplog.records[0].message
+
     @mock.patch("lira.tui.utils.get_app")
     def test_copy_selection(self, get_app):
         text = to_formatted_text("I'm a text area")
@@ -174,6 +264,90 @@ class TestFormattedTextArea:
         callback.assert_called_once_with(text)
 
 
+class TestVirtualizedTextArea:
+    def _get_items(self, count, consumed):
+        for i in range(count):
+            consumed.append(i)
+            yield to_formatted_text(f"Line {i}\n")
+
+    def test_lazy_lines(self):
+        consumed = []
+        lines = LazyLines(self._get_items(100, consumed), estimated_count=50)
+        assert lines.count == 50
+        assert fragment_list_to_text(lines.get(2)) == "Line 2"
+        assert consumed == [0, 1, 2]
+        assert not lines.exhausted
+
+        lines.materialize(60)
+        assert lines.count == 61
+        assert lines.get(1000) == []
+        assert lines.exhausted
+        assert lines.count == 101
+        assert fragment_list_to_text(lines.get(100)) == ""
+        assert lines.get(101) == []
+
+    def test_lazy_lines_split(self):
+        items = [
+            to_formatted_text("one "),
+            to_formatted_text("two\nthree", style="bold"),
+            to_formatted_text("\nfour"),
+        ]
+        lines = LazyLines(items)
+        lines.materialize()
+        assert [fragment_list_to_text(line) for line in lines.lines] == [
+            "one two",
+            "three",
+            "four",
+        ]
+        assert ("bold ", "three") in lines.lines[1]
+
+    def test_materialize_viewport(self):
+        consumed = []
+        text_area = VirtualizedTextArea(
+            self._get_items(1000, consumed), estimated_count=1000
+        )
+        content = text_area.control.create_content(width=80, height=20)
+        assert content.line_count == 1000
+        assert len(consumed) == 20 + text_area.control.margin
+        assert fragment_list_to_text(content.get_line(5)) == "Line 5"
+
+        text_area.control.move_cursor(3, 500)
+        text_area.control.create_content(width=80, height=20)
+        assert len(consumed) == 500 + 20 + text_area.control.margin
+        assert text_area.control.cursor == Point(3, 500)
+
+    def test_move_cursor(self):
+        text_area = VirtualizedTextArea([to_formatted_text("one\ntwo\nthree")])
+        control = text_area.control
+        control.move_cursor(10, 10)
+        assert control.cursor == Point(5, 2)
+        control.move_cursor_up()
+        assert control.cursor == Point(3, 1)
+        control.move_cursor(-1, -1)
+        assert control.cursor == Point(0, 0)
+
+    def test_select(self):
+        handler = mock.MagicMock()
+        items = [to_formatted_text("one\n"), [("", "two "), ("", "[x]", handler)]]
+        text_area = VirtualizedTextArea(items)
+        control = text_area.control
+        control.select(MouseEvent(Point(1, 1), MouseEventType.MOUSE_UP))
+        handler.assert_not_called()
+        control.select(MouseEvent(Point(5, 1), MouseEventType.MOUSE_UP))
+        handler.assert_called_once()
+
+        event = MouseEvent(Point(5, 1), MouseEventType.SCROLL_DOWN)
+        assert control.mouse_handler(event) is NotImplemented
+
+    def test_update_content(self):
+        text_area = VirtualizedTextArea([to_formatted_text("one\ntwo")])
+        text_area.control.move_cursor(1, 1)
+        text_area.update_content([to_formatted_text("three\nfour")])
+        content = text_area.control.create_content(width=80, height=20)
+        assert fragment_list_to_text(content.get_line(1)) == "four"
+        assert text_area.control.cursor == Point(1, 1)
+
+
 class TestList:
     def test_list(self):
         title = to_formatted_text("Title", style="bg:red")
@@ -262,6 +436,39 @@ class TestLiraLists:
         list.select(0)
         self.tui.menu.push.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_book_list_placeholders(self):
+        with mock.patch("lira.app.CONFIG_FILE", config_file):
+            self.app.setup(read_books=False)
+        self.app.book_paths.insert(1, "lira.not.found.module")
+
+        books_list = BooksList(tui=self.tui)
+        list = books_list.container
+        expected = dedent(
+            """
+            Loading lira.books.intro...
+            Loading lira.not.found.module...
+            Loading example/...
+            """
+        ).strip()
+        assert to_text(list.list_window) == expected
+
+        list.index = 2
+        with mock.patch("lira.app.CONFIG_FILE", config_file):
+            await books_list.load_books()
+
+        expected = dedent(
+            """
+            Intro to Lira
+            Basic Introduction to Python
+            """
+        ).strip()
+        assert to_text(list.list_window) == expected
+        assert list.index == 1
+
+        list.select(1)
+        self.tui.menu.push.assert_called_once()
+
     def test_book_chapters_list(self):
         book = self.app.books[1]
         book.parse()
@@ -279,18 +486,27 @@ class TestLiraLists:
 
         assert chapters_list._get_bullet(0) == "1. "
 
+        # The chapters around the focused chapter are prefetched.
+        self.tui.prefetcher.prefetch.assert_called_once_with(book.chapters[0])
+        list.next()
+        self.tui.prefetcher.prefetch.assert_called_with(book.chapters[1])
+        assert not any(chapter.is_parsed for chapter in book.chapters)
+
         # Selecting an item updates the list.
         list.select(0)
         self.tui.menu.push.assert_called_once()
+        self.tui.prefetcher.visit.assert_called_once_with(book.chapters[0])
 
     def test_chapter_sections_list(self):
         book = self.app.books[1]
         book.parse()
         chapter = book.chapters[0]
-        chapter.parse()
+        assert not chapter.is_parsed
+        self.tui.prefetcher = ChapterPrefetcher()
 
         sections_list = ChapterSectionsList(tui=self.tui, chapter=chapter, index=0)
         list = sections_list.container
+        assert chapter.is_parsed
 
         # The first section is rendered by default.
         assert list.title_window.text == "Basic Introduction to Python > Introduction"
@@ -308,4 +524,4 @@ class TestLiraLists:
         # Selecting an item updates the content.
         self.tui.reset_mock()
         list.select(0)
-        self.tui.content.render_section.assert_called_once()
+        self.tui.content.render_section.assert_called_once_with(chapter.contents[0])
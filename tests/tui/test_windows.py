@@ -1,14 +1,29 @@
+import asyncio
+from pathlib import Path
 from unittest import mock
 
 import pytest
+from prompt_toolkit.application import DummyApplication
+from prompt_toolkit.application.current import set_app
+from prompt_toolkit.data_structures import Point
+from prompt_toolkit.document import Document
+from prompt_toolkit.formatted_text import fragment_list_to_text, merge_formatted_text
 from prompt_toolkit.layout.containers import to_container
+from prompt_toolkit.layout.mouse_handlers import MouseHandlers
+from prompt_toolkit.layout.screen import Screen, WritePosition
 from prompt_toolkit.widgets import Button, Label
 
-from lira.tui.widgets import BooksList
-from lira.tui.windows import SidebarMenu, StatusBar
+from lira.book import Book, ChapterResidency
+from lira.parsers import State
+from lira.parsers.nodes import Section
+from lira.tui.render import Renderer
+from lira.tui.widgets import BooksList, FormattedTextArea, VirtualizedTextArea
+from lira.tui.windows import ContentArea, SidebarMenu, StatusBar
 
 from .utils import to_widget
 
+books_path = Path(__file__).parent / "../data/books"
+
 
 class TestSidebarMenu:
     def setup_method(self):
@@ -86,6 +101,268 @@ class TestSidebarMenu:
         assert isinstance(books_list, BooksList)
 
 
+class TestContentArea:
+    def setup_method(self):
+        book = Book(root=books_path / "renderer")
+        book.parse(all=True)
+        # A section with two test blocks.
+        self.section = Section(
+            children=book.chapters[1].contents[1:],
+            attributes={"title": "Test blocks"},
+        )
+        self.window = ContentArea(tui=mock.MagicMock())
+        self.window.render_section(self.section)
+
+    def _get_test_blocks(self):
+        return [
+            node for node in self.window.renderer.spans if node.tagname == "TestBlock"
+        ]
+
+    def test_update_section_node(self):
+        text_area = self.window.text_area
+        first, second = self._get_test_blocks()
+
+        # Put the cursor after the first test block.
+        _, end = self.window.renderer.spans[first]
+        row = end + 1
+        text_area.document = Document(
+            text_area.text,
+            text_area.document.translate_row_col_to_index(row, 1),
+        )
+        line = text_area.document.current_line
+
+        lines = text_area.control.formatted_lines
+        first.content = ["One", "Two", "Three"]
+        with mock.patch("lira.tui.windows.Renderer") as renderer_class:
+            self.window.update_section(self.section, node=first)
+        renderer_class.assert_not_called()
+
+        # Only the lines from the node were updated.
+        assert text_area.control.formatted_lines is lines
+        assert self.window.text_area is text_area
+        assert "  One\n  Two\n  Three" in text_area.text
+        assert text_area.document.cursor_position_row == row + 2
+        assert text_area.document.cursor_position_col == 1
+        assert text_area.document.current_line == line
+
+        # The result is the same as rendering the whole section again.
+        text = text_area.text
+        formatted_lines = self._strip(lines)
+        self.window.update_section(self.section)
+        assert text_area.text == text
+        assert self._strip(text_area.control.formatted_lines) == formatted_lines
+
+    def _strip(self, lines):
+        """Remove empty fragments and handlers from the lines."""
+        return [[fragment[:2] for fragment in line if fragment[1]] for line in lines]
+
+    def test_update_section_without_node(self):
+        renderer = self.window.renderer
+        self.window.update_section(self.section)
+        assert self.window.renderer is not renderer
+
+    def test_section_cache(self):
+        text_area = self.window.text_area
+        renderer = self.window.renderer
+        other_section = Section(children=[], attributes={"title": "Other"})
+
+        self.window.render_section(other_section)
+        assert self.window.text_area is not text_area
+        self.window.render_section(self.section)
+        assert self.window.text_area is text_area
+        assert self.window.renderer is renderer
+
+        # The section is rendered again if it changes.
+        first, _ = self._get_test_blocks()
+        first.attributes.state = State.VALID
+        self.window.render_section(self.section)
+        assert self.window.text_area is not text_area
+        text_area = self.window.text_area
+
+        # Or if it's rendered with another width.
+        self.window.render_width = 80
+        self.window.render_section(self.section)
+        assert self.window.text_area is not text_area
+
+    def test_section_cache_after_update(self):
+        text_area = self.window.text_area
+        first, _ = self._get_test_blocks()
+        first.content = ["One"]
+        self.window.update_section(self.section, node=first)
+
+        self.window.render_section(Section(children=[], attributes={"title": "Other"}))
+        self.window.render_section(self.section)
+        assert self.window.text_area is text_area
+        assert "  One" in text_area.text
+
+    def test_discard_unloaded_chapter(self):
+        residency = ChapterResidency(max_chapters=1)
+        residency.on_unload.append(self.window.discard_chapter)
+        book = Book(root=books_path / "renderer", residency=residency)
+        book.parse()
+        chapter = book.chapters[0]
+        chapter.parse()
+        self.window.render_section(chapter.contents[1])
+        self.window.render_section(chapter.contents[2])
+        self.window.render_section(self.section)
+        assert len(self.window.section_cache) == 3
+
+        book.chapters[1].parse()
+        assert not chapter.is_parsed
+        assert self.window.section_cache.keys() == [
+            (self.section, self.window.render_width)
+        ]
+
+    def _paint(self, width):
+        # Avoid creating a new dummy application each time it's requested.
+        with set_app(DummyApplication()):
+            self.window.text_area.window.write_to_screen(
+                Screen(),
+                MouseHandlers(),
+                WritePosition(xpos=0, ypos=0, width=width, height=20),
+                parent_style="",
+                erase_bg=False,
+                z_index=None,
+            )
+
+    def test_get_width(self):
+        assert self.window._get_width() == 60
+        # One column is used by the scrollbar.
+        self._paint(width=84)
+        assert self.window._get_width() == 80
+        self._paint(width=80)
+        assert self.window._get_width() == 75
+        self._paint(width=10)
+        assert self.window._get_width() == self.window.min_width
+
+    @pytest.mark.asyncio
+    async def test_resize(self):
+        self.window.resize_delay = 0.01
+        self.window.text_area.cursor_position = Point(2, 0)
+        with mock.patch.object(
+            self.window, "render_section", wraps=self.window.render_section
+        ) as render_section:
+            # Several renders while resizing.
+            for width in [100, 90, 80, 70, 81]:
+                self._paint(width=width)
+                self.window.check_width()
+            await asyncio.sleep(0.05)
+            render_section.assert_called_once_with(self.section)
+
+            # The width didn't change.
+            self._paint(width=81)
+            self.window.check_width()
+            assert self.window.resize_task is None
+
+        assert self.window.renderer.width == 80
+        assert self.window.text_area.cursor_position == Point(2, 0)
+        top = self.window.text_area.text.split("\n")[self._get_top_line()]
+        assert len(top) == 80
+
+    @pytest.mark.asyncio
+    async def test_resize_back(self):
+        self.window.resize_delay = 0.01
+        text_area = self.window.text_area
+        self._paint(width=100)
+        self.window.check_width()
+        self._paint(width=61)
+        self.window.check_width()
+        await asyncio.sleep(0.05)
+        assert self.window.resize_task is None
+        assert self.window.text_area is text_area
+
+    def _get_top_line(self):
+        first, _ = self._get_test_blocks()
+        start, _ = self.window.renderer.spans[first]
+        return start
+
+    def test_virtualized_section(self):
+        window = ContentArea(tui=mock.MagicMock())
+        window.virtualize_threshold = 0
+        window.render_section(self.section)
+        text_area = window.text_area
+        assert isinstance(text_area, VirtualizedTextArea)
+        assert not text_area.lines.exhausted
+
+        text_area.lines.materialize()
+        lines = [fragment_list_to_text(line) for line in text_area.lines.lines]
+        assert lines == self.window.text_area.text.split("\n")
+
+        # The content is rendered again lazily.
+        first, _ = self._get_test_blocks()
+        first.content = ["One", "Two", "Three"]
+        window.update_section(self.section, node=first)
+        assert window.text_area is text_area
+        assert not text_area.lines.exhausted
+        text_area.lines.materialize()
+        assert any(
+            "  Three" in fragment_list_to_text(line) for line in text_area.lines.lines
+        )
+
+
+class TestContentAreaHighlighting:
+    def setup_method(self):
+        book = Book(root=books_path / "renderer")
+        book.parse(all=True)
+        self.sections = [chapter.contents[1] for chapter in book.chapters]
+        self.unknown_section = book.chapters[0].contents[2]
+        self.window = ContentArea(tui=mock.MagicMock())
+        Renderer.highlight_cache.clear()
+
+    def _get_lines(self, section):
+        renderer = Renderer(tui=None, section=section)
+        text_area = FormattedTextArea(merge_formatted_text(renderer.render()))
+        return [
+            [fragment[:2] for fragment in line if fragment[1]]
+            for line in text_area.control.formatted_lines
+        ]
+
+    def test_without_event_loop(self):
+        self.window.render_section(self.sections[0])
+        assert not self.window.renderer.progressive
+        assert self.window.highlight_task is None
+
+    @pytest.mark.asyncio
+    async def test_highlight_in_background(self):
+        section = self.sections[0]
+        self.window.render_section(section)
+        renderer = self.window.renderer
+        assert renderer.progressive
+        assert len(renderer.pending) == 1
+        text_area = self.window.text_area
+        text = text_area.text
+
+        await self.window.highlight_task
+        assert renderer.pending == {}
+        assert self.window.renderer is renderer
+        assert self.window.text_area is text_area
+        assert text_area.text == text
+        lines = [
+            [fragment[:2] for fragment in line if fragment[1]]
+            for line in text_area.control.formatted_lines
+        ]
+        assert lines == self._get_lines(section)
+
+    @pytest.mark.asyncio
+    async def test_discard_stale_results(self):
+        self.window.render_section(self.sections[0])
+        renderer = self.window.renderer
+        task = self.window.highlight_task
+
+        # Navigate to another section (without blocks to highlight)
+        # before the blocks are highlighted.
+        self.window.render_section(self.unknown_section)
+        assert self.window.highlight_task is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+        text = self.window.text_area.text
+        cached = len(Renderer.highlight_cache)
+        await self.window._highlight_blocks(renderer)
+        assert self.window.text_area.text == text
+        assert len(Renderer.highlight_cache) == cached
+
+
 class TestStatusBar:
     def _get_current_status(self, window):
         return to_container(window).get_children()[0].content.buffer.text
@@ -115,3 +392,37 @@ class TestStatusBar:
         assert self.window.history[0] == msg
         assert self.window.history[1] == ""
         assert self._get_current_status(self.window) == ""
+
+    @pytest.mark.asyncio
+    async def test_notify_coalesce(self):
+        self.window.coalesce_delay = 0.05
+        area = self.window.status_area
+        futures = [self.window.notify(f"Message {i}", delay=0.1) for i in range(5)]
+        task = self.window._task
+
+        await asyncio.gather(*futures)
+
+        assert list(self.window.history) == ["Message 4", ""]
+        assert self.window._task is task
+        assert self.window.status_area is area
+        assert self._get_current_status(self.window) == ""
+
+    @pytest.mark.asyncio
+    async def test_notify_while_showing(self):
+        self.window.coalesce_delay = 0.01
+        first = self.window.notify("First", delay=1)
+        await asyncio.sleep(0.05)
+        assert self._get_current_status(self.window) == "First"
+
+        second = self.window.notify("Second", delay=0.05)
+        await first
+        await asyncio.sleep(0.03)
+        assert self._get_current_status(self.window) == "Second"
+        await second
+        assert list(self.window.history) == ["First", "Second", ""]
+
+    def test_history_size(self):
+        for i in range(self.window.history_size + 10):
+            self.window.update_status(str(i))
+        assert len(self.window.history) == self.window.history_size
+        assert self.window.history[-1] == str(self.window.history_size + 9)